@@ -0,0 +1,114 @@
+"""
+VÉRIFICATION + BENCHMARK clean_text - Culture Burkinabè RAG
+Compare le normaliseur précompilé (TextNormalizer) à l'ancienne suite de
+re.sub: sortie identique octet pour octet sur le corpus brut, puis débit
+en caractères/seconde avant/après
+
+Usage:
+    python evaluation/benchmark_clean_text.py
+    python evaluation/benchmark_clean_text.py --input data/raw/enriched_articles.json --rounds 5
+
+Code de sortie 1 si une sortie diffère (utilisable en CI).
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import unicodedata
+from typing import Callable, List
+
+sys.path.append('.')
+from src.data_preprocessing import DataPreprocessor
+
+
+def legacy_clean_text(text: str) -> str:
+    """Implémentation d'origine de DataPreprocessor.clean_text (référence)"""
+    if not text:
+        return ""
+
+    text = unicodedata.normalize('NFKC', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\n+', '\n', text)
+    text = re.sub(r'http\S+|www\.\S+', '', text)
+    text = re.sub(r'Lefaso\.net$', '', text)
+    text = re.sub(r'Newsletter LeFaso\.net', '', text)
+    text = re.sub(r'Lire aussi\s*:', '', text)
+    text = re.sub(r'\b[A-Z][a-zéèêà]+\s+[A-Z][a-zéèêà]+(\s+\([^)]+\))?\s*$', '', text)
+
+    return text.strip()
+
+
+# Cas limites: interactions entre règles, espaces Unicode, texte vide
+EDGE_CASES = [
+    "", " ", "\n\t ", "  ", "a", "Lefaso.net", "Lefaso.net ", "  Lefaso.net",
+    "x <b>gras</b>  y", "a<br>\nb", "<p> </p>", "<<a>b>", "<>", "ht<b>tp://x.bf fin",
+    "Newsletterhttp://x LeFaso.net", "Lire Newsletter LeFaso.netaussi : suite",
+    "Voir http://lefaso.net/article1 et www.fespaco.bf.", "Lire aussi  : Le Fespaco",
+    "Un article. Jean Dupont", "Un article. Jean Dupont (Collaborateur) ",
+    "Un article. Jean Dupont ", "Texte Lefaso.nethttp://x", "Fin.　Awa Traoré",
+    "Ｆｕｌｌ ｗｉｄｔｈ ＡＢＣ", "ﬁn de ligne\r\n\r\nsuite\x1c",
+    "Publié par Lefaso.net\nLire aussi: Awa Sawadogo",
+    "Newsletterwww.a http://x<b>LeFaso.net\tDupont", "Awa  http://x Traoré",
+]
+
+
+def load_texts(input_file: str) -> List[str]:
+    with open(input_file, 'r', encoding='utf-8') as f:
+        articles = json.load(f)
+
+    return [article.get(field) or '' for article in articles for field in ('title', 'content', 'date')]
+
+
+def chars_per_second(clean: Callable[[str], str], texts: List[str], rounds: int) -> float:
+    total_chars = sum(len(text) for text in texts)
+    best = float('inf')
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in texts:
+            clean(text)
+        best = min(best, time.perf_counter() - start)
+
+    return total_chars / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérification et benchmark de clean_text")
+    parser.add_argument("--input", default="data/raw/culture_articles.json")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    preprocessor = DataPreprocessor(None, None)
+    texts = load_texts(args.input)
+
+    print("="*60)
+    print("🧪 VÉRIFICATION clean_text (sortie de référence)")
+    print("="*60)
+
+    mismatches = [
+        text for text in texts + EDGE_CASES
+        if preprocessor.clean_text(text).encode('utf-8') != legacy_clean_text(text).encode('utf-8')
+    ]
+
+    print(f"📊 {len(texts)} champs de {args.input} + {len(EDGE_CASES)} cas limites")
+    if mismatches:
+        for text in mismatches[:5]:
+            print(f"❌ {text[:80]!r}")
+            print(f"   attendu: {legacy_clean_text(text)[:80]!r}")
+            print(f"   obtenu:  {preprocessor.clean_text(text)[:80]!r}")
+        print(f"❌ {len(mismatches)} sorties différentes")
+        sys.exit(1)
+    print("✅ Sorties identiques octet pour octet")
+
+    print("\n⚡ Débit (meilleur de {} passes)".format(args.rounds))
+    before = chars_per_second(legacy_clean_text, texts, args.rounds)
+    after = chars_per_second(preprocessor.clean_text, texts, args.rounds)
+    print(f"  Avant: {before / 1e6:.2f} M caractères/s")
+    print(f"  Après: {after / 1e6:.2f} M caractères/s (x{after / before:.2f})")
+
+
+if __name__ == "__main__":
+    main()
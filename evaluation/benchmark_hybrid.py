@@ -0,0 +1,164 @@
+"""
+BENCHMARK HYBRID - Culture Burkinabè RAG
+Coût de la recherche hybride (BM25 + dense, fusion RRF) par rapport à la recherche dense seule
+
+Usage:
+    python evaluation/benchmark_hybrid.py --repeat 20 --budget-ms 10 --concurrency 1 4 8
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.append('.')
+from src.rag_pipeline import CultureRAGPipeline
+from src.bm25_index import BM25Index
+
+
+def percentile_ms(latencies: List[float], p: float) -> float:
+    return round(float(np.percentile(latencies, p)) * 1000, 3)
+
+
+def summarize(latencies: List[float]) -> Dict:
+    return {
+        'p50_ms': percentile_ms(latencies, 50),
+        'p95_ms': percentile_ms(latencies, 95),
+        'p99_ms': percentile_ms(latencies, 99),
+        'mean_ms': round(float(np.mean(latencies)) * 1000, 3)
+    }
+
+
+def time_calls(func, items: List, repeat: int) -> List[float]:
+    latencies = []
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter()
+            func(item)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def time_concurrent_calls(func, items: List, repeat: int, concurrency: int) -> Dict:
+    """Latence par appel et débit avec `concurrency` threads appelant func en parallèle"""
+    def timed(item) -> float:
+        start = time.perf_counter()
+        func(item)
+        return time.perf_counter() - start
+
+    requests = items * repeat
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed, requests))
+    wall_time = time.perf_counter() - start
+
+    return {
+        'concurrency': concurrency,
+        'qps': round(len(requests) / wall_time, 2),
+        **summarize(latencies)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la recherche hybride BM25 + dense")
+    parser.add_argument("--corpus", default="data/processed/corpus_cleaned.json")
+    parser.add_argument("--questions", default="evaluation/test_questions.json")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20, help="Passages sur l'ensemble des questions")
+    parser.add_argument("--budget-ms", type=float, default=10.0, help="Surcoût p95 toléré pour le mode hybride")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8],
+                        help="Nombre d'appelants simultanés (comme le pool de workers de l'API)")
+    parser.add_argument("--output", default="evaluation/benchmark_hybrid.json")
+    args = parser.parse_args()
+
+    with open(args.questions, 'r', encoding='utf-8') as f:
+        questions = [item['question'] for item in json.load(f)]
+
+    rag = CultureRAGPipeline(corpus_file=args.corpus, top_k=args.top_k)
+    if rag.vector_store.count() == 0:
+        rag.index_corpus()
+
+    print("="*60)
+    print("⚡ BENCHMARK RECHERCHE HYBRIDE")
+    print("="*60)
+
+    # Construction de l'index BM25 (même entrée que l'indexation)
+    ids, texts, _ = rag.prepare_documents()
+    start = time.perf_counter()
+    index = BM25Index()
+    index.upsert(ids, texts)
+    build_time = time.perf_counter() - start
+    print(f"🔤 Index BM25: {len(index)} documents en {build_time:.2f}s, {index.stats()['terms']} termes")
+
+    # Embeddings calculés une fois: seule la recherche est mesurée
+    embeddings = {question: rag.encode_query(question) for question in questions}
+
+    results = {
+        'bm25_only': summarize(time_calls(lambda q: rag.bm25_index.search(q, rag.hybrid_candidates), questions, args.repeat)),
+        'dense': summarize(time_calls(lambda q: rag.search(embeddings[q], query=q, mode='dense'), questions, args.repeat)),
+        'hybrid': summarize(time_calls(lambda q: rag.search(embeddings[q], query=q, mode='hybrid'), questions, args.repeat))
+    }
+    overhead_p95 = round(results['hybrid']['p95_ms'] - results['dense']['p95_ms'], 3)
+
+    for mode, stats in results.items():
+        print(f"  {mode:<10} p50 {stats['p50_ms']:>8.3f} ms | p95 {stats['p95_ms']:>8.3f} ms | p99 {stats['p99_ms']:>8.3f} ms")
+
+    within_budget = overhead_p95 <= args.budget_ms
+    print(f"\n{'✅' if within_budget else '❌'} Surcoût hybride p95: {overhead_p95} ms (budget: {args.budget_ms} ms)")
+
+    # Appelants simultanés: les recherches BM25 ne doivent pas s'attendre entre elles
+    print("\n⚙️ Appelants simultanés")
+    concurrent = {}
+    for mode in ('dense', 'hybrid'):
+        concurrent[mode] = [
+            time_concurrent_calls(lambda q, mode=mode: rag.search(embeddings[q], query=q, mode=mode),
+                                  questions, args.repeat, concurrency)
+            for concurrency in args.concurrency
+        ]
+    for dense_stats, hybrid_stats in zip(concurrent['dense'], concurrent['hybrid']):
+        print(f"  {dense_stats['concurrency']:>3} threads: dense p95 {dense_stats['p95_ms']:>8.3f} ms | "
+              f"hybrid p95 {hybrid_stats['p95_ms']:>8.3f} ms ({hybrid_stats['qps']:.0f} req/s) | "
+              f"surcoût p95 {hybrid_stats['p95_ms'] - dense_stats['p95_ms']:.3f} ms")
+
+    # Documents ajoutés par BM25 dans le top-k (absents du top-k dense)
+    added = []
+    for question in questions:
+        dense_ids = {doc['id'] for doc in rag.search(embeddings[question], query=question, mode='dense')}
+        hybrid_ids = [doc['id'] for doc in rag.search(embeddings[question], query=question, mode='hybrid')]
+        added.append(sum(1 for doc_id in hybrid_ids if doc_id not in dense_ids))
+    print(f"🔎 Documents apportés par BM25 dans le top-{args.top_k}: {np.mean(added):.2f} en moyenne")
+
+    report = {
+        'metadata': {
+            'date': datetime.now().isoformat(),
+            'num_documents': len(index),
+            'num_questions': len(questions),
+            'repeat': args.repeat,
+            'top_k': args.top_k,
+            'hybrid_candidates': rag.hybrid_candidates,
+            'rrf_k': rag.rrf_k,
+            'vector_database': rag.vector_store.describe()
+        },
+        'bm25_build_time_s': round(build_time, 3),
+        'bm25_index': index.stats(),
+        'latency': results,
+        'hybrid_overhead_p95_ms': overhead_p95,
+        'concurrent': concurrent,
+        'budget_ms': args.budget_ms,
+        'within_budget': within_budget,
+        'mean_docs_added_by_bm25': round(float(np.mean(added)), 3)
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n💾 Résultats sauvegardés: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
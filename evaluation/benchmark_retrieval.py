@@ -0,0 +1,297 @@
+"""
+BENCHMARK RETRIEVAL - Culture Burkinabè RAG
+Recherche seule, sans réseau (modèle et index locaux): latence par étape
+(encodage, recherche dans les index, assemblage des résultats), débit selon
+la concurrence, et qualité (recall@k, MRR) sur des étiquettes dérivées des
+mots-clés de test_questions.json
+
+Usage:
+    python evaluation/benchmark_retrieval.py --modes dense hybrid --concurrency 1 4 8 --repeat 10
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Modèle et tokenizer lus uniquement depuis le cache local
+os.environ.setdefault('HF_HUB_OFFLINE', '1')
+os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+
+sys.path.append('.')
+from src.rag_pipeline import CultureRAGPipeline
+
+STAGES = ('encode', 'search', 'assembly', 'total')
+
+
+def percentile_ms(latencies: List[float], p: float) -> float:
+    return round(float(np.percentile(latencies, p)) * 1000, 3)
+
+
+def summarize(latencies: List[float]) -> Dict:
+    return {
+        'p50_ms': percentile_ms(latencies, 50),
+        'p95_ms': percentile_ms(latencies, 95),
+        'p99_ms': percentile_ms(latencies, 99),
+        'mean_ms': round(float(np.mean(latencies)) * 1000, 3)
+    }
+
+
+def normalize(text: str) -> str:
+    """Minuscules sans accents ('Sécurité' et 'securite' identiques)"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def derive_labels(corpus, test_cases: List[Dict], min_keywords: int) -> Dict[str, List[str]]:
+    """
+    Chunks pertinents de chaque question: ceux dont le titre ou le contenu
+    contient au moins `min_keywords` de ses mots-clés (tous s'il en a moins)
+    """
+    keywords = {case['question']: [normalize(k) for k in case.get('keywords', [])] for case in test_cases}
+    labels = {question: [] for question in keywords}
+
+    for chunk in corpus:
+        text = normalize(f"{chunk['title']} {chunk['content']}")
+        for question, words in keywords.items():
+            if words and sum(1 for word in words if word in text) >= min(min_keywords, len(words)):
+                labels[question].append(chunk['id'])
+
+    return labels
+
+
+def load_labels(path: str, corpus, test_cases: List[Dict], min_keywords: int, relabel: bool) -> Dict[str, List[str]]:
+    """Étiquettes sauvegardées si elles correspondent au corpus et aux questions, sinon recalculées"""
+    questions = sorted(case['question'] for case in test_cases)
+    if not relabel and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if (saved['num_chunks'] == len(corpus) and saved['min_keywords'] == min_keywords
+                and sorted(saved['labels']) == questions):
+            return saved['labels']
+
+    labels = derive_labels(corpus, test_cases, min_keywords)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'date': datetime.now().isoformat(),
+            'num_chunks': len(corpus),
+            'min_keywords': min_keywords,
+            'labels': labels
+        }, f, ensure_ascii=False, indent=2)
+    return labels
+
+
+def ranking_metrics(rankings: Dict[str, List[str]], labels: Dict[str, List[str]], ks: List[int]) -> Dict:
+    """recall@k, precision@k, hit_rate@k et MRR moyens sur les questions étiquetées"""
+    questions = [q for q in rankings if labels.get(q)]
+    metrics = {f'{name}@{k}': [] for k in ks for name in ('recall', 'precision', 'hit_rate')}
+    reciprocal_ranks = []
+
+    for question in questions:
+        relevant = set(labels[question])
+        ranking = rankings[question]
+        for k in ks:
+            found = sum(1 for doc_id in ranking[:k] if doc_id in relevant)
+            metrics[f'recall@{k}'].append(found / len(relevant))
+            metrics[f'precision@{k}'].append(found / k)
+            metrics[f'hit_rate@{k}'].append(float(found > 0))
+        first = next((rank for rank, doc_id in enumerate(ranking, 1) if doc_id in relevant), None)
+        reciprocal_ranks.append(1.0 / first if first else 0.0)
+
+    result = {name: round(float(np.mean(values)), 4) if values else None for name, values in metrics.items()}
+    result['mrr'] = round(float(np.mean(reciprocal_ranks)), 4) if reciprocal_ranks else None
+    result['labeled_questions'] = len(questions)
+    return result
+
+
+class IndexTimer:
+    """
+    Temps passé dans les index (base vectorielle, BM25) par thread
+
+    Les méthodes de recherche sont remplacées par des versions chronométrées:
+    le chemin mesuré reste celui de CultureRAGPipeline.search.
+    """
+
+    def __init__(self, rag: CultureRAGPipeline):
+        self.local = threading.local()
+        rag.vector_store.query = self.wrap(rag.vector_store.query)
+        rag.bm25_index.search = self.wrap(rag.bm25_index.search)
+
+    def wrap(self, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.local.elapsed = self.elapsed() + time.perf_counter() - start
+        return timed
+
+    def reset(self):
+        self.local.elapsed = 0.0
+
+    def elapsed(self) -> float:
+        return getattr(self.local, 'elapsed', 0.0)
+
+
+def timed_retrieve(rag: CultureRAGPipeline, timer: IndexTimer, question: str, mode: str,
+                   top_k: int) -> Tuple[List[Dict], Dict[str, float]]:
+    """
+    Récupération découpée en étapes (même enchaînement que rag.retrieve):
+        encode: embedding de la question (sans encodage en mode 'bm25')
+        search: requêtes aux index
+        assembly: fusion RRF, lecture des métadonnées, construction des résultats
+    """
+    start = time.perf_counter()
+    query_embedding = None if mode == 'bm25' else rag.encode_query(question)
+    encoded = time.perf_counter()
+
+    timer.reset()
+    docs = rag.search(query_embedding, top_k, query=question, mode=mode)
+    done = time.perf_counter()
+    search_time = timer.elapsed()
+
+    timings = {
+        'search': search_time,
+        'assembly': done - encoded - search_time,
+        'total': done - start
+    }
+    if mode != 'bm25':
+        timings['encode'] = encoded - start
+    return docs, timings
+
+
+def benchmark_latency(rag: CultureRAGPipeline, timer: IndexTimer, questions: List[str], mode: str,
+                      top_k: int, repeat: int) -> Tuple[Dict, Dict[str, List[str]]]:
+    """Latence par étape, une requête à la fois; classements du premier passage"""
+    samples = {stage: [] for stage in STAGES}
+    rankings = {}
+    for iteration in range(repeat):
+        for question in questions:
+            docs, timings = timed_retrieve(rag, timer, question, mode, top_k)
+            for stage, value in timings.items():
+                samples[stage].append(value)
+            if iteration == 0:
+                rankings[question] = [doc['id'] for doc in docs]
+
+    return {stage: summarize(values) for stage, values in samples.items() if values}, rankings
+
+
+def benchmark_throughput(rag: CultureRAGPipeline, timer: IndexTimer, questions: List[str], mode: str,
+                         top_k: int, repeat: int, concurrency: int) -> Dict:
+    """Requêtes par seconde et latence de bout en bout avec `concurrency` clients simultanés"""
+    requests = questions * repeat
+
+    def run(question: str) -> float:
+        return timed_retrieve(rag, timer, question, mode, top_k)[1]['total']
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(run, requests))
+    wall_time = time.perf_counter() - start
+
+    return {
+        'concurrency': concurrency,
+        'requests': len(requests),
+        'wall_time_s': round(wall_time, 3),
+        'qps': round(len(requests) / wall_time, 2),
+        **summarize(latencies)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la recherche seule (sans LLM, sans réseau)")
+    parser.add_argument("--corpus", default=os.getenv('CORPUS_FILE', "data/processed/corpus_cleaned.json"))
+    parser.add_argument("--questions", default="evaluation/test_questions.json")
+    parser.add_argument("--labels", default="evaluation/retrieval_labels.json",
+                        help="Étiquettes de pertinence (recalculées si le corpus ou les questions changent)")
+    parser.add_argument("--relabel", action="store_true", help="Recalculer les étiquettes")
+    parser.add_argument("--min-keywords", type=int, default=2,
+                        help="Mots-clés présents dans un chunk pour le considérer pertinent")
+    parser.add_argument("--modes", nargs="+", default=list(CultureRAGPipeline.RETRIEVAL_MODES),
+                        choices=CultureRAGPipeline.RETRIEVAL_MODES)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10], help="Valeurs de k pour recall@k")
+    parser.add_argument("--repeat", type=int, default=10, help="Passages sur l'ensemble des questions")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--output", default="evaluation/benchmark_retrieval.json")
+    args = parser.parse_args()
+
+    top_k = max([args.top_k] + args.k)
+
+    with open(args.questions, 'r', encoding='utf-8') as f:
+        test_cases = json.load(f)
+    questions = [case['question'] for case in test_cases]
+
+    rag = CultureRAGPipeline(corpus_file=args.corpus, top_k=top_k)
+    if rag.vector_store.count() == 0:
+        rag.index_corpus()
+    rag.warm_up()
+    # Chaque requête mesurée encode réellement sa question
+    rag.query_cache.max_size = 0
+    timer = IndexTimer(rag)
+
+    print("="*60)
+    print("⚡ BENCHMARK RETRIEVAL (sans LLM)")
+    print("="*60)
+
+    labels = load_labels(args.labels, rag.corpus, test_cases, args.min_keywords, args.relabel)
+    num_labeled = sum(1 for q in questions if labels.get(q))
+    print(f"🏷️ {num_labeled}/{len(questions)} questions étiquetées "
+          f"({np.mean([len(labels[q]) for q in questions]):.1f} chunks pertinents en moyenne)")
+
+    results = {}
+    for mode in args.modes:
+        print(f"\n🔍 Mode {mode}")
+        latency, rankings = benchmark_latency(rag, timer, questions, mode, top_k, args.repeat)
+        for stage, stats in latency.items():
+            print(f"  {stage:<9} p50 {stats['p50_ms']:>8.3f} ms | p95 {stats['p95_ms']:>8.3f} ms | p99 {stats['p99_ms']:>8.3f} ms")
+
+        quality = ranking_metrics(rankings, labels, args.k)
+        print("  " + " | ".join(f"recall@{k} {quality[f'recall@{k}']}" for k in args.k) + f" | MRR {quality['mrr']}")
+
+        throughput = []
+        for concurrency in args.concurrency:
+            stats = benchmark_throughput(rag, timer, questions, mode, top_k, args.repeat, concurrency)
+            throughput.append(stats)
+            print(f"  ⚙️ {concurrency:>3} clients: {stats['qps']:>8.1f} req/s | p95 {stats['p95_ms']:.3f} ms")
+
+        results[mode] = {'latency': latency, 'quality': quality, 'throughput': throughput}
+
+    report = {
+        'metadata': {
+            'date': datetime.now().isoformat(),
+            'corpus': args.corpus,
+            'num_documents': rag.vector_store.count(),
+            'num_questions': len(questions),
+            'labeled_questions': num_labeled,
+            'min_keywords': args.min_keywords,
+            'repeat': args.repeat,
+            'top_k': top_k,
+            'model': rag.model_name,
+            'query_batch_size': rag.query_encoder.max_batch_size if rag.query_encoder else 1,
+            'hybrid_candidates': rag.hybrid_candidates,
+            'rrf_k': rag.rrf_k,
+            'vector_database': rag.vector_store.describe(),
+            'cpu_count': os.cpu_count()
+        },
+        'modes': results
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if rag.query_encoder is not None:
+        rag.query_encoder.stop()
+    print(f"\n💾 Résultats sauvegardés: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
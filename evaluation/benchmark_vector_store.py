@@ -0,0 +1,220 @@
+"""
+BENCHMARK BASES VECTORIELLES - Culture Burkinabè RAG
+Comparaison ChromaDB / FAISS (Flat, IVF, HNSW) / NumPy mmap: latence de requête,
+temps d'indexation, mémoire et rappel par rapport à la recherche exacte
+
+Usage:
+    # Corpus réel (embeddings calculés avec le modèle du pipeline)
+    python evaluation/benchmark_vector_store.py --corpus data/processed/corpus_cleaned.json
+
+    # Données synthétiques jusqu'à 1M de chunks
+    python evaluation/benchmark_vector_store.py --sizes 10000,100000,1000000 --backends faiss-flat,faiss-ivf,faiss-hnsw
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.append('.')
+from src.chunker import embedding_text
+from src.vector_store import ChromaVectorStore, FaissVectorStore, NumpyVectorStore
+
+
+ALL_BACKENDS = ["chroma", "faiss-flat", "faiss-ivf", "faiss-hnsw", "numpy"]
+
+
+def current_rss_mb() -> float:
+    """Mémoire résidente du processus (Mo)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError):
+        # Hors Linux: pic de mémoire (Ko sous Linux, octets sous macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def synthetic_embeddings(n: int, dim: int, seed: int = 42, num_clusters: int = 256) -> np.ndarray:
+    """Vecteurs normalisés regroupés en clusters (plus réaliste que du bruit uniforme)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((num_clusters, dim)).astype(np.float32)
+    vectors = np.empty((n, dim), dtype=np.float32)
+
+    for start in range(0, n, 100_000):
+        end = min(n, start + 100_000)
+        labels = rng.integers(0, num_clusters, end - start)
+        vectors[start:end] = centers[labels] + 0.5 * rng.standard_normal((end - start, dim)).astype(np.float32)
+
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def corpus_embeddings(corpus_file: str, model_name: str):
+    """Embeddings du corpus réel (même texte que CultureRAGPipeline.index_corpus)"""
+    from sentence_transformers import SentenceTransformer
+
+    with open(corpus_file, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)['corpus']
+
+    texts = [embedding_text(doc['title'], doc['content']) for doc in corpus]
+    model = SentenceTransformer(model_name)
+    vectors = model.encode(texts, batch_size=32, show_progress_bar=True, convert_to_numpy=True)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def make_store(backend: str, path: str):
+    if backend == "chroma":
+        return ChromaVectorStore(path, collection_name="benchmark")
+    if backend == "numpy":
+        return NumpyVectorStore(path)
+
+    index_type = backend.split("-", 1)[1]
+    return FaissVectorStore(path, index_type=index_type)
+
+
+def percentile_ms(latencies: List[float], p: float) -> float:
+    return round(float(np.percentile(latencies, p)) * 1000, 3)
+
+
+def benchmark_backend(backend: str, vectors: np.ndarray, queries: np.ndarray,
+                      exact_ids: List[List[str]], top_k: int) -> Dict:
+    """Indexation + requêtes pour un backend"""
+    workdir = tempfile.mkdtemp(prefix=f"bench_{backend}_")
+    ids = [str(i) for i in range(len(vectors))]
+    metadatas = [{'chunk': i} for i in range(len(vectors))]
+    documents = [""] * len(vectors)
+
+    try:
+        gc.collect()
+        rss_before = current_rss_mb()
+
+        store = make_store(backend, workdir)
+        store.reset()
+
+        start = time.perf_counter()
+        store.add(ids, vectors, documents, metadatas)
+        store.persist()
+        index_time = time.perf_counter() - start
+
+        rss_after = current_rss_mb()
+
+        # Échauffement
+        store.query(queries[:5], top_k)
+
+        latencies = []
+        recalls = []
+        for query, expected in zip(queries, exact_ids):
+            start = time.perf_counter()
+            hits = store.query([query], top_k)[0]
+            latencies.append(time.perf_counter() - start)
+            recalls.append(len({hit['id'] for hit in hits} & set(expected)) / top_k)
+
+        disk_mb = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(workdir) for name in names
+        ) / 1024 ** 2
+
+        return {
+            'backend': backend,
+            'index_time_s': round(index_time, 3),
+            'query_p50_ms': percentile_ms(latencies, 50),
+            'query_p95_ms': percentile_ms(latencies, 95),
+            'query_p99_ms': percentile_ms(latencies, 99),
+            'queries_per_s': round(len(latencies) / sum(latencies), 1),
+            'recall_at_k': round(float(np.mean(recalls)), 4),
+            'rss_delta_mb': round(rss_after - rss_before, 1),
+            'disk_mb': round(disk_mb, 1)
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def exact_neighbors(vectors: np.ndarray, queries: np.ndarray, top_k: int) -> List[List[str]]:
+    """Vérité terrain: plus proches voisins exacts (cosinus)"""
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    results = []
+    for query in queries:
+        scores = normalized @ (query / np.linalg.norm(query))
+        top = np.argpartition(-scores, top_k)[:top_k]
+        results.append([str(i) for i in top[np.argsort(-scores[top])]])
+    return results
+
+
+def run_scale(label: str, vectors: np.ndarray, backends: List[str], num_queries: int, top_k: int) -> Dict:
+    rng = np.random.default_rng(0)
+    query_idx = rng.choice(len(vectors), size=min(num_queries, len(vectors)), replace=False)
+    queries = vectors[query_idx] + 0.05 * rng.standard_normal((len(query_idx), vectors.shape[1])).astype(np.float32)
+
+    exact_ids = exact_neighbors(vectors, queries, top_k)
+
+    print(f"\n📐 {label}: {len(vectors)} vecteurs, dimension {vectors.shape[1]}")
+    results = []
+    for backend in backends:
+        print(f"  ⏳ {backend}...")
+        result = benchmark_backend(backend, vectors, queries, exact_ids, top_k)
+        print(f"  ✅ {backend}: p50={result['query_p50_ms']}ms p95={result['query_p95_ms']}ms "
+              f"rappel@{top_k}={result['recall_at_k']} mémoire=+{result['rss_delta_mb']}Mo "
+              f"indexation={result['index_time_s']}s")
+        results.append(result)
+
+    return {'dataset': label, 'num_vectors': len(vectors), 'dim': int(vectors.shape[1]), 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ChromaDB vs FAISS vs NumPy")
+    parser.add_argument("--corpus", help="Corpus JSON (embeddings réels)")
+    parser.add_argument("--model", default="paraphrase-multilingual-MiniLM-L12-v2")
+    parser.add_argument("--sizes", default="10000,100000", help="Tailles synthétiques (ex: 10000,100000,1000000)")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--backends", default=",".join(ALL_BACKENDS))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--output", default="evaluation/benchmark_vector_store.json")
+    args = parser.parse_args()
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    unknown = set(backends) - set(ALL_BACKENDS)
+    if unknown:
+        parser.error(f"Backends inconnus: {', '.join(sorted(unknown))}")
+
+    print("="*60)
+    print("⚡ BENCHMARK BASES VECTORIELLES")
+    print("="*60)
+
+    runs = []
+    if args.corpus:
+        runs.append(run_scale("corpus", corpus_embeddings(args.corpus, args.model), backends, args.queries, args.top_k))
+
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        vectors = synthetic_embeddings(size, args.dim)
+        runs.append(run_scale(f"synthetic-{size}", vectors, backends, args.queries, args.top_k))
+        del vectors
+
+    report = {
+        'metadata': {
+            'date': datetime.now().isoformat(),
+            'top_k': args.top_k,
+            'num_queries': args.queries
+        },
+        'runs': runs
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n💾 Résultats sauvegardés: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+CHECK CHUNK TOKENS - Culture Burkinabè RAG
+Vérifie avec le tokenizer réel du modèle d'embeddings qu'aucun chunk n'est
+tronqué à l'encodage: embedding_text(titre, contenu), tokens spéciaux
+compris, doit tenir dans max_tokens
+
+Usage:
+    python evaluation/check_chunk_tokens.py --corpus data/processed/corpus_cleaned.json
+
+Code de sortie 1 si au moins un chunk dépasse la limite.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict
+
+import numpy as np
+
+sys.path.append('.')
+from src.chunker import embedding_text, load_tokenizer
+from src.data_preprocessing import load_corpus
+
+
+def check(corpus, tokenizer, max_tokens: int, batch_size: int = 256) -> Dict:
+    lengths = []
+    over = []
+    for start in range(0, len(corpus), batch_size):
+        chunks = [corpus[i] for i in range(start, min(start + batch_size, len(corpus)))]
+        encoded = tokenizer([embedding_text(chunk['title'], chunk['content']) for chunk in chunks],
+                            add_special_tokens=True)['input_ids']
+        for chunk, input_ids in zip(chunks, encoded):
+            lengths.append(len(input_ids))
+            if len(input_ids) > max_tokens:
+                over.append({'id': chunk['id'], 'tokens': len(input_ids)})
+
+    lengths = np.array(lengths or [0])
+    return {
+        'chunks': len(corpus),
+        'max_tokens': max_tokens,
+        'longest': int(lengths.max()),
+        'p50': int(np.percentile(lengths, 50)),
+        'p95': int(np.percentile(lengths, 95)),
+        'over_limit': len(over),
+        'examples': sorted(over, key=lambda item: -item['tokens'])[:10]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Longueur encodée des chunks (tokenizer du modèle d'embeddings)")
+    parser.add_argument("--corpus", default="data/processed/corpus_cleaned.json")
+    parser.add_argument("--model", default="paraphrase-multilingual-MiniLM-L12-v2")
+    parser.add_argument("--max-tokens", type=int, default=128, help="Longueur maximale de séquence du modèle")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    print(f"🔤 Tokenizer: {args.model} | {len(corpus)} chunks")
+    report = check(corpus, load_tokenizer(args.model), args.max_tokens)
+
+    print(f"📏 Tokens encodés: p50 {report['p50']} | p95 {report['p95']} | max {report['longest']} "
+          f"(limite: {report['max_tokens']})")
+    if report['over_limit']:
+        print(f"❌ {report['over_limit']} chunks tronqués à l'encodage, par exemple:")
+        print(json.dumps(report['examples'], ensure_ascii=False, indent=2))
+        sys.exit(1)
+    print("✅ Aucun chunk ne dépasse la limite")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,29 +3,83 @@ SYSTÈME D'ÉVALUATION - Culture Burkinabè RAG
 Évaluation automatique avec 20 questions test
 """
 
+import argparse
 import json
+import os
+import random
+import threading
 import time
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Tuple
 import numpy as np
 from datetime import datetime
 import sys
 
 sys.path.append('.')
 from src.rag_pipeline import CultureRAGPipeline
+from src.llm_manager import LLMError, LLMUnavailableError
+
+
+class TokenBucket:
+    """
+    Limiteur de débit partagé entre threads: `rate` appels par seconde en
+    moyenne, jusqu'à `burst` appels d'affilée après une période calme
+    
+    rate=None ou 0: pas de limite.
+    """
+    
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Attend qu'un jeton soit disponible et le consomme"""
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
 
 
 class RAGEvaluator:
     """Évaluateur pour le système RAG"""
     
-    def __init__(self, rag_pipeline: CultureRAGPipeline, test_file: str):
+    def __init__(
+        self,
+        rag_pipeline: CultureRAGPipeline,
+        test_file: str,
+        rate: Optional[float] = 2.0,
+        burst: int = 1,
+        max_retries: int = 2,
+        retry_backoff: float = 2.0
+    ):
         """
         Args:
             rag_pipeline: Pipeline RAG à évaluer
             test_file: Fichier JSON avec questions test
+            rate: Questions envoyées au LLM par seconde (None: sans limite)
+            burst: Questions envoyées d'affilée au-delà du débit moyen
+            max_retries: Nouvelles tentatives d'une question si le LLM est
+                indisponible (en plus de celles du client LLM)
+            retry_backoff: Attente avant la première nouvelle tentative
+                (secondes, doublée à chaque tentative)
         """
         self.rag = rag_pipeline
         self.test_file = test_file
         self.results = []
+        self.rate_limiter = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
     
     def calculate_retrieval_precision(self, retrieved_docs: List[Dict], expected_keywords: List[str]) -> float:
         """
@@ -95,43 +149,73 @@ class RAGEvaluator:
         
         return min(5.0, score)
     
-    def evaluate_single_question(self, test_case: Dict, use_local_llm: bool = False) -> Dict:
+    def answer_with_retries(self, question: str, use_local_llm: bool) -> Tuple[Optional[Dict], Optional[LLMError], int]:
+        """
+        Réponse du pipeline, sous le limiteur de débit, avec nouvelles
+        tentatives (attente exponentielle) si le LLM est indisponible
+        
+        Returns:
+            (résultat ou None, dernière erreur LLM ou None, nombre de tentatives)
+        """
+        for attempt in range(1, self.max_retries + 2):
+            self.rate_limiter.acquire()
+            try:
+                return self.rag.answer_question(query=question, use_local_llm=use_local_llm, verbose=False), None, attempt
+            except LLMUnavailableError as e:
+                if attempt > self.max_retries:
+                    return None, e, attempt
+                delay = self.retry_backoff * 2 ** (attempt - 1)
+                time.sleep(delay * random.uniform(0.5, 1.5))
+            except LLMError as e:
+                return None, e, attempt
+    
+    def evaluate_single_question(self, test_case: Dict, use_local_llm: bool = False, verbose: bool = True) -> Dict:
         """
         Évaluation d'une seule question
         
         Args:
             test_case: Dictionnaire avec question, expected_answer, keywords
             use_local_llm: Utiliser LLM local ou HuggingFace
+            verbose: Afficher le détail (une ligne de progression sinon)
         
         Returns:
-            Résultats de l'évaluation
+            Résultats de l'évaluation ('failed': True si le LLM n'a pas
+            répondu malgré les nouvelles tentatives: retrieval seul évalué)
         """
         question = test_case['question']
         expected_answer = test_case['expected_answer']
         keywords = test_case.get('keywords', [])
         
-        print(f"\n❓ Question: {question}")
+        if verbose:
+            print(f"\n❓ Question: {question}")
         
         # Obtenir la réponse
         start_time = time.time()
-        result = self.rag.answer_question(
-            query=question,
-            use_local_llm=use_local_llm,
-            verbose=False
-        )
-        response_time = time.time() - start_time
-        
-        # Calculer les métriques
+        result, error, attempts = self.answer_with_retries(question, use_local_llm)
+        if error is None:
+            # Temps du pipeline (dernière tentative), attente du limiteur exclue
+            response_time = result['response_time']
+        else:
+            # LLM indisponible: on évalue quand même le retrieval
+            result = {
+                'answer': f"❌ {str(error)}",
+                'sources': self.rag.retrieve(question)
+            }
+            response_time = time.time() - start_time
+        
+        # Calculer les métriques (pas de pertinence pour un message d'erreur)
         retrieval_precision = self.calculate_retrieval_precision(
             result['sources'],
             keywords
         )
         
-        answer_relevance = self.calculate_answer_relevance(
-            result['answer'],
-            expected_answer,
-            question
-        )
+        answer_relevance = None
+        if error is None:
+            answer_relevance = self.calculate_answer_relevance(
+                result['answer'],
+                expected_answer,
+                question
+            )
         
         evaluation = {
             'question': question,
@@ -141,19 +225,62 @@ class RAGEvaluator:
             'answer_relevance': answer_relevance,
             'response_time': response_time,
             'num_sources': len(result['sources']),
-            'sources': result['sources']
+            'sources': result['sources'],
+            'attempts': attempts,
+            'failed': error is not None
         }
+        if error is not None:
+            evaluation['error'] = f"{type(error).__name__}: {error}"
         
-        print(f"  ✅ Précision Retrieval: {retrieval_precision*100:.1f}%")
-        print(f"  ✅ Pertinence Réponse: {answer_relevance:.1f}/5")
-        print(f"  ⏱️ Temps: {response_time:.2f}s")
+        if verbose:
+            print(f"  ✅ Précision Retrieval: {retrieval_precision*100:.1f}%")
+            if error is None:
+                print(f"  ✅ Pertinence Réponse: {answer_relevance:.1f}/5")
+            else:
+                print(f"  ❌ Échec LLM après {attempts} tentatives: {evaluation['error']}")
+            print(f"  ⏱️ Temps: {response_time:.2f}s")
         
         return evaluation
     
-    def run_full_evaluation(self, use_local_llm: bool = False) -> Dict:
+    @staticmethod
+    def load_checkpoint(checkpoint_file: str) -> Dict[str, Dict]:
+        """
+        Évaluations déjà terminées (une ligne JSON par question), indexées
+        par question; une dernière ligne tronquée par une interruption et les
+        évaluations en échec (à refaire) sont ignorées
+        """
+        done = {}
+        if not checkpoint_file or not os.path.exists(checkpoint_file):
+            return done
+        with open(checkpoint_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    evaluation = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not evaluation.get('failed') and 'error' not in evaluation:
+                    evaluation.setdefault('failed', False)
+                    done[evaluation['question']] = evaluation
+        return done
+    
+    def run_full_evaluation(
+        self,
+        use_local_llm: bool = False,
+        concurrency: int = 1,
+        checkpoint_file: str = None,
+        resume: bool = True
+    ) -> Dict:
         """
         Évaluation complète avec toutes les questions test
         
+        Args:
+            concurrency: Questions évaluées en parallèle (le débit reste
+                borné par le limiteur et par HF_MAX_CONCURRENCY/OLLAMA_MAX_CONCURRENCY)
+            checkpoint_file: Fichier JSONL où chaque évaluation réussie est
+                ajoutée dès qu'elle est terminée
+            resume: Reprendre les questions déjà présentes dans le checkpoint
+                (False: le checkpoint est vidé)
+        
         Returns:
             Résultats agrégés + détails
         """
@@ -167,21 +294,59 @@ class RAGEvaluator:
         
         print(f"\n📋 {len(test_cases)} questions test chargées\n")
         
-        # Évaluer chaque question
-        results = []
-        for i, test_case in enumerate(test_cases, 1):
-            print(f"\n[{i}/{len(test_cases)}]")
-            result = self.evaluate_single_question(test_case, use_local_llm)
-            results.append(result)
-            time.sleep(0.5)  # Pause pour éviter rate limiting
+        if checkpoint_file and not resume and os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+        done = self.load_checkpoint(checkpoint_file)
         
-        # Calcul des métriques agrégées
+        results = [done.get(test_case['question']) for test_case in test_cases]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if len(pending) < len(test_cases):
+            print(f"♻️ Reprise: {len(test_cases) - len(pending)} questions déjà évaluées ({checkpoint_file})")
+        
+        # Évaluer les questions restantes (une ligne de checkpoint par évaluation réussie)
+        checkpoint = open(checkpoint_file, 'a', encoding='utf-8') if checkpoint_file else None
+        verbose = concurrency <= 1
+        start_time = time.time()
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="rag-eval") as executor:
+                futures = {
+                    executor.submit(self.evaluate_single_question, test_cases[i], use_local_llm, verbose): i
+                    for i in pending
+                }
+                for completed, future in enumerate(as_completed(futures), 1):
+                    i = futures[future]
+                    result = future.result()
+                    results[i] = result
+                    
+                    # Une question en échec n'est pas sauvegardée: une reprise la réévalue
+                    if checkpoint and not result['failed']:
+                        checkpoint.write(json.dumps(result, ensure_ascii=False) + "\n")
+                        checkpoint.flush()
+                    
+                    if not verbose:
+                        relevance = 'échec LLM' if result['failed'] else f"{result['answer_relevance']:.1f}/5"
+                        print(f"[{completed}/{len(pending)}] {'❌' if result['failed'] else '✅'} {result['question'][:50]} "
+                              f"(retrieval {result['retrieval_precision']*100:.0f}%, "
+                              f"{relevance}, {result['response_time']:.2f}s)")
+        finally:
+            if checkpoint:
+                checkpoint.close()
+        
+        elapsed_time = time.time() - start_time
+        # Questions sans réponse du LLM: comptées à part, hors métriques de réponse
+        answered = [r for r in results if not r['failed']]
+        num_failed = len(results) - len(answered)
+        if pending:
+            print(f"\n⚡ {len(pending)} questions évaluées en {elapsed_time:.1f}s "
+                  f"({len(pending) / elapsed_time:.2f} questions/s, {num_failed} en échec)")
+        
+        # Calcul des métriques agrégées (le retrieval est évalué même en cas d'échec du LLM)
         avg_retrieval_precision = np.mean([r['retrieval_precision'] for r in results])
-        avg_answer_relevance = np.mean([r['answer_relevance'] for r in results])
-        avg_response_time = np.mean([r['response_time'] for r in results])
+        avg_answer_relevance = np.mean([r['answer_relevance'] for r in answered]) if answered else 0.0
+        avg_response_time = np.mean([r['response_time'] for r in answered]) if answered else 0.0
         
         # Distribution des scores
-        relevance_scores = [r['answer_relevance'] for r in results]
+        relevance_scores = [r['answer_relevance'] for r in answered]
         score_distribution = {
             'excellent (4-5)': sum(1 for s in relevance_scores if s >= 4),
             'bon (3-4)': sum(1 for s in relevance_scores if 3 <= s < 4),
@@ -194,7 +359,14 @@ class RAGEvaluator:
             'metadata': {
                 'evaluation_date': datetime.now().isoformat(),
                 'total_questions': len(test_cases),
-                'llm_used': 'Local (Ollama)' if use_local_llm else 'HuggingFace API'
+                'llm_used': 'Local (Ollama)' if use_local_llm else 'HuggingFace API',
+                'concurrency': concurrency,
+                'rate_limit': self.rate_limiter.rate,
+                'evaluated_this_run': len(pending),
+                'resumed_from_checkpoint': len(test_cases) - len(pending),
+                'answered': len(answered),
+                'failed': num_failed,
+                'wall_time': round(elapsed_time, 2)
             },
             'aggregate_metrics': {
                 'avg_retrieval_precision': round(avg_retrieval_precision, 3),
@@ -211,12 +383,14 @@ class RAGEvaluator:
         print("📊 RÉSULTATS D'ÉVALUATION")
         print("="*60)
         print(f"\n🎯 Précision Retrieval (moyenne): {avg_retrieval_precision*100:.1f}%")
-        print(f"💬 Pertinence Réponse (moyenne): {avg_answer_relevance:.2f}/5")
+        print(f"💬 Pertinence Réponse (moyenne): {avg_answer_relevance:.2f}/5 ({len(answered)} réponses)")
         print(f"⏱️ Temps Réponse (moyenne): {avg_response_time:.2f}s")
+        if num_failed:
+            print(f"❌ Questions en échec (LLM indisponible, hors métriques de réponse): {num_failed}")
         
         print(f"\n📈 Distribution des scores:")
         for category, count in score_distribution.items():
-            print(f"  - {category}: {count} questions ({count/len(test_cases)*100:.1f}%)")
+            print(f"  - {category}: {count} questions ({count/max(len(answered), 1)*100:.1f}%)")
         
         print("\n" + "="*60)
         
@@ -246,12 +420,13 @@ class RAGEvaluator:
 | **Précision Retrieval** | {results['aggregate_metrics']['avg_retrieval_precision_percent']}% |
 | **Pertinence Réponse** | {results['aggregate_metrics']['avg_answer_relevance']}/5 |
 | **Temps de Réponse** | {results['aggregate_metrics']['avg_response_time']}s |
+| **Questions en échec** | {results['metadata']['failed']} (hors pertinence et temps de réponse) |
 
 ## 📈 Distribution des Scores de Pertinence
 
 """
         for category, count in results['aggregate_metrics']['score_distribution'].items():
-            percent = count / results['metadata']['total_questions'] * 100
+            percent = count / max(results['metadata']['answered'], 1) * 100
             report += f"- **{category}**: {count} questions ({percent:.1f}%)\n"
         
         report += "\n---\n\n## 📝 Résultats Détaillés\n\n"
@@ -266,7 +441,7 @@ class RAGEvaluator:
 
 **Métriques:**
 - Précision Retrieval: {result['retrieval_precision']*100:.1f}%
-- Pertinence: {result['answer_relevance']:.1f}/5
+- Pertinence: {'échec LLM' if result['failed'] else f"{result['answer_relevance']:.1f}/5"}
 - Temps: {result['response_time']:.2f}s
 - Sources: {result['num_sources']}
 
@@ -389,31 +564,65 @@ def create_test_questions():
     return test_questions
 
 
+DEFAULT_TEST_FILE = "evaluation/test_questions.json"
+
+
 if __name__ == "__main__":
-    # Créer les questions test
-    print("📝 Création des questions test...")
-    test_questions = create_test_questions()
-    
-    # Sauvegarder
-    with open("evaluation/test_questions.json", 'w', encoding='utf-8') as f:
-        json.dump(test_questions, f, ensure_ascii=False, indent=2)
+    parser = argparse.ArgumentParser(description="Évaluation du système RAG")
+    parser.add_argument("--questions", default=DEFAULT_TEST_FILE, help="Fichier JSON des questions test")
+    parser.add_argument("--corpus", default="data/processed/corpus_cleaned.json")
+    parser.add_argument("--local-llm", action="store_true", help="Ollama local au lieu de l'API HuggingFace")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv('EVAL_CONCURRENCY', '4')),
+                        help="Questions évaluées en parallèle")
+    parser.add_argument("--rate", type=float, default=float(os.getenv('EVAL_RATE', '2')),
+                        help="Questions par seconde (0: sans limite)")
+    parser.add_argument("--burst", type=int, default=None, help="Rafale autorisée (défaut: --concurrency)")
+    parser.add_argument("--retries", type=int, default=int(os.getenv('EVAL_MAX_RETRIES', '2')),
+                        help="Nouvelles tentatives si le LLM est indisponible")
+    parser.add_argument("--checkpoint", default="evaluation/checkpoint.jsonl",
+                        help="Checkpoint JSONL des évaluations terminées (vide pour désactiver)")
+    parser.add_argument("--fresh", action="store_true", help="Ignorer le checkpoint existant")
+    parser.add_argument("--output", default="evaluation/results.json")
+    parser.add_argument("--report", default="evaluation/RAPPORT_EVALUATION.md")
+    args = parser.parse_args()
     
-    print(f"✅ {len(test_questions)} questions test créées")
+    if args.questions == DEFAULT_TEST_FILE:
+        # Créer les questions test
+        print("📝 Création des questions test...")
+        test_questions = create_test_questions()
+        
+        # Sauvegarder
+        with open(DEFAULT_TEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(test_questions, f, ensure_ascii=False, indent=2)
+        
+        print(f"✅ {len(test_questions)} questions test créées")
     
     # Initialiser le RAG
     print("\n🚀 Initialisation du pipeline RAG...")
     rag = CultureRAGPipeline(
-        corpus_file="data/processed/corpus_cleaned.json"
+        corpus_file=args.corpus
     )
     
     # Créer l'évaluateur
-    evaluator = RAGEvaluator(rag, "evaluation/test_questions.json")
+    evaluator = RAGEvaluator(
+        rag,
+        args.questions,
+        rate=args.rate or None,
+        burst=args.burst or args.concurrency,
+        max_retries=args.retries
+    )
     
     # Lancer l'évaluation
-    results = evaluator.run_full_evaluation(use_local_llm=False)
+    results = evaluator.run_full_evaluation(
+        use_local_llm=args.local_llm,
+        concurrency=args.concurrency,
+        checkpoint_file=args.checkpoint or None,
+        resume=not args.fresh
+    )
     
     # Sauvegarder les résultats
-    evaluator.save_results(results, "evaluation/results.json")
-    evaluator.generate_report(results, "evaluation/RAPPORT_EVALUATION.md")
+    rag.query_cache.save()
+    evaluator.save_results(results, args.output)
+    evaluator.generate_report(results, args.report)
     
     print("\n✅ Évaluation terminée!")
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+LOAD TEST - Culture Burkinabè RAG
+Débit de bout en bout de l'API face à un LLM simulé (src/llm_stub_server.py):
+résultats reproductibles, sans réseau ni limite de débit d'un fournisseur
+
+Usage:
+    # Serveur LLM de test et API lancés par le script (corpus déjà indexé)
+    python evaluation/load_test.py --mock --spawn-api --concurrency 1 8 32 --requests 200 \\
+        --latency lognormal:0.8,0.4 --token-rate 40 --reply-tokens 150 --error-429 0.02
+
+    # API déjà lancée (avec LLM_MOCK_URL, ou un vrai backend)
+    python evaluation/load_test.py --url http://localhost:8000 --endpoint /ask/stream
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+sys.path.append('.')
+from src.llm_stub_server import add_stub_arguments, stub_from_arguments
+
+ENDPOINTS = ('/ask', '/ask/stream', '/retrieve')
+
+
+def percentile_ms(latencies: List[float], p: float) -> float:
+    return round(float(np.percentile(latencies, p)) * 1000, 3)
+
+
+def summarize(latencies: List[float]) -> Optional[Dict]:
+    if not latencies:
+        return None
+    return {
+        'p50_ms': percentile_ms(latencies, 50),
+        'p95_ms': percentile_ms(latencies, 95),
+        'p99_ms': percentile_ms(latencies, 99),
+        'mean_ms': round(float(np.mean(latencies)) * 1000, 3)
+    }
+
+
+async def send_request(client: httpx.AsyncClient, endpoint: str, question: str) -> Dict:
+    """
+    Une requête: statut, durée totale et, en flux, temps du premier token
+    (un événement SSE 'error' compte comme échec)
+    """
+    start = time.perf_counter()
+    result = {'status': None, 'latency': None, 'ttft': None, 'error': None}
+    try:
+        if endpoint == '/ask/stream':
+            async with client.stream('POST', endpoint, json={'question': question}) as response:
+                result['status'] = response.status_code
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith('event:'):
+                        event = line[len('event:'):].strip()
+                    elif event == 'token' and result['ttft'] is None:
+                        result['ttft'] = time.perf_counter() - start
+                    elif event == 'error' and line.startswith('data:'):
+                        result['error'] = 'llm_error_event'
+        else:
+            response = await client.post(endpoint, json={'question': question})
+            result['status'] = response.status_code
+    except httpx.HTTPError as e:
+        result['error'] = type(e).__name__
+    result['latency'] = time.perf_counter() - start
+    return result
+
+
+async def run_level(url: str, endpoint: str, questions: List[str], concurrency: int, num_requests: int,
+                    timeout: float, unique: bool) -> Dict:
+    """`concurrency` clients en boucle fermée jusqu'à `num_requests` requêtes"""
+    results = []
+    next_index = 0
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal next_index
+        while next_index < num_requests:
+            index = next_index
+            next_index += 1
+            question = questions[index % len(questions)]
+            if unique:
+                question = f"{question} ({index})"
+            results.append(await send_request(client, endpoint, question))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        wall_time = time.perf_counter() - start
+
+    ok = [r for r in results if r['status'] == 200 and r['error'] is None]
+    return {
+        'concurrency': concurrency,
+        'requests': len(results),
+        'ok': len(ok),
+        'statuses': {str(status): count for status, count in Counter(r['status'] for r in results).items()},
+        'errors': dict(Counter(r['error'] for r in results if r['error'])),
+        'wall_time_s': round(wall_time, 3),
+        'throughput_rps': round(len(results) / wall_time, 2),
+        'goodput_rps': round(len(ok) / wall_time, 2),
+        'latency': summarize([r['latency'] for r in ok]),
+        'time_to_first_token': summarize([r['ttft'] for r in ok if r['ttft'] is not None])
+    }
+
+
+def spawn_api(port: int, llm_url: Optional[str], answer_cache: bool) -> subprocess.Popen:
+    """API lancée dans un sous-processus (uvicorn), LLM redirigé vers `llm_url`"""
+    env = dict(os.environ)
+    if llm_url:
+        env['LLM_MOCK_URL'] = llm_url
+    if not answer_cache:
+        # Sans cache sémantique, chaque requête va jusqu'au LLM
+        env['ANSWER_CACHE_SIZE'] = '0'
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api:app', '--app-dir', 'src',
+         '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        env=env
+    )
+
+
+def wait_ready(url: str, timeout: float, process: subprocess.Popen = None):
+    """Attente de /ready (chargement du modèle, de l'index et échauffement)"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"L'API s'est arrêtée (code {process.returncode})")
+        try:
+            if httpx.get(f"{url}/ready", timeout=5).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(1)
+    raise TimeoutError(f"API non prête après {timeout}s: {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de l'API RAG")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API déjà lancée (ignoré avec --spawn-api)")
+    parser.add_argument("--endpoint", default="/ask", choices=ENDPOINTS)
+    parser.add_argument("--questions", default="evaluation/test_questions.json")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes par niveau de concurrence")
+    parser.add_argument("--warmup", type=int, default=5, help="Requêtes non mesurées avant le premier niveau")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Timeout d'une requête (s)")
+    parser.add_argument("--no-unique", dest="unique", action="store_false",
+                        help="Ne pas numéroter les questions (les caches de questions peuvent servir)")
+    parser.add_argument("--mock", action="store_true", help="Lancer le serveur LLM de test dans ce processus")
+    parser.add_argument("--mock-port", type=int, default=0)
+    parser.add_argument("--spawn-api", action="store_true", help="Lancer l'API (uvicorn) branchée sur le LLM de test")
+    parser.add_argument("--api-port", type=int, default=8765)
+    parser.add_argument("--answer-cache", action="store_true", help="Garder le cache sémantique des réponses (--spawn-api)")
+    parser.add_argument("--ready-timeout", type=float, default=600.0)
+    parser.add_argument("--output", default="evaluation/load_test.json")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    with open(args.questions, 'r', encoding='utf-8') as f:
+        questions = [item['question'] for item in json.load(f)]
+
+    stub = stub_from_arguments(args, port=args.mock_port) if args.mock else None
+    api_process = None
+    url = args.url
+
+    print("="*60)
+    print("🏋️ TEST DE CHARGE DE L'API")
+    print("="*60)
+
+    try:
+        if stub is not None:
+            stub.start()
+            print(f"🧪 LLM de test: {stub.base_url} (latence: {args.latency or 'aucune'}, "
+                  f"{args.token_rate or '-'} tokens/s, graine {args.seed})")
+
+        if args.spawn_api:
+            url = f"http://127.0.0.1:{args.api_port}"
+            api_process = spawn_api(args.api_port, stub.base_url if stub else None, args.answer_cache)
+            print(f"🚀 API lancée sur {url}, attente de /ready...")
+        wait_ready(url, args.ready_timeout, api_process)
+
+        if args.warmup:
+            asyncio.run(run_level(url, args.endpoint, questions, 1, args.warmup, args.timeout, args.unique))
+
+        levels = []
+        for concurrency in args.concurrency:
+            stats = asyncio.run(run_level(url, args.endpoint, questions, concurrency, args.requests,
+                                          args.timeout, args.unique))
+            levels.append(stats)
+            latency = stats['latency'] or {}
+            print(f"  ⚙️ {concurrency:>3} clients: {stats['goodput_rps']:>7.2f} req/s réussies | "
+                  f"p50 {latency.get('p50_ms', '-')} ms | p95 {latency.get('p95_ms', '-')} ms | "
+                  f"statuts {stats['statuses']}")
+
+        report = {
+            'metadata': {
+                'date': datetime.now().isoformat(),
+                'url': url,
+                'endpoint': args.endpoint,
+                'requests_per_level': args.requests,
+                'unique_questions': args.unique,
+                'answer_cache': args.answer_cache if args.spawn_api else None,
+                'cpu_count': os.cpu_count()
+            },
+            'mock_llm': stub.stats() if stub else None,
+            'levels': levels
+        }
+    finally:
+        if api_process is not None:
+            api_process.terminate()
+            api_process.wait(timeout=30)
+        if stub is not None:
+            stub.stop()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n💾 Résultats sauvegardés: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
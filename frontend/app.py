@@ -3,6 +3,7 @@ INTERFACE STREAMLIT - Culture Burkinabè RAG
 Interface utilisateur interactive et moderne
 """
 
+import os
 import streamlit as st
 import sys
 import time
@@ -84,13 +85,13 @@ def load_rag_pipeline():
     """Chargement du pipeline RAG (mis en cache)"""
     with st.spinner("🔄 Chargement du système RAG..."):
         rag = CultureRAGPipeline(
-            corpus_file="data/processed/corpus_cleaned.json",
+            corpus_file=os.getenv('CORPUS_FILE', "data/processed/corpus_cleaned.json"),
             top_k=5
         )
         
-        # Vérifier la collection et indexer si nécessaire
+        # Vérifier l'index et indexer si nécessaire
         try:
-            if rag.collection is None or rag.collection.count() == 0:
+            if rag.vector_store.count() == 0:
                 st.info("⚙️ Indexation du corpus en cours...")
                 rag.index_corpus()
         except Exception as e:
@@ -181,8 +182,8 @@ def main():
         try:
             rag = load_rag_pipeline()
             
-            total_docs = rag.collection.count()
-            total_articles = len(set([doc['article_id'] for doc in rag.corpus]))
+            total_docs = rag.vector_store.count()
+            total_articles = rag.count_articles()
             
             st.metric("📚 Articles", total_articles)
             st.metric("📄 Chunks indexés", total_docs)
@@ -196,7 +197,7 @@ def main():
         st.markdown("### 🔧 Technologies")
         st.markdown("""
         - **Embeddings:** sentence-transformers
-        - **Vector DB:** ChromaDB
+        - **Vector DB:** ChromaDB / FAISS
         - **LLM:** Mistral-7B
         - **Backend:** FastAPI
         - **Frontend:** Streamlit
@@ -261,18 +262,24 @@ def main():
                 # Mise à jour du top_k si modifié
                 rag.top_k = top_k
                 
-                # Obtenir la réponse
-                result = rag.answer_question(
-                    query=question,
-                    use_local_llm=use_local,
-                    verbose=False
-                )
-                
-                # Affichage de la réponse
+                # Affichage de la réponse au fil de la génération
                 st.markdown("---")
                 st.markdown('<div class="answer-box">', unsafe_allow_html=True)
                 st.markdown("### 💬 Réponse")
-                st.markdown(result['answer'])
+                answer_placeholder = st.empty()
+                
+                result = {'question': question, 'answer': ''}
+                for event in rag.answer_question_stream(query=question, use_local_llm=use_local):
+                    if event['type'] == 'sources':
+                        result['sources'] = event['sources']
+                        result['num_docs_retrieved'] = event['num_docs_retrieved']
+                    elif event['type'] == 'token':
+                        result['answer'] += event['text']
+                        answer_placeholder.markdown(result['answer'] + "▌")
+                    elif event['type'] == 'done':
+                        result['response_time'] = event['response_time']
+                
+                answer_placeholder.markdown(result['answer'])
                 st.markdown('</div>', unsafe_allow_html=True)
                 
                 st.markdown("---")
@@ -327,7 +327,7 @@ def main():
         print("="*60)
         print("\n📝 PROCHAINES ÉTAPES:")
         print("1. python src/data_preprocessing.py")
-        print("2. python -c \"from src.rag_pipeline import CultureRAGPipeline; rag = CultureRAGPipeline('data/processed/corpus_cleaned.json'); rag.index_corpus()\"")
+        print("2. python -c \"from src.rag_pipeline import CultureRAGPipeline; rag = CultureRAGPipeline('data/processed/corpus_cleaned.json'); rag.index_corpus(incremental=True)\"")
         print("3. streamlit run frontend/app.py")
     else:
         print("\n⚠️ Aucun article extrait. Vérifiez les URLs.")
@@ -78,6 +78,8 @@ if exist "data\raw\culture_articles.json" (
     echo [INFO] Lancement du preprocessing...
     python src\data_preprocessing.py
     echo [OK] Preprocessing termine
+    python evaluation\check_chunk_tokens.py
+    if errorlevel 1 echo [ATTENTION] Des chunks depassent la longueur maximale du modele
 ) else (
     echo [ATTENTION] Fichier data\raw\culture_articles.json non trouve
     echo Veuillez placer vos donnees scrappees dans ce fichier
@@ -87,7 +89,7 @@ echo.
 REM Indexation
 echo [ETAPE 8] Indexation du corpus...
 if exist "data\processed\corpus_cleaned.json" (
-    python -c "from src.rag_pipeline import CultureRAGPipeline; rag = CultureRAGPipeline('data/processed/corpus_cleaned.json'); rag.index_corpus() if rag.collection is None or rag.collection.count() == 0 else print('Corpus deja indexe')"
+    python -c "from src.rag_pipeline import CultureRAGPipeline; rag = CultureRAGPipeline('data/processed/corpus_cleaned.json'); rag.index_corpus() if rag.vector_store.count() == 0 else print('Corpus deja indexe')"
     echo [OK] Indexation terminee
 ) else (
     echo [ATTENTION] Corpus nettoye non trouve
@@ -117,6 +117,13 @@ if [ -f "data/raw/culture_articles.json" ]; then
     print_info "Lancement du preprocessing..."
     python src/data_preprocessing.py
     print_success "Preprocessing terminé"
+    
+    # Chunks encodés sans troncature (tokenizer du modèle d'embeddings)
+    if python evaluation/check_chunk_tokens.py; then
+        print_success "Longueur des chunks vérifiée"
+    else
+        print_warning "Des chunks dépassent la longueur maximale du modèle (tronqués à l'encodage)"
+    fi
 else
     print_warning "Fichier data/raw/culture_articles.json non trouvé"
     print_info "Veuillez placer vos données scrappées dans ce fichier"
@@ -132,7 +139,7 @@ if [ -f "data/processed/corpus_cleaned.json" ]; then
     python -c "
 from src.rag_pipeline import CultureRAGPipeline
 rag = CultureRAGPipeline('data/processed/corpus_cleaned.json')
-if rag.collection is None or rag.collection.count() == 0:
+if rag.vector_store.count() == 0:
     print('Indexation en cours...')
     rag.index_corpus()
     print('Indexation terminée!')
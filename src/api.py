@@ -5,11 +5,29 @@ Backend REST API pour le système RAG
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+import functools
+import importlib
+import json
+import os
+import threading
+import time
+import traceback
 import uvicorn
 
-from rag_pipeline import CultureRAGPipeline
+from llm_manager import LLMError, LLMConfigError, LLMUnavailableError
+from metadata_filter import MetadataFilter
+from metrics import REQUEST_DURATION, REQUESTS, render, render_gauges, start_trace
+
+# Le pipeline (torch, sentence-transformers, chromadb) est importé en arrière-plan
+# au démarrage: le serveur écoute dès le lancement
+if TYPE_CHECKING:
+    from rag_pipeline import CultureRAGPipeline
 
 # Initialisation de l'app
 app = FastAPI(
@@ -29,33 +47,253 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialisation du pipeline RAG (une seule fois au démarrage)
-rag_pipeline: Optional[CultureRAGPipeline] = None
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialisation au démarrage du serveur"""
-    global rag_pipeline
-    print("🚀 Démarrage de l'API...")
+class MetricsMiddleware:
+    """Durée (jusqu'aux en-têtes) et code de statut de chaque requête HTTP, par endpoint"""
     
-    rag_pipeline = CultureRAGPipeline(
-        corpus_file="data/processed/corpus_cleaned.json",
-        top_k=5
-    )
+    def __init__(self, app):
+        self.app = app
+        self.endpoints = None
     
-    # Vérifier si le corpus est indexé
-    if rag_pipeline.collection is None or rag_pipeline.collection.count() == 0:
-        print("⚠️ Corpus non indexé. Indexation en cours...")
-        rag_pipeline.index_corpus()
+    def endpoint(self, path: str) -> str:
+        # Chemins des routes uniquement: pas une série par URL inconnue
+        if self.endpoints is None:
+            self.endpoints = {route.path for route in app.routes}
+        return path if path in self.endpoints else "other"
     
-    print("✅ API prête!")
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        
+        endpoint = self.endpoint(scope["path"])
+        start = time.perf_counter()
+        status = {"code": 500}
+        
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                REQUEST_DURATION.observe(time.perf_counter() - start, endpoint=endpoint)
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            REQUESTS.inc(endpoint=endpoint, status=status["code"])
+
+
+app.add_middleware(MetricsMiddleware)
+
+# Pipeline RAG, disponible une fois le démarrage en arrière-plan terminé
+rag_pipeline: Optional["CultureRAGPipeline"] = None
+
+
+class QueueFullError(Exception):
+    """File d'attente du pool de workers pleine"""
+
+
+class BoundedWorkerPool:
+    """
+    Pool de threads borné pour les appels bloquants du pipeline
+    (encodage, requêtes ChromaDB, appels LLM).
+
+    Au-delà de max_workers + max_queue tâches en cours, les nouvelles
+    requêtes sont refusées (QueueFullError) au lieu de s'accumuler.
+    """
+    
+    def __init__(self, max_workers: int = 4, max_queue: int = 16):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="rag-worker"
+        )
+        # pending est décrémenté par le thread qui termine la tâche
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+    
+    def _task_done(self, future):
+        with self._lock:
+            self.pending -= 1
+    
+    async def run(self, func, *args, **kwargs):
+        """Exécute func dans le pool sans bloquer la boucle d'événements"""
+        with self._lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise QueueFullError()
+            self.pending += 1
+        
+        # Contexte copié: la trace de la requête suit l'appel dans le thread
+        context = contextvars.copy_context()
+        future = self.executor.submit(functools.partial(context.run, func, *args, **kwargs))
+        # Une tâche compte tant que son thread tourne, même si la requête
+        # qui l'attend est annulée (client déconnecté, timeout)
+        future.add_done_callback(self._task_done)
+        return await asyncio.wrap_future(future)
+    
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(self.pending, self.max_workers),
+            "queued": max(0, self.pending - self.max_workers),
+            "rejected": self.rejected
+        }
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Pool de workers (configurable via .env)
+worker_pool = BoundedWorkerPool(
+    max_workers=int(os.getenv('RAG_WORKERS', '4')),
+    max_queue=int(os.getenv('RAG_MAX_QUEUE', '16'))
+)
+
+
+async def run_in_pool(func, *args, **kwargs):
+    """Exécution dans le pool avec réponse 503 si la file est pleine"""
+    try:
+        return await worker_pool.run(func, *args, **kwargs)
+    except QueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Serveur surchargé, réessayez dans quelques secondes",
+            headers={"Retry-After": "5"}
+        )
+
+class StartupState:
+    """
+    Avancement du démarrage en arrière-plan (imports, corpus, modèle,
+    base vectorielle, indexation éventuelle, échauffement)
+    """
+    
+    def __init__(self):
+        self.started_at = time.time()
+        self.phase = "starting"
+        self.timings: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.ready = threading.Event()
+    
+    def run_phase(self, name: str, func, *args, **kwargs):
+        self.phase = name
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
+    
+    def stats(self) -> dict:
+        return {
+            "status": "ready" if self.ready.is_set() else ("failed" if self.error else "starting"),
+            "phase": self.phase,
+            "uptime": round(time.time() - self.started_at, 3),
+            "timings": self.timings,
+            "error": self.error
+        }
+
+
+startup_state = StartupState()
+
+
+def load_pipeline():
+    """Chargement complet du pipeline (thread dédié, hors boucle asyncio)"""
+    global rag_pipeline
+    
+    try:
+        module = startup_state.run_phase("imports", importlib.import_module, "rag_pipeline")
+        pipeline = startup_state.run_phase(
+            "pipeline",
+            module.CultureRAGPipeline,
+            corpus_file=os.getenv('CORPUS_FILE', "data/processed/corpus_cleaned.json"),
+            top_k=5
+        )
+        # Détail du chargement du pipeline (corpus, modèle, base vectorielle)
+        startup_state.timings.update(pipeline.startup_timings)
+        
+        # Vérifier si le corpus est indexé
+        if pipeline.vector_store.count() == 0:
+            print("⚠️ Corpus non indexé. Indexation en cours...")
+            startup_state.run_phase("indexing", pipeline.index_corpus)
+        
+        startup_state.run_phase("warmup", pipeline.warm_up)
+    except Exception as e:
+        startup_state.error = f"{type(e).__name__}: {e}"
+        startup_state.phase = "failed"
+        traceback.print_exc()
+        print(f"❌ Échec du démarrage: {startup_state.error}")
+        return
+    
+    rag_pipeline = pipeline
+    startup_state.phase = "ready"
+    startup_state.ready.set()
+    print(f"✅ API prête! ({time.time() - startup_state.started_at:.1f}s, phases: {startup_state.timings})")
+
+
+def get_pipeline() -> "CultureRAGPipeline":
+    """Pipeline prêt, sinon 503 (démarrage en cours ou en échec)"""
+    if rag_pipeline is None:
+        if startup_state.error:
+            raise HTTPException(status_code=503, detail=f"Échec du démarrage: {startup_state.error}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"Démarrage en cours ({startup_state.phase})",
+            headers={"Retry-After": "5"}
+        )
+    return rag_pipeline
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Démarrage du chargement du pipeline en arrière-plan (le serveur répond aussitôt)"""
+    print("🚀 Démarrage de l'API...")
+    threading.Thread(target=load_pipeline, name="rag-startup", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Arrêt propre du pool de workers et des connexions LLM"""
+    worker_pool.shutdown()
+    if rag_pipeline is not None:
+        rag_pipeline.query_cache.save()
+        if rag_pipeline.query_encoder is not None:
+            rag_pipeline.query_encoder.stop()
+        await rag_pipeline.llm_client.aclose()
 
 
 # Modèles Pydantic pour validation
-class QuestionRequest(BaseModel):
-    question: str
+class RetrievalOptions(BaseModel):
     top_k: Optional[int] = 5
     use_local_llm: Optional[bool] = False
+    # Recherche dense, BM25 (mots exacts) ou fusion des deux (défaut: RETRIEVAL_MODE)
+    retrieval_mode: Optional[Literal['dense', 'bm25', 'hybrid']] = None
+    # Pré-filtres évalués dans l'index: plage de dates (AAAA-MM-JJ, bornes incluses),
+    # catégories, articles
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    categories: Optional[List[str]] = None
+    article_ids: Optional[List[str]] = None
+    
+    def filters(self) -> Optional[MetadataFilter]:
+        """Filtres de la requête (None si aucun); 400 si une date est invalide"""
+        try:
+            filters = MetadataFilter(self.date_from, self.date_to, self.categories, self.article_ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return None if filters.is_empty() else filters
+
+class QuestionRequest(RetrievalOptions):
+    question: str
+    # Durée de chaque étape (ms) dans la réponse
+    include_timings: bool = False
+
+class BatchQuestionRequest(RetrievalOptions):
+    questions: List[str]
+    # Réponses en NDJSON, une ligne par question dès qu'elle est traitée
+    stream: bool = False
+    # Générations simultanées (défaut: BATCH_MAX_CONCURRENCY)
+    max_concurrency: Optional[int] = None
 
 class Source(BaseModel):
     title: str
@@ -69,6 +307,8 @@ class QuestionResponse(BaseModel):
     sources: List[Source]
     response_time: float
     num_docs_retrieved: int
+    cached: bool = False
+    timings: Optional[Dict[str, float]] = None
 
 
 # Routes de l'API
@@ -80,39 +320,103 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "ask": "/ask - Poser une question",
+            "ask_stream": "/ask/stream - Réponse en flux (Server-Sent Events)",
+            "ask_batch": "/ask/batch - Lot de questions (réponses ordonnées ou NDJSON)",
             "health": "/health - Vérifier le statut",
+            "live": "/live - Processus en vie (sonde de vivacité)",
+            "ready": "/ready - Pipeline chargé et échauffé (sonde de disponibilité)",
             "stats": "/stats - Statistiques du corpus",
+            "metrics": "/metrics - Métriques Prometheus",
             "docs": "/docs - Documentation Swagger"
         }
     }
 
+@app.get("/live")
+async def liveness():
+    """Le processus répond (indépendant du chargement du pipeline)"""
+    return {"status": "alive", "uptime": round(time.time() - startup_state.started_at, 3)}
+
+@app.get("/ready")
+async def readiness():
+    """Pipeline prêt à servir: 200, sinon 503 avec la phase de démarrage en cours"""
+    state = startup_state.stats()
+    if not startup_state.ready.is_set():
+        return JSONResponse(status_code=503, content=state, headers={"Retry-After": "5"})
+    return state
+
 @app.get("/health")
 async def health_check():
     """Vérification de santé de l'API"""
-    if rag_pipeline is None:
-        raise HTTPException(status_code=503, detail="RAG pipeline non initialisé")
+    rag_pipeline = get_pipeline()
     
     return {
         "status": "healthy",
-        "corpus_size": rag_pipeline.collection.count() if rag_pipeline.collection else 0,
+        "corpus_size": rag_pipeline.vector_store.count(),
         "model": "paraphrase-multilingual-MiniLM-L12-v2",
-        "vector_db": "ChromaDB"
+        "vector_db": rag_pipeline.vector_store.describe(),
+        "worker_pool": worker_pool.stats(),
+        "startup": startup_state.stats()
     }
 
 @app.get("/stats")
 async def get_stats():
     """Statistiques du corpus"""
-    if rag_pipeline is None:
-        raise HTTPException(status_code=503, detail="RAG pipeline non initialisé")
+    rag_pipeline = get_pipeline()
     
     return {
-        "total_documents": rag_pipeline.collection.count(),
-        "total_articles": len(set([doc['article_id'] for doc in rag_pipeline.corpus])),
+        "total_documents": rag_pipeline.vector_store.count(),
+        "total_articles": rag_pipeline.count_articles(),
         "collection_name": rag_pipeline.collection_name,
         "embedding_model": "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
-        "vector_database": "ChromaDB (Open Source)"
+        "vector_database": rag_pipeline.vector_store.describe(),
+        "query_encoder": rag_pipeline.query_encoder.stats() if rag_pipeline.query_encoder else None,
+        "query_embedding_cache": rag_pipeline.query_cache.stats(),
+        "answer_cache": rag_pipeline.answer_cache.stats()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Métriques au format texte Prometheus: histogrammes des étapes et des
+    requêtes, taux de succès des caches, files d'attente, appels LLM en cours
+    """
+    pool = worker_pool.stats()
+    lines = render_gauges("rag_ready", "Pipeline chargé et prêt (1) ou non (0)", {(): int(startup_state.ready.is_set())})
+    lines += render_gauges("rag_worker_pool_in_flight", "Tâches en cours dans le pool de workers", {(): pool["in_flight"]})
+    lines += render_gauges("rag_worker_pool_queued", "Tâches en attente d'un worker", {(): pool["queued"]})
+    lines += render_gauges("rag_worker_pool_rejected_total", "Requêtes refusées (file pleine, 503)",
+                           {(): pool["rejected"]}, kind="counter")
+    
+    if rag_pipeline is not None:
+        llm = rag_pipeline.llm_client.stats()
+        lines += render_gauges("rag_llm_in_flight", "Appels LLM en cours par backend",
+                               {(("backend", name),): s["in_flight"] for name, s in llm.items()})
+        lines += render_gauges("rag_llm_waiting", "Appels LLM en attente de la limite de concurrence",
+                               {(("backend", name),): s["waiting"] for name, s in llm.items()})
+        lines += render_gauges("rag_llm_max_concurrency", "Limite de concurrence par backend",
+                               {(("backend", name),): s["max_concurrency"] for name, s in llm.items()})
+        
+        caches = {"query_embedding": rag_pipeline.query_cache.stats(), "answer": rag_pipeline.answer_cache.stats()}
+        lines += render_gauges("rag_cache_hits_total", "Succès des caches",
+                               {(("cache", name),): s["hits"] for name, s in caches.items()}, kind="counter")
+        lines += render_gauges("rag_cache_misses_total", "Échecs des caches",
+                               {(("cache", name),): s["misses"] for name, s in caches.items()}, kind="counter")
+        lines += render_gauges("rag_cache_hit_ratio", "Taux de succès des caches",
+                               {(("cache", name),): s["hit_rate"] for name, s in caches.items()})
+        lines += render_gauges("rag_cache_entries", "Entrées des caches",
+                               {(("cache", name),): s["size"] for name, s in caches.items()})
+        
+        if rag_pipeline.query_encoder is not None:
+            encoder = rag_pipeline.query_encoder.stats()
+            lines += render_gauges("rag_query_encoder_queue_depth", "Questions en attente d'encodage",
+                                   {(): encoder["queue_depth"]})
+            lines += render_gauges("rag_query_encoder_batches_total", "Batchs encodés",
+                                   {(): encoder["total_batches"]}, kind="counter")
+        
+        lines += render_gauges("rag_documents", "Documents indexés", {(): rag_pipeline.vector_store.count()})
+    
+    return PlainTextResponse(render(lines), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/ask", response_model=QuestionResponse)
 async def ask_question(request: QuestionRequest):
     """
@@ -126,24 +430,216 @@ async def ask_question(request: QuestionRequest):
     Returns:
         Réponse avec sources et métadonnées
     """
-    if rag_pipeline is None:
-        raise HTTPException(status_code=503, detail="RAG pipeline non initialisé")
+    rag_pipeline = get_pipeline()
     
     if not request.question or len(request.question.strip()) == 0:
         raise HTTPException(status_code=400, detail="Question vide")
     
+    trace = start_trace()
     try:
-        # Traitement de la question
-        result = rag_pipeline.answer_question(
+        # Encodage micro-batché sur la boucle asyncio, puis traitement dans le pool
+        query_embedding = await rag_pipeline.aencode_query(request.question)
+        result = await run_in_pool(
+            rag_pipeline.answer_question,
             query=request.question,
             use_local_llm=request.use_local_llm,
-            verbose=False
+            verbose=False,
+            top_k=request.top_k,
+            retrieval_mode=request.retrieval_mode,
+            filters=request.filters(),
+            query_embedding=query_embedding
         )
         
+        if request.include_timings:
+            result = {**result, "timings": trace.breakdown_ms()}
         return result
     
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"LLM indisponible: {str(e)}", headers={"Retry-After": "30"})
+    except LLMConfigError as e:
+        raise HTTPException(status_code=500, detail=f"Configuration LLM: {str(e)}")
+    except LLMError as e:
+        raise HTTPException(status_code=502, detail=f"Erreur LLM: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur lors du traitement: {str(e)}")
+
+def sse_event(event: str, data: dict) -> str:
+    """Formatage d'un événement Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """
+    Poser une question avec réponse en flux (Server-Sent Events)
+    
+    Événements envoyés:
+        sources: documents retrouvés (envoyés avant la génération)
+        token: fragment de réponse ({"text": "..."})
+        done: fin de génération (temps total et temps du premier token)
+        error: erreur LLM survenue pendant le flux
+    """
+    rag_pipeline = get_pipeline()
+    
+    if not request.question or len(request.question.strip()) == 0:
+        raise HTTPException(status_code=400, detail="Question vide")
+    
+    start_time = time.time()
+    trace = start_trace()
+    
+    try:
+        query_embedding = await rag_pipeline.aencode_query(request.question)
+        retrieved_docs, query_embedding = await run_in_pool(
+            rag_pipeline.retrieve_with_embedding,
+            query=request.question,
+            top_k=request.top_k,
+            mode=request.retrieval_mode,
+            filters=request.filters(),
+            query_embedding=query_embedding
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur lors du traitement: {str(e)}")
+    
+    backend = rag_pipeline.llm_backend_name(request.use_local_llm)
+    chunk_ids = [doc['id'] for doc in retrieved_docs]
+    cached = rag_pipeline.answer_cache.get(query_embedding, chunk_ids, backend)
+    
+    async def cached_tokens():
+        yield cached['answer']
+    
+    async def event_stream():
+        yield sse_event("sources", {
+            "question": request.question,
+            "sources": rag_pipeline.format_sources(retrieved_docs),
+            "num_docs_retrieved": len(retrieved_docs)
+        })
+        
+        if cached:
+            tokens = cached_tokens()
+        else:
+            prompt = rag_pipeline.generate_prompt(request.question, retrieved_docs)
+            tokens = rag_pipeline.llm_client.astream(backend, prompt)
+        
+        answer_parts = []
+        time_to_first_token = None
+        try:
+            async for token in tokens:
+                if time_to_first_token is None:
+                    time_to_first_token = time.time() - start_time
+                answer_parts.append(token)
+                yield sse_event("token", {"text": token})
+        except LLMError as e:
+            yield sse_event("error", {"detail": str(e), "status_code": e.status_code})
+            return
+        
+        if not cached:
+            rag_pipeline.answer_cache.put(
+                query_embedding, chunk_ids, backend, request.question, "".join(answer_parts)
+            )
+        
+        done = {
+            "response_time": time.time() - start_time,
+            "time_to_first_token": time_to_first_token,
+            "cached": cached is not None
+        }
+        if request.include_timings:
+            done["timings"] = trace.breakdown_ms()
+        yield sse_event("done", done)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Taille maximale d'un lot de questions
+MAX_BATCH_SIZE = int(os.getenv('RAG_MAX_BATCH_SIZE', '500'))
+
+
+@app.post("/ask/batch")
+async def ask_batch(request: BatchQuestionRequest):
+    """
+    Poser un lot de questions
+    
+    Les questions sont encodées en une passe et recherchées en un seul
+    appel à la base vectorielle; les générations LLM partent en parallèle
+    (au plus max_concurrency à la fois).
+    
+    Returns:
+        stream=false: {"results": [...], ...} dans l'ordre des questions
+        stream=true: NDJSON, une ligne {"index": i, ...} par question dans
+            l'ordre d'achèvement, puis une ligne {"done": true, ...}
+    
+    Une erreur LLM sur une question ne fait pas échouer le lot: son
+    résultat contient "error" et "status_code".
+    """
+    rag_pipeline = get_pipeline()
+    
+    questions = request.questions
+    if not questions or any(not question or not question.strip() for question in questions):
+        raise HTTPException(status_code=400, detail="Question vide dans le lot")
+    if len(questions) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Lot trop grand: {len(questions)} questions (maximum: {MAX_BATCH_SIZE})")
+    if request.max_concurrency is not None and request.max_concurrency < 1:
+        raise HTTPException(status_code=400, detail="max_concurrency doit être positif")
+    
+    start_time = time.time()
+    
+    try:
+        retrieved, query_embeddings = await run_in_pool(
+            rag_pipeline.retrieve_many,
+            queries=questions,
+            top_k=request.top_k,
+            mode=request.retrieval_mode,
+            filters=request.filters()
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors du traitement: {str(e)}")
+    
+    answers = rag_pipeline.agenerate_answers(
+        questions,
+        retrieved,
+        query_embeddings,
+        use_local_llm=request.use_local_llm,
+        max_concurrency=request.max_concurrency,
+        start_time=start_time
+    )
+    
+    if request.stream:
+        async def ndjson_stream():
+            errors = 0
+            async for index, result in answers:
+                errors += 'error' in result
+                yield json.dumps({"index": index, **result}, ensure_ascii=False) + "\n"
+            yield json.dumps({
+                "done": True,
+                "count": len(questions),
+                "errors": errors,
+                "response_time": time.time() - start_time
+            }) + "\n"
+        
+        return StreamingResponse(
+            ndjson_stream(),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    results = [None] * len(questions)
+    async for index, result in answers:
+        results[index] = result
+    
+    return {
+        "results": results,
+        "count": len(results),
+        "errors": sum('error' in result for result in results),
+        "response_time": time.time() - start_time
+    }
 
 @app.post("/retrieve")
 async def retrieve_documents(request: QuestionRequest):
@@ -157,21 +653,33 @@ async def retrieve_documents(request: QuestionRequest):
     Returns:
         Liste des documents pertinents
     """
-    if rag_pipeline is None:
-        raise HTTPException(status_code=503, detail="RAG pipeline non initialisé")
+    rag_pipeline = get_pipeline()
     
+    trace = start_trace()
     try:
-        docs = rag_pipeline.retrieve(
+        query_embedding = None
+        if rag_pipeline.needs_query_embedding(request.retrieval_mode):
+            query_embedding = await rag_pipeline.aencode_query(request.question)
+        docs = await run_in_pool(
+            rag_pipeline.retrieve,
             query=request.question,
-            top_k=request.top_k
+            top_k=request.top_k,
+            mode=request.retrieval_mode,
+            filters=request.filters(),
+            query_embedding=query_embedding
         )
         
-        return {
+        response = {
             "query": request.question,
             "documents": docs,
             "count": len(docs)
         }
+        if request.include_timings:
+            response["timings"] = trace.breakdown_ms()
+        return response
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
@@ -0,0 +1,315 @@
+"""
+BM25 INDEX - Culture Burkinabè
+Index inversé en mémoire (BM25) pour la recherche par mots exacts:
+noms propres, sigles (BBDA, FESPACO), noms d'artistes
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from metadata_filter import FILTER_COLUMNS, filter_columns, is_filtering
+except ImportError:
+    from src.metadata_filter import FILTER_COLUMNS, filter_columns, is_filtering
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Mots vides français: listes de postings très longues pour un poids BM25 quasi nul
+STOPWORDS = frozenset("""
+au aux avec ce ces dans de des du elle en et eux il ils je la le les leur lui ma mais me meme mes moi
+mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te tes toi ton tu un une vos
+votre vous c d j l m n s t y a est sont ete etre avoir ont plus comme cette cet aussi tout tous
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Mots en minuscules sans accents ni mots vides ('Sissao' et 'sissao', 'Fespaco' et 'FESPACO' identiques)"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return [token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Index inversé BM25 mis à jour de façon incrémentale
+
+    Les postings de chaque terme (lignes des documents, fréquences) sont
+    maintenus dans des dicts et compilés en tableaux NumPy au premier
+    usage après modification: une requête ne coûte que la somme des
+    postings de ses termes, vectorisée.
+
+    Les documents supprimés laissent une ligne vide, récupérée par
+    compact() (appelé à chaque persist()).
+
+    Les colonnes filtrables (date, catégorie, article) de chaque ligne
+    permettent d'appliquer un MetadataFilter avant la sélection du top-k.
+
+    Les recherches ne prennent aucun verrou: plusieurs threads cherchent en
+    parallèle. Les modifications en place (reset, upsert, delete, compact,
+    persist) sont sérialisées entre elles mais ne doivent pas croiser une
+    recherche: un index déjà servi est modifié sur une copie (copy()) qui
+    remplace ensuite l'original.
+
+    Args:
+        k1: Saturation de la fréquence des termes
+        b: Normalisation par la longueur du document
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self.doc_ids: List[Optional[str]] = []
+        self.doc_lengths: List[int] = []
+        self.rows: Dict[str, int] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: List[Tuple[str, ...]] = []
+        self._filter_values: Dict[str, List] = {column: [] for column in FILTER_COLUMNS}
+        self._total_length = 0
+        self._compiled: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lengths_array = None
+        self._columns = None
+
+    def copy(self) -> "BM25Index":
+        """Copie indépendante, modifiable pendant que l'original sert des recherches"""
+        with self._lock:
+            index = BM25Index(k1=self.k1, b=self.b)
+            index.doc_ids = list(self.doc_ids)
+            index.doc_lengths = list(self.doc_lengths)
+            index.rows = dict(self.rows)
+            index.postings = {term: dict(postings) for term, postings in self.postings.items()}
+            index._doc_terms = list(self._doc_terms)
+            index._filter_values = {column: list(values) for column, values in self._filter_values.items()}
+            index._total_length = self._total_length
+            # Tableaux compilés jamais modifiés en place: partagés jusqu'à la prochaine modification
+            index._compiled = dict(self._compiled)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _remove_row(self, row: int):
+        for term in self._doc_terms[row]:
+            postings = self.postings[term]
+            del postings[row]
+            if not postings:
+                del self.postings[term]
+            self._compiled.pop(term, None)
+
+        self._total_length -= self.doc_lengths[row]
+        self.doc_lengths[row] = 0
+        self._doc_terms[row] = ()
+        self.rows.pop(self.doc_ids[row])
+        self.doc_ids[row] = None
+
+    def upsert(self, ids: List[str], texts: List[str], metadatas: List[Dict] = None):
+        """Ajout ou remplacement de documents (métadonnées: colonnes filtrables)"""
+        columns = filter_columns(metadatas or [{} for _ in ids])
+        with self._lock:
+            self._upsert(ids, texts, columns)
+
+    def _upsert(self, ids: List[str], texts: List[str], columns: Dict[str, np.ndarray]):
+        for column in FILTER_COLUMNS:
+            self._filter_values[column].extend(columns[column].tolist())
+        
+        for doc_id, text in zip(ids, texts):
+            if doc_id in self.rows:
+                self._remove_row(self.rows[doc_id])
+
+            counts = Counter(tokenize(text))
+            row = len(self.doc_ids)
+            self.doc_ids.append(doc_id)
+            self.doc_lengths.append(sum(counts.values()))
+            self._doc_terms.append(tuple(counts))
+            self.rows[doc_id] = row
+            self._total_length += self.doc_lengths[row]
+
+            for term, count in counts.items():
+                self.postings.setdefault(term, {})[row] = count
+                self._compiled.pop(term, None)
+
+        self._lengths_array = None
+        self._columns = None
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            for doc_id in ids:
+                if doc_id in self.rows:
+                    self._remove_row(self.rows[doc_id])
+            self._lengths_array = None
+
+    def compact(self):
+        """Renumérotation des lignes sans les documents supprimés"""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        if len(self.doc_ids) == len(self.rows):
+            return
+
+        new_rows = {old: new for new, old in enumerate(row for row, doc_id in enumerate(self.doc_ids) if doc_id is not None)}
+        self.postings = {
+            term: {new_rows[row]: count for row, count in postings.items()}
+            for term, postings in self.postings.items()
+        }
+        self.doc_ids = [self.doc_ids[row] for row in new_rows]
+        self.doc_lengths = [self.doc_lengths[row] for row in new_rows]
+        self._doc_terms = [self._doc_terms[row] for row in new_rows]
+        self._filter_values = {column: [values[row] for row in new_rows] for column, values in self._filter_values.items()}
+        self.rows = {doc_id: row for row, doc_id in enumerate(self.doc_ids)}
+        self._compiled = {}
+        self._lengths_array = None
+        self._columns = None
+
+    def _term_postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        compiled = self._compiled.get(term)
+        if compiled is None:
+            postings = self.postings[term]
+            compiled = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            )
+            self._compiled[term] = compiled
+        return compiled
+
+    def filter_columns(self) -> Dict[str, np.ndarray]:
+        if self._columns is None:
+            self._columns = {
+                'date_num': np.array(self._filter_values['date_num'], dtype=np.int32),
+                'category': np.array(self._filter_values['category'], dtype=str),
+                'article_id': np.array(self._filter_values['article_id'], dtype=str)
+            }
+        return self._columns
+
+    def search(self, query: str, top_k: int, where=None) -> List[Tuple[str, float]]:
+        """
+        [(id, score BM25)] des `top_k` meilleurs documents (score > 0)
+        parmi ceux qui satisfont `where` (MetadataFilter)
+        """
+        terms = [term for term in set(tokenize(query)) if term in self.postings]
+        if not terms or not self.rows:
+            return []
+
+        if self._lengths_array is None:
+            self._lengths_array = np.asarray(self.doc_lengths, dtype=np.float32)
+        lengths = self._lengths_array
+        num_docs = len(self.rows)
+        average_length = self._total_length / num_docs or 1.0
+
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        for term in terms:
+            rows, frequencies = self._term_postings(term)
+            idf = math.log(1 + (num_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[rows] / average_length)
+            # Une ligne n'apparaît qu'une fois par terme: += vectorisé sans collision
+            scores[rows] += idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+
+        if is_filtering(where):
+            scores *= where.mask(self.filter_columns())
+
+        k = min(top_k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.doc_ids[row], float(scores[row])) for row in top]
+
+    def persist(self, path: str):
+        """
+        Sauvegarde atomique (.npz): vocabulaire, postings au format CSR
+        (offsets par terme, lignes, fréquences), identifiants et longueurs
+        """
+        with self._lock:
+            self._compact()
+            terms = list(self.postings)
+            offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+            rows, frequencies = [], []
+            for i, term in enumerate(terms):
+                postings = self.postings[term]
+                rows.extend(postings.keys())
+                frequencies.extend(postings.values())
+                offsets[i + 1] = offsets[i] + len(postings)
+            doc_ids = list(self.doc_ids)
+            doc_lengths = np.array(self.doc_lengths, dtype=np.int32)
+            columns = self.filter_columns()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            terms=np.array(json.dumps(terms, ensure_ascii=False)),
+            doc_ids=np.array(json.dumps(doc_ids, ensure_ascii=False)),
+            offsets=offsets,
+            rows=np.array(rows, dtype=np.int32),
+            frequencies=np.array(frequencies, dtype=np.int32),
+            doc_lengths=doc_lengths,
+            params=np.array([self.k1, self.b]),
+            **{f"filter_{column}": values for column, values in columns.items()}
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with np.load(path) as data:
+            k1, b = data['params'].tolist()
+            index = cls(k1=k1, b=b)
+            terms = json.loads(str(data['terms']))
+            doc_ids = json.loads(str(data['doc_ids']))
+            offsets = data['offsets'].tolist()
+            rows = data['rows'].tolist()
+            frequencies = data['frequencies'].tolist()
+            index.doc_lengths = data['doc_lengths'].tolist()
+            index._filter_values = {column: data[f"filter_{column}"].tolist() for column in FILTER_COLUMNS}
+
+        index.doc_ids = doc_ids
+        index.rows = {doc_id: row for row, doc_id in enumerate(doc_ids)}
+        index._total_length = sum(index.doc_lengths)
+
+        doc_terms = [[] for _ in doc_ids]
+        for i, term in enumerate(terms):
+            start, end = offsets[i], offsets[i + 1]
+            index.postings[term] = dict(zip(rows[start:end], frequencies[start:end]))
+            for row in rows[start:end]:
+                doc_terms[row].append(term)
+        index._doc_terms = [tuple(t) for t in doc_terms]
+
+        return index
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'documents': len(self.rows),
+                'terms': len(self.postings),
+                'postings': sum(len(p) for p in self.postings.values()),
+                'deleted_rows': len(self.doc_ids) - len(self.rows)
+            }
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fusion de classements par Reciprocal Rank Fusion
+
+    score(d) = Σ 1 / (k + rang de d dans chaque classement), rangs à partir de 1.
+    Seuls les rangs comptent: pas besoin de rendre comparables une distance
+    cosinus et un score BM25.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
@@ -0,0 +1,496 @@
+"""
+CACHE MANAGER - Culture Burkinabè
+Caches du pipeline RAG (embeddings des questions, embeddings des chunks,
+réponses sémantiques)
+
+Usage (cache d'embeddings des chunks):
+    python src/cache_manager.py stats
+    python src/cache_manager.py gc --max-size-mb 500 --older-than-days 30
+"""
+
+import argparse
+import hashlib
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class QueryEmbeddingCache:
+    """
+    Cache LRU exact: texte de question normalisé → vecteur float32
+
+    Évite de repasser dans le transformer pour les questions répétées
+    (boutons d'exemples du frontend, relances de l'évaluation).
+    La normalisation (NFKC, espaces) ne modifie pas la casse: deux textes
+    qui partagent une entrée donnent le même embedding.
+
+    Si `path` est fourni, le cache est rechargé au démarrage et sauvegardé
+    par save() (fichier .npz, ignoré si le modèle a changé).
+    """
+
+    def __init__(self, max_size: int = 1024, path: str = None, model_name: str = ""):
+        self.max_size = max_size
+        self.path = path
+        self.model_name = model_name
+
+        self._vectors = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path and os.path.exists(path):
+            self.load()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        query = unicodedata.normalize('NFKC', query)
+        return re.sub(r'\s+', ' ', query).strip()
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        if not self.enabled:
+            return None
+
+        key = self.normalize(query)
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+
+            self._vectors.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, query: str, vector) -> np.ndarray:
+        """Ajout d'un embedding; retourne le vecteur stocké (lecture seule)"""
+        vector = np.array(vector, dtype=np.float32)
+        vector.flags.writeable = False
+
+        if not self.enabled:
+            return vector
+
+        key = self.normalize(query)
+        with self._lock:
+            self._vectors[key] = vector
+            self._vectors.move_to_end(key)
+
+            while len(self._vectors) > self.max_size:
+                self._vectors.popitem(last=False)
+                self.evictions += 1
+
+        return vector
+
+    def clear(self):
+        with self._lock:
+            self._vectors.clear()
+
+    def save(self):
+        """Sauvegarde sur disque (écriture atomique)"""
+        if not self.path or not self.enabled:
+            return
+
+        with self._lock:
+            keys = list(self._vectors.keys())
+            matrix = np.stack(list(self._vectors.values())) if keys else np.zeros((0, 0), dtype=np.float32)
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp.npz'
+        np.savez(tmp_path, keys=np.array(keys, dtype=str), vectors=matrix, model=np.array(self.model_name))
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """Chargement depuis le disque (les entrées les plus récentes en dernier)"""
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data['model']) != self.model_name:
+                    print(f"⚠️ Cache d'embeddings ignoré (modèle différent): {self.path}")
+                    return
+                keys, matrix = data['keys'], data['vectors']
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️ Cache d'embeddings illisible ({e}): {self.path}")
+            return
+
+        with self._lock:
+            for key, vector in zip(keys[-self.max_size:], matrix[-self.max_size:]):
+                vector = np.array(vector, dtype=np.float32)
+                vector.flags.writeable = False
+                self._vectors[str(key)] = vector
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'size': len(self._vectors),
+            'max_size': self.max_size,
+            'persistent': bool(self.path),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'evictions': self.evictions
+        }
+
+
+class SemanticAnswerCache:
+    """
+    Cache de réponses indexé par l'embedding de la question
+
+    Une réponse en cache est réutilisée si:
+    - la similarité cosinus entre les deux questions dépasse `threshold`
+    - les chunks retrouvés sont les mêmes (même contexte pour le LLM)
+    - le backend LLM est le même
+
+    Éviction LRU (max_size) et expiration (ttl en secondes, 0 = jamais).
+    Les entrées sont regroupées par (backend, chunks): la recherche de
+    similarité ne porte que sur les questions ayant le même contexte.
+    """
+
+    def __init__(self, max_size: int = 512, ttl: float = 3600, threshold: float = 0.9):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+
+        self._entries = OrderedDict()  # entry_id -> entrée (ordre LRU)
+        self._groups = {}              # (backend, chunk_ids) -> [entry_id]
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def _group_key(backend: str, chunk_ids: List[str]) -> tuple:
+        return (backend, tuple(sorted(chunk_ids)))
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        group = self._groups[entry['group']]
+        group.remove(entry_id)
+        if not group:
+            del self._groups[entry['group']]
+
+    def get(self, embedding, chunk_ids: List[str], backend: str) -> Optional[Dict]:
+        """Recherche d'une réponse pour une question similaire (None si absente)"""
+        if not self.enabled:
+            return None
+
+        group_key = self._group_key(backend, chunk_ids)
+        query = self._normalize(embedding)
+        now = time.time()
+
+        with self._lock:
+            best_id, best_score = None, self.threshold
+
+            for entry_id in list(self._groups.get(group_key, [])):
+                entry = self._entries[entry_id]
+
+                if self.ttl and now - entry['created_at'] > self.ttl:
+                    self._remove(entry_id)
+                    self.evictions += 1
+                    continue
+
+                score = float(np.dot(query, entry['embedding']))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            entry = self._entries[best_id]
+            return {'answer': entry['answer'], 'question': entry['question'], 'similarity': best_score}
+
+    def put(self, embedding, chunk_ids: List[str], backend: str, question: str, answer: str):
+        """Ajout d'une réponse générée"""
+        if not self.enabled:
+            return
+
+        group_key = self._group_key(backend, chunk_ids)
+
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = {
+                'embedding': self._normalize(embedding),
+                'group': group_key,
+                'question': question,
+                'answer': answer,
+                'created_at': time.time()
+            }
+            self._groups.setdefault(group_key, []).append(entry_id)
+
+            while len(self._entries) > self.max_size:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Vidage complet (après réindexation du corpus)"""
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'threshold': self.threshold,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
+
+
+class EmbeddingCache:
+    """
+    Cache persistant des embeddings de chunks, adressé par contenu
+
+    Clé: (nom du modèle, sha256 du texte encodé). Un chunk déjà vu n'est
+    jamais réencodé, même après un changement de découpage (les chunks
+    identiques gardent le même texte) ou de base vectorielle.
+
+    Stockage SQLite (un fichier, sans dépendance): vecteurs en blobs
+    float32 ou float16 (moitié moins de place, précision suffisante pour
+    la recherche cosinus). La date de dernière utilisation permet une
+    éviction LRU par gc().
+    """
+
+    DTYPES = ("float32", "float16")
+
+    def __init__(self, path: str = "data/vectors/embedding_cache.sqlite", dtype: str = "float32"):
+        if dtype not in self.DTYPES:
+            raise ValueError(f"Type de stockage inconnu: {dtype} (attendu: {', '.join(self.DTYPES)})")
+
+        self.path = path
+        self.dtype = dtype
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                dtype TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, model_name: str, texts: List[str]) -> Dict[int, np.ndarray]:
+        """Embeddings en cache: position dans `texts` → vecteur float32"""
+        positions = {}
+        for i, text in enumerate(texts):
+            positions.setdefault(self.text_hash(text), []).append(i)
+
+        found = {}
+        hashes = list(positions)
+        now = time.time()
+
+        with self._lock:
+            # Lots de 500 (limite de paramètres SQLite)
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT hash, dtype, vector FROM embeddings WHERE model = ? AND hash IN ({placeholders})",
+                    [model_name] + batch
+                ).fetchall()
+
+                for text_hash, dtype, blob in rows:
+                    vector = np.frombuffer(blob, dtype=dtype).astype(np.float32)
+                    for i in positions[text_hash]:
+                        found[i] = vector
+
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND hash = ?",
+                    [(now, model_name, row[0]) for row in rows]
+                )
+            self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+
+        return found
+
+    def put_many(self, model_name: str, texts: List[str], embeddings):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        now = time.time()
+        rows = [
+            (model_name, self.text_hash(text), self.dtype, embeddings.shape[1],
+             embeddings[i].astype(self.dtype).tobytes(), now, now)
+            for i, text in enumerate(texts)
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def encode(self, model_name: str, texts: List[str], encode_fn) -> np.ndarray:
+        """
+        Embeddings de `texts`: lus dans le cache, les manquants calculés
+        par encode_fn(liste de textes) puis ajoutés au cache
+        """
+        cached = self.get_many(model_name, texts)
+        missing = [i for i in range(len(texts)) if i not in cached]
+
+        if missing:
+            vectors = np.asarray(encode_fn([texts[i] for i in missing]), dtype=np.float32)
+            self.put_many(model_name, [texts[i] for i in missing], vectors)
+            cached.update(zip(missing, vectors))
+
+        return np.stack([cached[i] for i in range(len(texts))]) if texts else np.zeros((0, 0), dtype=np.float32)
+
+    def gc(self, max_size_mb: float = None, older_than_days: float = None, model_name: str = None) -> Dict:
+        """
+        Éviction: entrées inutilisées depuis `older_than_days`, puis les
+        moins récemment utilisées jusqu'à passer sous `max_size_mb`.
+        `model_name` supprime en plus les entrées des autres modèles.
+        """
+        removed = 0
+
+        with self._lock:
+            if model_name:
+                removed += self._conn.execute("DELETE FROM embeddings WHERE model != ?", (model_name,)).rowcount
+
+            if older_than_days is not None:
+                cutoff = time.time() - older_than_days * 86400
+                removed += self._conn.execute("DELETE FROM embeddings WHERE last_used < ?", (cutoff,)).rowcount
+
+            if max_size_mb is not None:
+                excess = self._payload_bytes() - max_size_mb * 1024 ** 2
+                if excess > 0:
+                    to_delete = []
+                    rows = self._conn.execute(
+                        "SELECT model, hash, length(vector) FROM embeddings ORDER BY last_used"
+                    ).fetchall()
+                    for model, text_hash, size in rows:
+                        if excess <= 0:
+                            break
+                        to_delete.append((model, text_hash))
+                        excess -= size
+                    self._conn.executemany("DELETE FROM embeddings WHERE model = ? AND hash = ?", to_delete)
+                    removed += len(to_delete)
+
+            self._conn.commit()
+            # Libération de l'espace disque
+            self._conn.execute("VACUUM")
+
+        return {'removed': removed, **self.stats()}
+
+    def _payload_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(length(vector)), 0) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            per_model = self._conn.execute(
+                "SELECT model, COUNT(*), SUM(length(vector)) FROM embeddings GROUP BY model"
+            ).fetchall()
+            payload = self._payload_bytes()
+
+        file_size = sum(
+            os.path.getsize(self.path + suffix)
+            for suffix in ("", "-wal") if os.path.exists(self.path + suffix)
+        )
+        total = self.hits + self.misses
+
+        return {
+            'path': self.path,
+            'dtype': self.dtype,
+            'entries': sum(count for _, count, _ in per_model),
+            'payload_mb': round(payload / 1024 ** 2, 2),
+            'file_mb': round(file_size / 1024 ** 2, 2),
+            'models': {model: {'entries': count, 'payload_mb': round(size / 1024 ** 2, 2)}
+                       for model, count, size in per_model},
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache persistant des embeddings de chunks")
+    parser.add_argument("--path", default=os.getenv('EMBEDDING_CACHE_FILE') or "data/vectors/embedding_cache.sqlite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("stats", help="Taille du cache par modèle")
+
+    gc_parser = subparsers.add_parser("gc", help="Éviction des entrées anciennes ou en trop")
+    gc_parser.add_argument("--max-size-mb", type=float, help="Taille maximale des vecteurs (Mo)")
+    gc_parser.add_argument("--older-than-days", type=float, help="Supprimer les entrées inutilisées depuis N jours")
+    gc_parser.add_argument("--keep-model", help="Supprimer les entrées des autres modèles")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"⚠️ Cache introuvable: {args.path}")
+        return
+
+    cache = EmbeddingCache(args.path)
+    if args.command == "gc":
+        result = cache.gc(args.max_size_mb, args.older_than_days, args.keep_model)
+        print(f"🗑️ {result.pop('removed')} entrées supprimées")
+    else:
+        result = cache.stats()
+
+    print(f"📊 {result['entries']} embeddings | vecteurs: {result['payload_mb']} Mo | fichier: {result['file_mb']} Mo")
+    for model, info in result['models'].items():
+        print(f"  - {model}: {info['entries']} ({info['payload_mb']} Mo)")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
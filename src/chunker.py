@@ -0,0 +1,190 @@
+"""
+CHUNKER - Culture Burkinabè
+Découpage des articles mesuré en tokens du modèle d'embeddings,
+aligné sur les fins de phrases, avec positions dans le texte source
+"""
+
+import bisect
+import importlib.util
+import re
+from typing import Dict, List
+
+# transformers est optionnel: sans lui, le prétraitement revient aux fenêtres de mots
+TOKENIZER_SUPPORT = importlib.util.find_spec("transformers") is not None
+
+# Fin de phrase: ponctuation finale suivie d'un espace puis d'une majuscule,
+# d'un chiffre ou d'un guillemet ouvrant
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…])\s+(?=[«"“A-ZÀ-ÖØ-Þ0-9])')
+
+
+def embedding_text(title: str, content: str) -> str:
+    """Texte réellement encodé pour un chunk: titre de l'article puis contenu"""
+    return f"Titre: {title}\n\nContenu: {content}"
+
+
+def load_tokenizer(model_name: str):
+    """Tokenizer (rapide) du modèle SentenceTransformer"""
+    from transformers import AutoTokenizer
+
+    for name in (model_name, f"sentence-transformers/{model_name}"):
+        try:
+            return AutoTokenizer.from_pretrained(name, use_fast=True)
+        except OSError:
+            continue
+    raise OSError(f"Tokenizer introuvable pour le modèle: {model_name}")
+
+
+class TokenChunker:
+    """
+    Chunks dont le texte encodé (embedding_text: titre + contenu, tokens
+    spéciaux compris) tient dans `max_tokens`: le modèle d'embeddings
+    l'encode sans troncature
+
+    Les coupures se font en fin de phrase; une phrase trop longue est coupée
+    en début de mot. Le chevauchement reprend les dernières phrases du chunk
+    précédent (au plus `overlap_tokens` tokens). Chaque chunk est vérifié
+    sur le texte encodé exact et raccourci si le titre ou la jonction
+    titre/contenu ajoute des tokens.
+
+    Args:
+        tokenizer: Tokenizer HuggingFace rapide (offset mapping)
+        max_tokens: Longueur maximale de séquence du modèle (128 pour
+            paraphrase-multilingual-MiniLM-L12-v2)
+        overlap_tokens: Chevauchement maximal entre deux chunks
+        min_tokens: Taille minimale d'un chunk: un reste plus court est
+            fusionné dans un dernier chunk qui reprend la fin de l'article
+    """
+
+    def __init__(self, tokenizer, max_tokens: int = 128, overlap_tokens: int = 16, min_tokens: int = 32):
+        self.special_tokens = tokenizer.num_special_tokens_to_add(pair=False) \
+            if hasattr(tokenizer, 'num_special_tokens_to_add') else 2
+
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.budget = max_tokens - self.special_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_tokens = min_tokens
+
+        if self.budget <= min_tokens:
+            raise ValueError(f"max_tokens trop petit: {max_tokens} (min_tokens: {min_tokens})")
+
+    def count_tokens(self, text: str) -> int:
+        """Longueur de la séquence encodée par le modèle (tokens spéciaux compris)"""
+        return len(self.tokenizer(text, add_special_tokens=True)['input_ids'])
+
+    def chunk(self, text: str, title: str = None) -> List[Dict]:
+        """
+        Args:
+            text: Contenu de l'article nettoyé
+            title: Titre de l'article (préfixe de embedding_text); None pour
+                mesurer le contenu seul
+
+        Returns:
+            [{'content', 'char_start', 'char_end', 'token_count'}], avec
+            content == text[char_start:char_end]
+        """
+        # Tous les tokens comptent, y compris ceux de largeur nulle (ex.: '▁' isolé)
+        offsets = list(self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)['offset_mapping'])
+        if not any(end > start for start, end in offsets):
+            return [{'content': text, 'char_start': 0, 'char_end': len(text), 'token_count': len(offsets)}]
+
+        budget = self.budget
+        if title is not None:
+            prefix_tokens = self.count_tokens(embedding_text(title, "")) - self.special_tokens
+            budget = max(self.budget - prefix_tokens, self.min_tokens)
+
+        token_ends = [end for _, end in offsets]
+
+        # Points de coupure possibles (indices de tokens). Les offsets d'un
+        # tokenizer SentencePiece incluent l'espace qui précède le mot ('▁Nous'):
+        # la phrase suivante commence au token qui contient son premier caractère
+        sentence_cuts = sorted({
+            bisect.bisect_right(token_ends, match.end()) for match in SENTENCE_BOUNDARY.finditer(text)
+        } - {0, len(offsets)})
+        word_cuts = [i for i in range(1, len(offsets)) if self._starts_word(text, offsets, i)]
+
+        chunks = []
+        start = previous_end = 0
+        while start < len(offsets):
+            # Une fin de phrase ne coupe qu'après min_tokens, toute coupure dépasse le chunk précédent
+            sentence_floor = max(start + self.min_tokens, previous_end + 1) - 1
+            word_floor = max(start, previous_end)
+
+            end = min(start + budget, len(offsets))
+            if end < len(offsets):
+                end = self._cut_before(sentence_cuts, word_cuts, sentence_floor, word_floor, end)
+
+            chunk = self._make_chunk(text, offsets, start, end)
+            # Vérification sur le texte encodé exact
+            while end - start > 1 and self.count_tokens(self._encoded(chunk, title)) > self.max_tokens:
+                end = self._cut_before(sentence_cuts, word_cuts, sentence_floor, word_floor, end - 1)
+                chunk = self._make_chunk(text, offsets, start, end)
+
+            chunks.append(chunk)
+            previous_end = end
+            if end == len(offsets):
+                break
+
+            # Chevauchement: première fin de phrase dans la fenêtre de recouvrement
+            position = bisect.bisect_left(sentence_cuts, max(end - self.overlap_tokens, start + 1))
+            overlap_start = sentence_cuts[position] if position < len(sentence_cuts) else end
+            next_start = min(overlap_start, end)
+
+            # Reste trop court: le dernier chunk reprend la fin de l'article à pleine taille
+            if len(offsets) - next_start < self.min_tokens:
+                next_start = self._tail_start(sentence_cuts, word_cuts, start, len(offsets) - budget, next_start)
+            start = next_start
+
+        return chunks
+
+    @staticmethod
+    def _starts_word(text: str, offsets: List, i: int) -> bool:
+        """Token i en début de mot, et pas juste après un '▁' isolé (séparé de son mot)"""
+        start, end = offsets[i]
+        preceded = text[start:end][:1].isspace() or (start > 0 and text[start - 1].isspace())
+        return preceded and bool(text[offsets[i - 1][0]:offsets[i - 1][1]].strip())
+
+    @staticmethod
+    def _encoded(chunk: Dict, title: str) -> str:
+        return chunk['content'] if title is None else embedding_text(title, chunk['content'])
+
+    @classmethod
+    def _cut_before(cls, sentence_cuts: List[int], word_cuts: List[int], sentence_floor: int,
+                    word_floor: int, end: int) -> int:
+        """Dernière fin de phrase dans ]sentence_floor, end], sinon dernier début de mot dans ]word_floor, end] (à défaut: end)"""
+        return (cls._last_cut(sentence_cuts, sentence_floor, end)
+                or cls._last_cut(word_cuts, word_floor, end)
+                or end)
+
+    @staticmethod
+    def _last_cut(cuts: List[int], start: int, end: int) -> int:
+        """Dernière coupure dans ]start, end] (0 si aucune)"""
+        position = bisect.bisect_right(cuts, end) - 1
+        return cuts[position] if position >= 0 and cuts[position] > start else 0
+
+    @staticmethod
+    def _tail_start(sentence_cuts: List[int], word_cuts: List[int], previous: int, lowest: int, default: int) -> int:
+        """Première coupure dans [lowest, default[ après le début du chunk précédent (à défaut: default)"""
+        lowest = max(lowest, previous + 1)
+        for cuts in (sentence_cuts, word_cuts):
+            position = bisect.bisect_left(cuts, lowest)
+            if position < len(cuts) and cuts[position] < default:
+                return cuts[position]
+        return default
+
+    @staticmethod
+    def _make_chunk(text: str, offsets: List, start: int, end: int) -> Dict:
+        char_start = offsets[start][0]
+        char_end = max(token_end for _, token_end in offsets[start:end])
+        # Certains tokenizers incluent l'espace qui précède le mot
+        while char_start < char_end and text[char_start].isspace():
+            char_start += 1
+        while char_end > char_start and text[char_end - 1].isspace():
+            char_end -= 1
+
+        return {
+            'content': text[char_start:char_end],
+            'char_start': char_start,
+            'char_end': char_end,
+            'token_count': end - start
+        }
@@ -0,0 +1,255 @@
+"""
+CORPUS STORE - Culture Burkinabè
+Format de corpus compact en colonnes (tables de chaînes + offsets),
+chargé paresseusement par mmap
+
+Usage:
+    # Conversion depuis le corpus JSON (ou JSONL)
+    python src/corpus_store.py convert data/processed/corpus_cleaned.json data/processed/corpus
+
+    # Résumé
+    python src/corpus_store.py info data/processed/corpus
+"""
+
+import argparse
+import json
+import mmap
+import os
+import shutil
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator
+
+import numpy as np
+
+
+class StringColumn:
+    """
+    Colonne de chaînes: octets UTF-8 concaténés (<nom>.bin) + positions (<nom>.offsets.npy, N+1)
+
+    Les deux fichiers sont mappés en mémoire: une chaîne n'est décodée qu'à la lecture.
+    """
+
+    def __init__(self, path: str, name: str):
+        self.offsets = np.load(os.path.join(path, f"{name}.offsets.npy"), mmap_mode='r')
+
+        with open(os.path.join(path, f"{name}.bin"), 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if int(self.offsets[-1]) else b""
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position: int) -> str:
+        start, end = int(self.offsets[position]), int(self.offsets[position + 1])
+        return self._data[start:end].decode('utf-8')
+
+    @staticmethod
+    def write(path: str, name: str, values: Iterable[str]):
+        offsets = [0]
+        with open(os.path.join(path, f"{name}.bin"), 'wb') as f:
+            for value in values:
+                data = value.encode('utf-8')
+                f.write(data)
+                offsets.append(offsets[-1] + len(data))
+        np.save(os.path.join(path, f"{name}.offsets.npy"), np.array(offsets, dtype=np.int64))
+
+
+class ColumnarCorpus(Sequence):
+    """
+    Corpus de chunks en colonnes, compatible avec la liste de dicts du JSON
+
+    Dossier:
+        manifest.json               nombre de chunks/articles, métadonnées de génération
+        id, content                 colonnes de chaînes par chunk
+        chunk_index, total_chunks   entiers par chunk (int32)
+        char_start, char_end        positions dans l'article (int64, -1 si absentes)
+        article_row                 ligne de l'article de chaque chunk (int32)
+        article_id, url, title, date, category, metadata
+                                    colonnes de chaînes par article: les champs
+                                    répétés dans chaque chunk ne sont stockés
+                                    qu'une fois (metadata en JSON)
+
+    Seul le manifeste est lu à l'ouverture; les colonnes sont mappées à la
+    première lecture. corpus[i] reconstruit le dict du chunk i.
+    """
+
+    CHUNK_STRINGS = ("id", "content")
+    CHUNK_INTS = ("chunk_index", "total_chunks")
+    CHUNK_OFFSETS = ("char_start", "char_end")
+    ARTICLE_STRINGS = ("article_id", "url", "title", "date", "category", "metadata")
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, self.MANIFEST), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+
+        self.num_chunks = self.manifest['num_chunks']
+        self.num_articles = self.manifest['num_articles']
+        self._columns = {}
+
+    @staticmethod
+    def is_corpus(path: str) -> bool:
+        return os.path.isfile(os.path.join(path, ColumnarCorpus.MANIFEST))
+
+    def column(self, name: str):
+        """Colonne mappée (chargée au premier accès)"""
+        if name not in self._columns:
+            if name in self.CHUNK_STRINGS or name in self.ARTICLE_STRINGS:
+                self._columns[name] = StringColumn(self.path, name)
+            else:
+                self._columns[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r')
+        return self._columns[name]
+
+    def __len__(self) -> int:
+        return self.num_chunks
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+
+        article = int(self.column('article_row')[position])
+        chunk = {
+            'id': self.column('id')[position],
+            'article_id': self.column('article_id')[article],
+            'url': self.column('url')[article],
+            'title': self.column('title')[article],
+            'content': self.column('content')[position],
+            'date': self.column('date')[article],
+            'category': self.column('category')[article],
+            'metadata': json.loads(self.column('metadata')[article]),
+            'chunk_index': int(self.column('chunk_index')[position]),
+            'total_chunks': int(self.column('total_chunks')[position])
+        }
+
+        if self.manifest.get('has_offsets'):
+            chunk['char_start'] = int(self.column('char_start')[position])
+            chunk['char_end'] = int(self.column('char_end')[position])
+        return chunk
+
+    def __iter__(self) -> Iterator[Dict]:
+        for position in range(len(self)):
+            yield self[position]
+
+    @classmethod
+    def write(cls, path: str, chunks: Iterable[Dict], metadata: Dict = None) -> "ColumnarCorpus":
+        """
+        Écriture en flux (un chunk à la fois) dans un dossier temporaire,
+        puis remplacement de `path`
+        """
+        tmp_path = path.rstrip('/') + '.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        files = {name: open(os.path.join(tmp_path, f"{name}.bin"), 'wb')
+                 for name in cls.CHUNK_STRINGS + cls.ARTICLE_STRINGS}
+        offsets = {name: [0] for name in files}
+        numbers = {name: [] for name in cls.CHUNK_INTS + cls.CHUNK_OFFSETS + ('article_row',)}
+        article_rows = {}
+        has_offsets = True
+
+        def append(name: str, value: str):
+            data = value.encode('utf-8')
+            files[name].write(data)
+            offsets[name].append(offsets[name][-1] + len(data))
+
+        try:
+            for chunk in chunks:
+                article_id = str(chunk['article_id'])
+                if article_id not in article_rows:
+                    article_rows[article_id] = len(article_rows)
+                    append('article_id', article_id)
+                    for name in ('url', 'title', 'date', 'category'):
+                        append(name, str(chunk.get(name, '')))
+                    append('metadata', json.dumps(chunk.get('metadata', {}), ensure_ascii=False))
+
+                append('id', str(chunk['id']))
+                append('content', chunk['content'])
+                numbers['article_row'].append(article_rows[article_id])
+                for name in cls.CHUNK_INTS:
+                    numbers[name].append(int(chunk[name]))
+
+                has_offsets = has_offsets and 'char_start' in chunk
+                for name in cls.CHUNK_OFFSETS:
+                    numbers[name].append(int(chunk.get(name, -1)))
+        finally:
+            for f in files.values():
+                f.close()
+
+        for name, values in offsets.items():
+            np.save(os.path.join(tmp_path, f"{name}.offsets.npy"), np.array(values, dtype=np.int64))
+        for name, values in numbers.items():
+            dtype = np.int64 if name in cls.CHUNK_OFFSETS else np.int32
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.array(values, dtype=dtype))
+
+        num_chunks = len(numbers['article_row'])
+        with open(os.path.join(tmp_path, cls.MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump({
+                'format': 'columnar-corpus',
+                'version': 1,
+                'num_chunks': num_chunks,
+                'num_articles': len(article_rows),
+                'has_offsets': has_offsets and num_chunks > 0,
+                'metadata': metadata or {}
+            }, f, ensure_ascii=False, indent=2)
+
+        # Remplacement de l'ancien corpus
+        old_path = path.rstrip('/') + '.old'
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.exists(path):
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+        return cls(path)
+
+
+def disk_size_mb(path: str) -> float:
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1024 ** 2
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names) / 1024 ** 2
+
+
+def main():
+    try:
+        from data_preprocessing import iter_corpus
+    except ImportError:
+        from src.data_preprocessing import iter_corpus
+
+    parser = argparse.ArgumentParser(description="Corpus en colonnes (mmap)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="Conversion d'un corpus JSON/JSONL")
+    convert_parser.add_argument("input")
+    convert_parser.add_argument("output")
+
+    info_parser = subparsers.add_parser("info", help="Résumé d'un corpus en colonnes")
+    info_parser.add_argument("path")
+
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        print(f"🔄 Conversion: {args.input} → {args.output}")
+        if args.input.endswith('.json'):
+            # Une seule lecture du JSON: chunks et métadonnées du corpus
+            with open(args.input, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            chunks, metadata = data['corpus'], data.get('metadata', {})
+        else:
+            chunks, metadata = iter_corpus(args.input), {}
+
+        corpus = ColumnarCorpus.write(args.output, chunks, metadata)
+        print(f"✅ {corpus.num_chunks} chunks, {corpus.num_articles} articles")
+        print(f"💾 {disk_size_mb(args.input):.1f} Mo → {disk_size_mb(args.output):.1f} Mo")
+    else:
+        corpus = ColumnarCorpus(args.path)
+        print(f"📊 {corpus.num_chunks} chunks, {corpus.num_articles} articles, {disk_size_mb(args.path):.1f} Mo")
+        print(json.dumps(corpus.manifest.get('metadata', {}), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
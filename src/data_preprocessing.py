@@ -1,62 +1,293 @@
 """
 DATA PREPROCESSING - Culture Burkinabè
 Nettoyage et préparation des données pour le RAG
+
+Usage:
+    # Corpus JSON complet (chargé en mémoire)
+    python src/data_preprocessing.py
+
+    # Mode streaming: JSON/JSONL lu article par article, sortie JSONL
+    python src/data_preprocessing.py --stream --output data/processed/corpus_cleaned.jsonl
 """
 
+import argparse
+import hashlib
+import itertools
 import json
+import multiprocessing
+import os
 import re
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, Sequence
 import unicodedata
 from collections import Counter
 
+try:
+    from keyword_matcher import TaxonomyMatcher, load_taxonomy
+    from near_duplicates import NearDuplicateDetector
+    from chunker import TOKENIZER_SUPPORT, TokenChunker, load_tokenizer
+    from corpus_store import ColumnarCorpus
+except ImportError:
+    from src.keyword_matcher import TaxonomyMatcher, load_taxonomy
+    from src.near_duplicates import NearDuplicateDetector
+    from src.chunker import TOKENIZER_SUPPORT, TokenChunker, load_tokenizer
+    from src.corpus_store import ColumnarCorpus
+
+
+def iter_json_records(path: str, buffer_size: int = 1 << 20) -> Iterator[Dict]:
+    """
+    Lecture incrémentale d'un fichier JSON (tableau d'objets) ou JSONL
+
+    Seul un tampon de `buffer_size` caractères et l'objet en cours de
+    décodage sont en mémoire, quelle que soit la taille du fichier.
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(buffer_size)
+        start = len(buffer) - len(buffer.lstrip())
+
+        if not buffer[start:start + 1] == '[':
+            # JSONL: un objet par ligne
+            f.seek(0)
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        pos = start + 1
+        eof = False
+
+        while True:
+            # Séparateurs entre deux objets
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+
+            if pos >= len(buffer) and eof:
+                raise ValueError(f"Fin de fichier inattendue dans le tableau JSON: {path}")
+
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+                # Un objet collé à la fin du tampon peut être incomplet
+                complete = end < len(buffer) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+
+            if complete:
+                yield record
+                pos = end
+                continue
+
+            chunk = f.read(buffer_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+
+def iter_corpus(path: str) -> Iterator[Dict]:
+    """Chunks d'un corpus prétraité (JSON {'corpus': [...]}, JSONL ou dossier en colonnes)"""
+    if ColumnarCorpus.is_corpus(path):
+        yield from ColumnarCorpus(path)
+        return
+
+    if path.endswith('.jsonl'):
+        yield from iter_json_records(path)
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from json.load(f)['corpus']
+
+
+def load_corpus(path: str) -> Sequence:
+    """
+    Corpus complet: ColumnarCorpus (lecture paresseuse, mmap) pour un dossier
+    en colonnes, sinon liste de dicts
+    """
+    if ColumnarCorpus.is_corpus(path):
+        return ColumnarCorpus(path)
+    return list(iter_corpus(path))
+
+
+class TextNormalizer:
+    """
+    Nettoyage de texte précompilé (résultat identique octet pour octet à
+    l'ancienne suite de re.sub de DataPreprocessor.clean_text)
+
+    Chaque règle n'est appliquée que si un test littéral rapide (recherche
+    de sous-chaîne en C) montre qu'elle peut s'appliquer, et les espaces
+    sont fusionnés par str.split/join au lieu d'une substitution par mot.
+    Les règles restent appliquées dans l'ordre d'origine: une suppression
+    peut en faire apparaître une autre (« Newsletterhttp://x LeFaso.net »).
+    """
+    
+    TAGS = re.compile(r'<[^>]+>')
+    URLS = re.compile(r'http\S+|www\.\S+')
+    READ_ALSO = re.compile(r'Lire aussi\s*:')
+    AUTHOR = re.compile(r'\b[A-Z][a-zéèêà]+\s+[A-Z][a-zéèêà]+(\s+\([^)]+\))?\s*$')
+    # Dernier caractère (hors espaces) possible pour une signature sans parenthèse
+    AUTHOR_LAST_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzéèêà')
+    
+    @staticmethod
+    def collapse_whitespace(text: str) -> str:
+        """Équivalent de re.sub(r'\s+', ' ', text) (str.split et \s reconnaissent les mêmes espaces)"""
+        words = text.split()
+        if not words:
+            return ' ' if text else ''
+        
+        collapsed = ' '.join(words)
+        if text[0].isspace():
+            collapsed = ' ' + collapsed
+        if text[-1].isspace():
+            collapsed += ' '
+        return collapsed
+    
+    def normalize(self, text: str) -> str:
+        # Normalisation Unicode
+        text = unicodedata.normalize('NFKC', text)
+        
+        # Balises HTML résiduelles, puis espaces multiples (plus aucun retour
+        # à la ligne ensuite: l'ancienne règle '\n+' n'avait aucun effet)
+        if '<' in text:
+            text = self.TAGS.sub('', text)
+        text = self.collapse_whitespace(text)
+        
+        # URLs
+        if 'http' in text or 'www.' in text:
+            text = self.URLS.sub('', text)
+        
+        # Patterns spécifiques LeFaso.net ('$' = fin du texte: aucun '\n' restant)
+        if text.endswith('Lefaso.net'):
+            text = text[:-len('Lefaso.net')]
+        text = text.replace('Newsletter LeFaso.net', '')
+        if 'Lire aussi' in text:
+            text = self.READ_ALSO.sub('', text)
+        
+        # Mentions d'auteurs à la fin
+        text = self.remove_author(text)
+        
+        return text.strip()
+    
+    def remove_author(self, text: str) -> str:
+        """
+        Signature « Prénom Nom (Fonction) » en fin de texte
+
+        Sans parenthèse finale, une signature ne peut couvrir que les deux
+        derniers mots: la regex n'est appliquée qu'à cette fin de texte
+        (les espaces ne sont plus que des ' ' à ce stade).
+        """
+        stripped = text.rstrip()
+        last_char = stripped[-1:]
+        
+        if last_char == ')':
+            return self.AUTHOR.sub('', text)
+        if last_char not in self.AUTHOR_LAST_CHARS:
+            return text
+        
+        last_space = stripped.rfind(' ')
+        if last_space < 0:
+            return text
+        
+        # Début de l'avant-dernier mot (les URLs supprimées laissent des doubles espaces)
+        start = stripped[:last_space].rstrip().rfind(' ') + 1
+        return text[:start] + self.AUTHOR.sub('', text[start:])
+
+
+text_normalizer = TextNormalizer()
+
+
+# Préprocesseur propre à chaque processus du pool (voir DataPreprocessor.parallel_clean)
+_worker_preprocessor = None
+
+
+def _init_worker(taxonomy: Dict):
+    global _worker_preprocessor
+    _worker_preprocessor = DataPreprocessor(None, None, taxonomy=taxonomy)
+
+
+def _clean_in_worker(article: Dict):
+    """Nettoyage d'un article dans un processus du pool: (article nettoyé ou None, contenu vide)"""
+    stats = _worker_preprocessor.stats
+    empty_before = stats['empty_content_removed']
+    cleaned = _worker_preprocessor.clean_article(article)
+    return cleaned, stats['empty_content_removed'] - empty_before
+
+
 class DataPreprocessor:
-    def __init__(self, input_file: str, output_file: str):
+    def __init__(self, input_file: str, output_file: str, workers: int = 1,
+                 ordered: bool = True, chunksize: int = 32, taxonomy: Dict = None,
+                 near_dup_threshold: float = 0.8, chunker: str = "tokens",
+                 embedding_model: str = "paraphrase-multilingual-MiniLM-L12-v2",
+                 max_tokens: int = 128, overlap_tokens: int = 16, min_tokens: int = 32):
+        """
+        Args:
+            workers: Processus pour le nettoyage et l'extraction de métadonnées
+                (1 = séquentiel, 0 = tous les cœurs)
+            ordered: Conserver l'ordre d'entrée avec plusieurs workers
+                (sinon, les articles sortent dans l'ordre de fin de traitement)
+            chunksize: Articles envoyés à un worker par tâche
+            taxonomy: Mots-clés des catégories et de validation
+                (défaut: load_taxonomy(), fichier config/cultural_taxonomy.json)
+            near_dup_threshold: Seuil de Jaccard des quasi-doublons (MinHash/LSH), 0 pour désactiver
+            chunker: 'tokens' (tokenizer du modèle, fins de phrases, titre
+                compris dans la longueur encodée) ou 'words' (fenêtres de 600
+                mots, tronquées à l'encodage); 'tokens' revient à 'words' si
+                transformers ou le tokenizer est indisponible
+            embedding_model: Modèle dont le tokenizer mesure les chunks
+            max_tokens: Longueur maximale de séquence du modèle d'embeddings
+            overlap_tokens: Chevauchement maximal entre chunks (phrases entières)
+            min_tokens: Taille minimale d'un chunk (chunker 'tokens')
+        """
         self.input_file = input_file
         self.output_file = output_file
+        self.workers = workers or os.cpu_count() or 1
+        self.ordered = ordered
+        self.chunksize = chunksize
+        self.near_dup_threshold = near_dup_threshold
+        self.near_duplicates = None
+        
+        if chunker not in ("tokens", "words"):
+            raise ValueError(f"Chunker inconnu: {chunker} (attendu: tokens, words)")
+        if chunker == "tokens" and not TOKENIZER_SUPPORT:
+            print("⚠️ transformers non installé: découpage en fenêtres de 600 mots (--chunker words)")
+            chunker = "words"
+        self.chunker = chunker
+        self.embedding_model = embedding_model
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_tokens = min_tokens
+        self._token_chunker = None  # Tokenizer chargé au premier découpage (pas dans les workers)
+        
+        # Automates de mots-clés construits une seule fois
+        self.taxonomy = taxonomy or load_taxonomy()
+        self.matcher = TaxonomyMatcher(self.taxonomy)
         self.stats = {
             'total_articles': 0,
             'valid_articles': 0,
             'duplicates_removed': 0,
+            'near_duplicates_removed': 0,
             'empty_content_removed': 0,
             'avg_content_length': 0
         }
     
     def clean_text(self, text: str) -> str:
-        """Nettoyage approfondi du texte"""
+        """Nettoyage approfondi du texte (HTML, espaces, URLs, boilerplate LeFaso.net, auteurs)"""
         if not text:
             return ""
         
-        # Normalisation Unicode
-        text = unicodedata.normalize('NFKC', text)
-        
-        # Suppression des balises HTML résiduelles
-        text = re.sub(r'<[^>]+>', '', text)
-        
-        # Suppression des caractères spéciaux multiples
-        text = re.sub(r'\s+', ' ', text)  # Espaces multiples
-        text = re.sub(r'\n+', '\n', text)  # Retours à la ligne multiples
-        
-        # Suppression des URLs
-        text = re.sub(r'http\S+|www\.\S+', '', text)
-        
-        # Nettoyage des patterns spécifiques LeFaso.net
-        text = re.sub(r'Lefaso\.net$', '', text)
-        text = re.sub(r'Newsletter LeFaso\.net', '', text)
-        text = re.sub(r'Lire aussi\s*:', '', text)
-        
-        # Suppression des mentions d'auteurs à la fin
-        text = re.sub(r'\b[A-Z][a-zéèêà]+\s+[A-Z][a-zéèêà]+(\s+\([^)]+\))?\s*$', '', text)
-        
-        return text.strip()
+        return text_normalizer.normalize(text)
     
     def extract_date(self, date_str: str) -> str:
         """Extraction et normalisation de la date"""
         if not date_str:
             return ""
         
-        # Pattern: "Publié le mardi 10 octobre 2023 à 10h30min"
-        match = re.search(r'(\d{1,2})\s+(\w+)\s+(\d{4})', date_str)
+        # Pattern: "Publié le mardi 10 octobre 2023 à 10h30min" (ou "1er mars 2023")
+        match = re.search(r'(\d{1,2})(?:er)?\s+(\w+)\s+(\d{4})', date_str)
         if match:
             day, month_fr, year = match.groups()
             
@@ -78,21 +309,8 @@ class DataPreprocessor:
         title = article.get('title', '').lower()
         full_text = f"{title} {content}"
         
-        # Détection de catégories culturelles
-        categories = []
-        keywords = {
-            'musique': ['musique', 'concert', 'artiste', 'chanson', 'album', 'festival'],
-            'cinéma': ['film', 'cinéma', 'projection', 'réalisateur', 'acteur'],
-            'théâtre': ['théâtre', 'pièce', 'comédien', 'spectacle'],
-            'arts_visuels': ['peinture', 'exposition', 'sculpture', 'photographie'],
-            'littérature': ['livre', 'écrivain', 'poésie', 'auteur', 'littérature'],
-            'patrimoine': ['patrimoine', 'tradition', 'coutume', 'musée'],
-            'mode': ['mode', 'styliste', 'fashion']
-        }
-        
-        for category, words in keywords.items():
-            if any(word in full_text for word in words):
-                categories.append(category)
+        # Détection de catégories culturelles (un seul passage sur le texte)
+        categories = self.matcher.match_categories(full_text)
         
         # Extraction des noms d'artistes (mots en majuscules)
         artists = re.findall(r'\b[A-Z][a-zéèêà]+(?:\s+[A-Z][a-zéèêà]+)*\b', article.get('content', ''))
@@ -102,7 +320,7 @@ class DataPreprocessor:
         events = re.findall(r'(?:festival|concert|exposition|REMA|FESPACO|semaine)[^.]*', full_text, re.IGNORECASE)
         
         return {
-            'categories': list(set(categories)),
+            'categories': categories,
             'artists_mentioned': list(set(artists[:5])),  # Top 5
             'events': events[:3],  # Top 3
             'word_count': len(content.split())
@@ -121,34 +339,39 @@ class DataPreprocessor:
             return False
         
         # Vérifier que c'est bien du contenu culturel
-        cultural_keywords = ['culture', 'musique', 'art', 'festival', 'cinéma', 'théâtre', 
-                           'artiste', 'concert', 'exposition', 'film', 'peinture']
         text = f"{article.get('title', '')} {content}".lower()
         
-        if not any(keyword in text for keyword in cultural_keywords):
+        if not self.matcher.is_cultural(text):
             return False
         
         return True
     
-    def remove_duplicates(self, articles: List[Dict]) -> List[Dict]:
-        """Suppression des doublons"""
-        seen_urls = set()
-        seen_titles = set()
-        unique_articles = []
-        
-        for article in articles:
-            url = article.get('url', '')
-            title = article.get('title', '').lower().strip()
-            
-            # Vérifier URL et titre
-            if url not in seen_urls not in seen_titles:
-                seen_urls.add(url)
-                seen_titles.add(title)
-                unique_articles.append(article)
-            else:
-                self.stats['duplicates_removed'] += 1
+    @staticmethod
+    def fingerprint(text: str) -> bytes:
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    
+    def is_new_article(self, article: Dict, seen_urls: set, seen_titles: set, fingerprint: bool = False) -> bool:
+        """Test de doublon; enregistre l'article dans seen_urls / seen_titles s'il est nouveau"""
+        url = article.get('url', '')
+        title = article.get('title', '').lower().strip()
+        
+        if fingerprint:
+            url, title = self.fingerprint(url), self.fingerprint(title)
+        
+        # Vérifier URL et titre (un titre vide, ex. « Newsletter LeFaso.net »
+        # une fois nettoyé, n'identifie pas l'article)
+        has_title = bool(article.get('title', '').strip())
+        if url in seen_urls or (has_title and title in seen_titles):
+            return False
         
-        return unique_articles
+        seen_urls.add(url)
+        if has_title:
+            seen_titles.add(title)
+        return True
+    
+    def remove_duplicates(self, articles: List[Dict]) -> List[Dict]:
+        """Suppression des doublons exacts (URL, titre) et des quasi-doublons"""
+        return list(self.iter_unique_articles(articles))
     
     def chunk_text(self, text: str, chunk_size: int = 600, overlap: int = 100) -> List[str]:
         """Découpage du texte en chunks avec overlap"""
@@ -162,6 +385,71 @@ class DataPreprocessor:
         
         return chunks if chunks else [text]
     
+    def clean_article(self, article: Dict) -> Dict:
+        """Article validé, nettoyé et enrichi (None si rejeté)"""
+        if not self.is_valid_article(article):
+            return None
+        
+        cleaned = {
+            'id': article.get('url', '').split('article')[-1],
+            'url': article.get('url', ''),
+            'title': self.clean_text(article.get('title', '')),
+            'content': self.clean_text(article.get('content', '')),
+            'date': self.extract_date(article.get('date', '')),
+            'category': article.get('category', 'Culture')
+        }
+        
+        # Ajout des métadonnées
+        cleaned['metadata'] = self.extract_metadata(cleaned)
+        return cleaned
+    
+    @property
+    def token_chunker(self) -> Optional[TokenChunker]:
+        """TokenChunker chargé au premier découpage; None (repli sur 'words') si le tokenizer est introuvable"""
+        if self._token_chunker is None and self.chunker == "tokens":
+            print(f"🔤 Chargement du tokenizer: {self.embedding_model}")
+            try:
+                tokenizer = load_tokenizer(self.embedding_model)
+            except OSError as e:
+                # Avant le premier chunk: tout le corpus est découpé de la même façon
+                print(f"⚠️ {e}: découpage en fenêtres de 600 mots (--chunker words)")
+                self.chunker = "words"
+                return None
+            self._token_chunker = TokenChunker(
+                tokenizer,
+                max_tokens=self.max_tokens,
+                overlap_tokens=self.overlap_tokens,
+                min_tokens=self.min_tokens
+            )
+        return self._token_chunker
+    
+    def chunk_with_offsets(self, text: str, title: str = None) -> List[Dict]:
+        """Chunks {'content', 'char_start', 'char_end', 'token_count'} selon le chunker choisi"""
+        if self.chunker == "tokens" and self.token_chunker is not None:
+            return self.token_chunker.chunk(text, title=title)
+        
+        return [{'content': chunk} for chunk in self.chunk_text(text)]
+    
+    def article_chunks(self, article: Dict) -> List[Dict]:
+        """Chunks RAG d'un article nettoyé"""
+        chunks = self.chunk_with_offsets(article['content'], article['title'])
+        
+        return [
+            {
+                'id': f"{article['id']}_chunk_{idx}",
+                'article_id': article['id'],
+                'url': article['url'],
+                'title': article['title'],
+                'date': article['date'],
+                'category': article['category'],
+                'metadata': article['metadata'],
+                'chunk_index': idx,
+                'total_chunks': len(chunks),
+                **chunk
+            }
+            for idx, chunk in enumerate(chunks)
+        ]
+    
     def process(self):
         """Pipeline complet de preprocessing"""
         print("🔄 Chargement des données brutes...")
@@ -169,31 +457,11 @@ class DataPreprocessor:
         with open(self.input_file, 'r', encoding='utf-8') as f:
             raw_articles = json.load(f)
         
-        self.stats['total_articles'] = len(raw_articles)
-        print(f"📊 {self.stats['total_articles']} articles chargés")
+        print(f"📊 {len(raw_articles)} articles chargés")
         
         # Étape 1: Nettoyage
-        print("\n🧹 Nettoyage des données...")
-        cleaned_articles = []
-        
-        for article in raw_articles:
-            if self.is_valid_article(article):
-                cleaned = {
-                    'id': article.get('url', '').split('article')[-1],
-                    'url': article.get('url', ''),
-                    'title': self.clean_text(article.get('title', '')),
-                    'content': self.clean_text(article.get('content', '')),
-                    'date': self.extract_date(article.get('date', '')),
-                    'category': article.get('category', 'Culture')
-                }
-                
-                # Ajout des métadonnées
-                metadata = self.extract_metadata(cleaned)
-                cleaned['metadata'] = metadata
-                
-                cleaned_articles.append(cleaned)
-        
-        self.stats['valid_articles'] = len(cleaned_articles)
+        print("\n🧹 Nettoyage des données..." + (f" ({self.workers} processus)" if self.workers > 1 else ""))
+        cleaned_articles = list(self.iter_valid_articles(raw_articles))
         
         # Étape 2: Suppression des doublons
         print("🔍 Suppression des doublons...")
@@ -204,22 +472,7 @@ class DataPreprocessor:
         processed_data = []
         
         for article in unique_articles:
-            # Créer des chunks du contenu
-            chunks = self.chunk_text(article['content'])
-            
-            for idx, chunk in enumerate(chunks):
-                processed_data.append({
-                    'id': f"{article['id']}_chunk_{idx}",
-                    'article_id': article['id'],
-                    'url': article['url'],
-                    'title': article['title'],
-                    'content': chunk,
-                    'date': article['date'],
-                    'category': article['category'],
-                    'metadata': article['metadata'],
-                    'chunk_index': idx,
-                    'total_chunks': len(chunks)
-                })
+            processed_data.extend(self.article_chunks(article))
         
         # Statistiques
         content_lengths = [len(a['content'].split()) for a in unique_articles]
@@ -234,7 +487,9 @@ class DataPreprocessor:
                 'total_articles': len(unique_articles),
                 'total_chunks': len(processed_data),
                 'source': 'LeFaso.net - Culture',
-                'preprocessing_stats': self.stats
+                'chunker': self.chunker,
+                'preprocessing_stats': self.stats,
+                'near_duplicate_clusters': self.near_duplicate_clusters()
             },
             'corpus': processed_data
         }
@@ -242,29 +497,179 @@ class DataPreprocessor:
         with open(self.output_file, 'w', encoding='utf-8') as f:
             json.dump(output_data, f, ensure_ascii=False, indent=2)
         
-        # Rapport final
+        self.print_report(len(processed_data))
+        
+        return output_data
+    
+    # ------------------------------------------------------------------
+    # Mode streaming: mémoire bornée quelle que soit la taille du corpus
+    # ------------------------------------------------------------------
+    
+    def iter_valid_articles(self, raw_articles: Iterable[Dict]) -> Iterator[Dict]:
+        """Étape 1: validation + nettoyage (en parallèle si workers > 1)"""
+        if self.workers > 1:
+            results = self.parallel_clean(raw_articles)
+        else:
+            results = ((self.clean_article(article), 0) for article in raw_articles)
+        
+        for cleaned, empty_removed in results:
+            self.stats['total_articles'] += 1
+            self.stats['empty_content_removed'] += empty_removed
+            if cleaned is not None:
+                self.stats['valid_articles'] += 1
+                yield cleaned
+    
+    def parallel_clean(self, raw_articles: Iterable[Dict]) -> Iterator[tuple]:
+        """
+        Nettoyage + métadonnées répartis sur un pool de processus
+
+        Les articles sont soumis par fenêtres de workers × chunksize × 4:
+        la lecture en flux reste bornée en mémoire. Les statistiques des
+        workers remontent avec chaque résultat et les doublons sont traités
+        ensuite dans le processus principal, donc restent exacts.
+        """
+        articles = iter(raw_articles)
+        window = self.workers * self.chunksize * 4
+        
+        with multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=(self.taxonomy,)) as pool:
+            imap = pool.imap if self.ordered else pool.imap_unordered
+            
+            while True:
+                batch = list(itertools.islice(articles, window))
+                if not batch:
+                    break
+                yield from imap(_clean_in_worker, batch, chunksize=self.chunksize)
+    
+    def iter_unique_articles(self, articles: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Étape 2: doublons exacts (empreintes de 16 octets de l'URL et du
+        titre) puis quasi-doublons du contenu (MinHash/LSH)
+        """
+        seen_urls = set()
+        seen_titles = set()
+        self.near_duplicates = NearDuplicateDetector(self.near_dup_threshold) if self.near_dup_threshold else None
+        
+        for article in articles:
+            if not self.is_new_article(article, seen_urls, seen_titles, fingerprint=True):
+                self.stats['duplicates_removed'] += 1
+            elif self.near_duplicates and self.near_duplicates.check(article['id'], article['content']):
+                self.stats['near_duplicates_removed'] += 1
+            else:
+                yield article
+    
+    def near_duplicate_clusters(self) -> Dict[str, List[str]]:
+        """Article conservé -> identifiants des quasi-doublons supprimés"""
+        return self.near_duplicates.clusters if self.near_duplicates else {}
+    
+    def iter_chunks(self, articles: Iterable[Dict]) -> Iterator[Dict]:
+        """Étape 3: chunking (statistiques de longueur cumulées au passage)"""
+        total_words = 0
+        total_articles = 0
+        
+        for article in articles:
+            total_words += len(article['content'].split())
+            total_articles += 1
+            self.stats['avg_content_length'] = total_words / total_articles
+            yield from self.article_chunks(article)
+    
+    def process_streaming(self) -> Dict:
+        """
+        Pipeline de preprocessing en flux: validation → nettoyage → doublons
+        → chunking, écrit chunk par chunk au format JSONL
+
+        Le fichier d'entrée (tableau JSON ou JSONL) est lu article par
+        article. Les métadonnées du corpus sont écrites à côté, dans
+        `<output>.meta.json`.
+        """
+        print(f"🔄 Lecture en flux: {self.input_file}")
+        
+        articles = iter_json_records(self.input_file)
+        chunks = self.iter_chunks(self.iter_unique_articles(self.iter_valid_articles(articles)))
+        
+        total_chunks = 0
+        total_articles = 0
+        tmp_file = self.output_file + '.tmp'
+        
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(json.dumps(chunk, ensure_ascii=False) + '\n')
+                total_chunks += 1
+                total_articles += chunk['chunk_index'] == 0
+                
+                if total_chunks % 10000 == 0:
+                    print(f"  {self.stats['total_articles']} articles lus, {total_chunks} chunks écrits")
+        
+        os.replace(tmp_file, self.output_file)
+        
+        metadata = {
+            'generated_at': datetime.now().isoformat(),
+            'total_articles': total_articles,
+            'total_chunks': total_chunks,
+            'source': 'LeFaso.net - Culture',
+            'chunker': self.chunker,
+            'preprocessing_stats': self.stats,
+            'near_duplicate_clusters': self.near_duplicate_clusters()
+        }
+        with open(self.output_file + '.meta.json', 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        
+        self.print_report(total_chunks)
+        
+        return metadata
+    
+    def print_report(self, total_chunks: int):
+        """Rapport final"""
         print("\n" + "="*50)
         print("📈 RAPPORT DE PREPROCESSING")
         print("="*50)
         print(f"✅ Articles initiaux: {self.stats['total_articles']}")
         print(f"✅ Articles valides: {self.stats['valid_articles']}")
         print(f"❌ Doublons supprimés: {self.stats['duplicates_removed']}")
+        print(f"❌ Quasi-doublons supprimés: {self.stats['near_duplicates_removed']} "
+              f"({len(self.near_duplicate_clusters())} groupes)")
         print(f"❌ Contenus vides: {self.stats['empty_content_removed']}")
         print(f"📝 Longueur moyenne: {self.stats['avg_content_length']:.0f} mots")
-        print(f"🎯 Chunks finaux: {len(processed_data)}")
+        print(f"🎯 Chunks finaux: {total_chunks}")
         print(f"💾 Fichier sauvegardé: {self.output_file}")
         print("="*50)
-        
-        return output_data
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preprocessing du corpus culturel")
+    parser.add_argument("--input", default="data/raw/enriched_articles.json")
+    parser.add_argument("--output", help="Défaut: corpus_cleaned.json (ou .jsonl avec --stream)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Lecture incrémentale et sortie JSONL (mémoire constante)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processus de nettoyage (0 = tous les cœurs)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="Avec --workers: sortie dans l'ordre de fin de traitement")
+    parser.add_argument("--chunksize", type=int, default=32, help="Articles par tâche envoyée aux workers")
+    parser.add_argument("--chunker", choices=["tokens", "words"], default="tokens",
+                        help="tokens: tokenizer du modèle + fins de phrases (repli sur words sans transformers); "
+                             "words: fenêtres de 600 mots")
+    parser.add_argument("--max-tokens", type=int, default=128, help="Longueur maximale de séquence du modèle")
+    parser.add_argument("--min-tokens", type=int, default=32, help="Taille minimale d'un chunk (--chunker tokens)")
+    parser.add_argument("--near-dup-threshold", type=float, default=0.8,
+                        help="Seuil de Jaccard des quasi-doublons (0 pour désactiver)")
+    args = parser.parse_args()
+    
     # Configuration
-    INPUT_FILE = "data/raw/enriched_articles.json"
-    OUTPUT_FILE = "data/processed/corpus_cleaned.json"
+    INPUT_FILE = args.input
+    OUTPUT_FILE = args.output or (
+        "data/processed/corpus_cleaned.jsonl" if args.stream else "data/processed/corpus_cleaned.json"
+    )
     
     # Exécution
-    preprocessor = DataPreprocessor(INPUT_FILE, OUTPUT_FILE)
-    result = preprocessor.process()
+    preprocessor = DataPreprocessor(
+        INPUT_FILE, OUTPUT_FILE,
+        workers=args.workers, ordered=not args.unordered, chunksize=args.chunksize,
+        near_dup_threshold=args.near_dup_threshold,
+        chunker=args.chunker, max_tokens=args.max_tokens, min_tokens=args.min_tokens
+    )
+    if args.stream:
+        result = preprocessor.process_streaming()
+    else:
+        result = preprocessor.process()
     
-    print("\n✅ Preprocessing terminé avec succès!")
\ No newline at end of file
+    print("\n✅ Preprocessing terminé avec succès!")
@@ -0,0 +1,172 @@
+"""
+EMBEDDINGS MANAGER - Culture Burkinabè
+Service d'encodage des questions avec micro-batching
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List
+
+import numpy as np
+
+
+class BatchingQueryEncoder:
+    """
+    Regroupe les questions arrivant dans une courte fenêtre de temps
+    et les encode en une seule passe du modèle
+
+    Sur CPU, une passe de 32 phrases coûte bien moins que 32 passes d'une
+    phrase. Une question seule est encodée sans attendre; quand d'autres
+    sont déjà en file (requêtes concurrentes), le batch attend au plus
+    `max_wait_ms` de plus pour se remplir. Les questions qui arrivent
+    pendant une passe forment le batch suivant.
+
+    L'API appelle aencode() depuis la boucle asyncio: la taille des batchs
+    n'est pas limitée par le nombre de threads du pool de workers.
+
+    Args:
+        model: Modèle SentenceTransformer (ou tout objet avec encode(list))
+        max_batch_size: Taille maximale d'un batch
+        max_wait_ms: Attente maximale d'autres questions quand le batch en contient déjà plusieurs
+    """
+
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue = queue.Queue()
+        self._stopped = False
+        self._lock = threading.Lock()
+
+        # Métriques
+        self.total_queries = 0
+        self.total_batches = 0
+        self.max_batch_seen = 0
+        self.total_wait_time = 0.0
+        self.total_encode_time = 0.0
+
+        self._worker = threading.Thread(target=self._run, name="query-encoder", daemon=True)
+        self._worker.start()
+
+    def encode(self, query: str) -> np.ndarray:
+        """Encodage d'une question (bloquant, appelable depuis plusieurs threads)"""
+        return self.submit(query).result()
+
+    async def aencode(self, query: str) -> np.ndarray:
+        """Encodage d'une question sans bloquer la boucle asyncio"""
+        return await asyncio.wrap_future(self.submit(query))
+
+    def submit(self, query: str) -> Future:
+        future = Future()
+        # Verrou partagé avec stop(): aucune question n'est mise en file après l'arrêt
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("Encodeur arrêté")
+            self._queue.put((query, future, time.perf_counter()))
+        return future
+
+    def _collect_batch(self) -> List:
+        """
+        Première question bloquante, puis celles déjà en file; attente
+        d'autres questions (jusqu'à la limite de temps ou de taille)
+        seulement si le batch en contient déjà plusieurs
+        """
+        batch = [self._queue.get()]
+        if batch[0] is None:
+            return []
+
+        deadline = None
+        while len(batch) < self.max_batch_size:
+            try:
+                if deadline is None:
+                    item = self._queue.get_nowait()
+                else:
+                    remaining = deadline - time.perf_counter()
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                if deadline is not None or len(batch) == 1:
+                    break
+                # Requêtes concurrentes: courte attente des suivantes
+                deadline = time.perf_counter() + self.max_wait
+                continue
+            if item is None:
+                self._queue.put(None)  # Arrêt traité au tour suivant
+                break
+            batch.append(item)
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if not batch:
+                return
+
+            # Requêtes annulées entre-temps (client parti: aencode annule le Future)
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            queries = [query for query, _, _ in batch]
+            started = time.perf_counter()
+
+            try:
+                vectors = np.asarray(
+                    self.model.encode(queries, batch_size=len(queries), convert_to_numpy=True),
+                    dtype=np.float32
+                )
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            for (_, future, enqueued), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+            with self._lock:
+                self.total_queries += len(batch)
+                self.total_batches += 1
+                self.max_batch_seen = max(self.max_batch_seen, len(batch))
+                self.total_wait_time += sum(started - enqueued for _, _, enqueued in batch)
+                self.total_encode_time += finished - started
+
+    def stop(self):
+        """
+        Arrêt du thread d'encodage: les questions en file sont traitées;
+        celles qui restent si le thread ne s'arrête pas à temps échouent
+        (RuntimeError) au lieu d'attendre indéfiniment
+        """
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._queue.put(None)
+
+        self._worker.join(timeout=5)
+
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("Encodeur arrêté"))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+                'queue_depth': self._queue.qsize(),
+                'total_queries': self.total_queries,
+                'total_batches': self.total_batches,
+                'avg_batch_size': round(self.total_queries / self.total_batches, 2) if self.total_batches else 0.0,
+                'max_batch_seen': self.max_batch_seen,
+                'avg_wait_ms': round(self.total_wait_time / self.total_queries * 1000, 3) if self.total_queries else 0.0,
+                'avg_encode_ms': round(self.total_encode_time / self.total_batches * 1000, 3) if self.total_batches else 0.0
+            }
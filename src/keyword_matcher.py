@@ -0,0 +1,178 @@
+"""
+KEYWORD MATCHER - Culture Burkinabè
+Recherche multi-mots-clés (sous-chaînes ou automate d'Aho-Corasick) et taxonomie culturelle
+"""
+
+import json
+import os
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+# Taxonomie par défaut (utilisée si le fichier de configuration est absent)
+DEFAULT_TAXONOMY = {
+    'categories': {
+        'musique': ['musique', 'concert', 'artiste', 'chanson', 'album', 'festival'],
+        'cinéma': ['film', 'cinéma', 'projection', 'réalisateur', 'acteur'],
+        'théâtre': ['théâtre', 'pièce', 'comédien', 'spectacle'],
+        'arts_visuels': ['peinture', 'exposition', 'sculpture', 'photographie'],
+        'littérature': ['livre', 'écrivain', 'poésie', 'auteur', 'littérature'],
+        'patrimoine': ['patrimoine', 'tradition', 'coutume', 'musée'],
+        'mode': ['mode', 'styliste', 'fashion']
+    },
+    'cultural_keywords': ['culture', 'musique', 'art', 'festival', 'cinéma', 'théâtre',
+                          'artiste', 'concert', 'exposition', 'film', 'peinture']
+}
+
+DEFAULT_TAXONOMY_FILE = "config/cultural_taxonomy.json"
+
+
+def load_taxonomy(path: str = None) -> Dict:
+    """
+    Taxonomie {'categories': {catégorie: [mots]}, 'cultural_keywords': [mots]}
+
+    Chemin par défaut: KEYWORD_TAXONOMY_FILE, sinon config/cultural_taxonomy.json.
+    """
+    path = path or os.getenv('KEYWORD_TAXONOMY_FILE') or DEFAULT_TAXONOMY_FILE
+    if not os.path.exists(path):
+        return DEFAULT_TAXONOMY
+
+    with open(path, 'r', encoding='utf-8') as f:
+        taxonomy = json.load(f)
+
+    if not isinstance(taxonomy.get('categories'), dict) or not isinstance(taxonomy.get('cultural_keywords'), list):
+        raise ValueError(f"Taxonomie invalide (attendu: 'categories' et 'cultural_keywords'): {path}")
+    return taxonomy
+
+
+class KeywordMatcher:
+    """
+    Recherche de nombreux mots-clés dans un texte, avec la sémantique de
+    `mot in texte` (sous-chaînes, occurrences chevauchantes comprises).
+    Chaque mot-clé porte un ou plusieurs labels; find() retourne
+    l'ensemble des labels trouvés.
+
+    Jusqu'à SCAN_MAX_KEYWORDS mots-clés, chaque mot est cherché par
+    `in` (recherche de sous-chaîne en C): c'est le plus rapide pour une
+    petite taxonomie. Au-delà, un automate d'Aho-Corasick trouve tous les
+    mots-clés en un seul passage sur le texte, quel que soit leur nombre.
+    Sur les 790 articles du corpus, les deux se valent vers 180 termes.
+
+    L'automate est compilé en table de transitions complète (un dict par
+    état): une seule recherche de dict par caractère.
+    """
+
+    SCAN_MAX_KEYWORDS = 150
+
+    def __init__(self, keywords: Iterable[Tuple[str, str]]):
+        """
+        Args:
+            keywords: Paires (mot-clé, label); le même mot peut avoir plusieurs labels
+        """
+        keywords = [(keyword, label) for keyword, label in keywords if keyword]
+
+        # Petite taxonomie: mots-clés regroupés par label, cherchés par `in`
+        self._scan = None
+        if len(keywords) <= self.SCAN_MAX_KEYWORDS:
+            self._scan = {}
+            for keyword, label in keywords:
+                self._scan.setdefault(label, []).append(keyword)
+            self.labels = frozenset(self._scan)
+            self.num_states = 0
+            return
+
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Set[str]] = [set()]
+
+        # 1. Trie des mots-clés
+        for keyword, label in keywords:
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append(set())
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].add(label)
+
+        # 2. Liens d'échec (parcours en largeur) et transitions complètes
+        fail = [0] * len(goto)
+        table: List[Dict[str, int]] = [dict(goto[0])]
+        table.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            # Transitions héritées de l'état d'échec, puis transitions propres
+            table[state] = {**table[fail[state]], **goto[state]}
+            outputs[state] |= outputs[fail[state]]
+
+            for char, child in goto[state].items():
+                fail[child] = table[fail[state]].get(char, 0)
+                queue.append(child)
+
+        self._table = table
+        self._outputs = [frozenset(labels) for labels in outputs]
+        self.labels = frozenset().union(*self._outputs)
+        self.num_states = len(table)
+
+    def find(self, text: str, stop_after: int = None) -> Set[str]:
+        """
+        Labels des mots-clés présents dans `text`
+
+        Args:
+            stop_after: Arrêt dès que ce nombre de labels est trouvé
+                (1 = simple test de présence)
+        """
+        stop_after = stop_after or len(self.labels)
+        found = set()
+
+        if self._scan is not None:
+            for label, words in self._scan.items():
+                if any(word in text for word in words):
+                    found.add(label)
+                    if len(found) >= stop_after:
+                        break
+            return found
+
+        table, outputs = self._table, self._outputs
+        state = 0
+
+        for char in text:
+            state = table[state].get(char, 0)
+            if outputs[state]:
+                found |= outputs[state]
+                if len(found) >= stop_after:
+                    break
+
+        return found
+
+    def contains_any(self, text: str) -> bool:
+        return bool(self.find(text, stop_after=1))
+
+
+class TaxonomyMatcher:
+    """Catégories culturelles et validation (un KeywordMatcher chacune)"""
+
+    CULTURAL = "__culturel__"
+
+    def __init__(self, taxonomy: Dict = None):
+        taxonomy = taxonomy or load_taxonomy()
+        self.categories = list(taxonomy['categories'])
+
+        self._category_matcher = KeywordMatcher(
+            (word.lower(), category)
+            for category, words in taxonomy['categories'].items()
+            for word in words
+        )
+        self._cultural_matcher = KeywordMatcher(
+            (word.lower(), self.CULTURAL) for word in taxonomy['cultural_keywords']
+        )
+
+    def match_categories(self, text: str) -> List[str]:
+        """Catégories dont au moins un mot-clé apparaît (texte en minuscules), dans l'ordre de la taxonomie"""
+        found = self._category_matcher.find(text)
+        return [category for category in self.categories if category in found]
+
+    def is_cultural(self, text: str) -> bool:
+        return self._cultural_matcher.contains_any(text)
@@ -0,0 +1,560 @@
+"""
+LLM MANAGER - Culture Burkinabè
+Clients LLM (HuggingFace Router et Ollama) avec connexions HTTP persistantes
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+load_dotenv()
+
+try:
+    from metrics import record, span
+except ImportError:
+    from src.metrics import record, span
+
+
+SYSTEM_PROMPT = "Tu es un assistant expert sur la culture burkinabè. Réponds en français."
+
+
+class LLMError(Exception):
+    """Erreur lors de l'appel au LLM"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LLMConfigError(LLMError):
+    """Configuration manquante ou invalide (token, URL...)"""
+
+
+class LLMUnavailableError(LLMError):
+    """Backend indisponible après épuisement des tentatives (429/503/timeout)"""
+
+
+class LLMBackend:
+    """Description d'un backend LLM: URL, payload et extraction de la réponse"""
+
+    name = "base"
+
+    def __init__(self, url: str, model: str, max_concurrency: int = 4):
+        self.url = url
+        self.model = model
+        self.max_concurrency = max_concurrency
+
+    def headers(self) -> Dict:
+        return {"Content-Type": "application/json"}
+
+    def build_payload(self, prompt: str, stream: bool = False) -> Dict:
+        raise NotImplementedError
+
+    def parse_response(self, data: Dict) -> str:
+        raise NotImplementedError
+
+    def parse_stream_line(self, line: str) -> Tuple[str, bool]:
+        """
+        Extraction d'un fragment de flux: (texte, terminé)
+
+        Lève LLMError sur une ligne illisible ou un message d'erreur du backend
+        """
+        raise NotImplementedError
+
+    def decode_stream_data(self, data: str) -> Dict:
+        """Objet JSON d'une ligne de flux (LLMError si illisible ou si c'est une erreur)"""
+        try:
+            payload = json.loads(data)
+        except json.JSONDecodeError as e:
+            raise LLMError(f"Flux {self.name} illisible: {e} ({data[:200]!r})")
+        if not isinstance(payload, dict):
+            raise LLMError(f"Flux {self.name} inattendu: {data[:200]!r}")
+
+        error = payload.get('error')
+        if error:
+            if isinstance(error, dict):
+                error = error.get('message') or json.dumps(error, ensure_ascii=False)
+            raise LLMError(f"Erreur {self.name} pendant le flux: {error}")
+        return payload
+
+
+class HuggingFaceBackend(LLMBackend):
+    """HuggingFace Router API (format OpenAI chat completions)"""
+
+    name = "huggingface"
+
+    def __init__(
+        self,
+        url: str = None,
+        model: str = None,
+        token: str = None,
+        max_concurrency: int = None
+    ):
+        super().__init__(
+            url=url or os.getenv('HF_API_URL', "https://router.huggingface.co/v1/chat/completions"),
+            model=model or os.getenv('HF_MODEL', "mistralai/Mistral-7B-Instruct-v0.2:featherless-ai"),
+            max_concurrency=max_concurrency or int(os.getenv('HF_MAX_CONCURRENCY', '4'))
+        )
+        # Supporte HF_TOKEN ou HUGGINGFACE_TOKEN
+        self.token = token or os.getenv('HF_TOKEN') or os.getenv('HUGGINGFACE_TOKEN')
+
+    def headers(self) -> Dict:
+        if not self.token:
+            raise LLMConfigError("Token HuggingFace manquant. Ajouter HF_TOKEN ou HUGGINGFACE_TOKEN dans .env")
+
+        return {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json"
+        }
+
+    def build_payload(self, prompt: str, stream: bool = False) -> Dict:
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": 500,
+            "temperature": 0.7,
+            "top_p": 0.9,
+            "stream": stream
+        }
+
+    def parse_response(self, data: Dict) -> str:
+        if "choices" in data and len(data["choices"]) > 0:
+            return data["choices"][0]["message"]["content"]
+        raise LLMError("Format de réponse inattendu")
+
+    def parse_stream_line(self, line: str) -> Tuple[str, bool]:
+        # Server-Sent Events: "data: {...}" puis "data: [DONE]"
+        if not line.startswith("data:"):
+            return "", False
+
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return "", True
+
+        choices = self.decode_stream_data(data).get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content") or "", False
+
+
+class OllamaBackend(LLMBackend):
+    """Ollama local (/api/generate)"""
+
+    name = "ollama"
+
+    def __init__(self, url: str = None, model: str = None, max_concurrency: int = None):
+        super().__init__(
+            url=url or os.getenv('OLLAMA_URL', "http://localhost:11434/api/generate"),
+            model=model or os.getenv('OLLAMA_MODEL', "mistral"),
+            max_concurrency=max_concurrency or int(os.getenv('OLLAMA_MAX_CONCURRENCY', '1'))
+        )
+
+    def build_payload(self, prompt: str, stream: bool = False) -> Dict:
+        return {
+            'model': self.model,
+            'prompt': prompt,
+            'stream': stream,
+            'options': {
+                'temperature': 0.7,
+                'top_p': 0.9,
+                'num_predict': 500
+            }
+        }
+
+    def parse_response(self, data: Dict) -> str:
+        if 'response' in data:
+            return data['response']
+        raise LLMError("Format de réponse Ollama inattendu")
+
+    def parse_stream_line(self, line: str) -> Tuple[str, bool]:
+        # NDJSON: un objet par ligne, "done": true sur le dernier, {"error": ...} en cas d'échec
+        data = self.decode_stream_data(line)
+        return data.get('response') or '', bool(data.get('done', False))
+
+
+class ConcurrencyLimit:
+    """
+    Limite de concurrence d'un backend, partagée par les appels synchrones
+    (threads du pool) et asyncio (/ask/stream, /ask/batch): au plus
+    `max_concurrency` appels en cours au total
+
+    Une place libérée passe directement au plus ancien appel en attente,
+    thread ou coroutine.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        # threading.Event (thread) ou asyncio.Future (coroutine), dans l'ordre d'arrivée
+        self._waiters = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _try_acquire(self) -> bool:
+        # Appelé sous self._lock
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            return True
+        return False
+
+    def acquire(self):
+        with self._lock:
+            if self._try_acquire():
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self):
+        with self._lock:
+            if self._try_acquire():
+                return
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if future in self._waiters:
+                    self._waiters.remove(future)
+                    raise
+            # Place déjà transmise par release(): la rendre
+            self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self.in_flight -= 1
+                return
+            # in_flight inchangé: la place passe au premier en attente
+            waiter = self._waiters.popleft()
+
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            waiter.get_loop().call_soon_threadsafe(self._wake, waiter)
+
+    @staticmethod
+    def _wake(future: asyncio.Future):
+        # Future annulée entre-temps: aacquire() rend la place
+        if not future.done():
+            future.set_result(None)
+
+
+class LLMClient:
+    """
+    Client LLM partagé (synchrone et asyncio)
+
+    - Une session HTTP keep-alive par mode (requests / httpx) réutilisée
+      entre les questions: pas de nouvelle poignée de main TCP+TLS par appel
+    - Limite de concurrence par backend, commune aux appels synchrones et asyncio
+    - Nouvelles tentatives avec backoff exponentiel et jitter sur 429/503
+    """
+
+    RETRY_STATUS = {429, 502, 503, 504}
+
+    def __init__(
+        self,
+        backends: Dict[str, LLMBackend] = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        timeout: float = 60,
+        pool_size: int = 20
+    ):
+        if backends is None:
+            backends = {b.name: b for b in (HuggingFaceBackend(), OllamaBackend())}
+
+        self.backends = backends
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        # Session synchrone avec pool de connexions persistantes
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(backends), pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Une seule limite par backend pour les appels synchrones et asyncio
+        self._limits = {
+            name: ConcurrencyLimit(b.max_concurrency)
+            for name, b in backends.items()
+        }
+
+        # Client httpx créé à la première utilisation
+        self._async_client = None
+
+    def get_backend(self, name: str) -> LLMBackend:
+        if name not in self.backends:
+            raise LLMConfigError(f"Backend LLM inconnu: {name}")
+        return self.backends[name]
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Backoff exponentiel avec jitter complet, borné par backoff_max"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_max))
+            except ValueError:
+                pass
+
+        return delay
+
+    def _check_status(self, backend: LLMBackend, status_code: int, text: str):
+        """Conversion des codes HTTP non récupérables en exceptions"""
+        if status_code == 401:
+            raise LLMConfigError(f"Token {backend.name} invalide. Vérifiez votre token dans .env", status_code)
+        if status_code != 200:
+            raise LLMError(f"Erreur API {backend.name}: {status_code} - {text[:200]}", status_code)
+
+    def _post(self, backend: LLMBackend, payload: Dict, stream: bool = False) -> requests.Response:
+        """
+        POST synchrone avec nouvelles tentatives
+
+        Retourne une réponse 200 en conservant la place du backend (ConcurrencyLimit):
+        l'appelant doit la relâcher une fois la réponse consommée.
+        """
+        headers = backend.headers()
+        limit = self._limits[backend.name]
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+
+            limit.acquire()
+            try:
+                response = self.session.post(
+                    backend.url, headers=headers, json=payload,
+                    timeout=self.timeout, stream=stream
+                )
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                limit.release()
+                last_error = LLMUnavailableError(f"{backend.name} injoignable: {e}")
+            else:
+                if response.status_code in self.RETRY_STATUS:
+                    retry_after = response.headers.get("Retry-After")
+                    response.close()
+                    limit.release()
+                    last_error = LLMUnavailableError(
+                        f"{backend.name} indisponible ({response.status_code})",
+                        response.status_code
+                    )
+                elif response.status_code != 200:
+                    text = response.text
+                    response.close()
+                    limit.release()
+                    self._check_status(backend, response.status_code, text)
+                else:
+                    return response
+
+            # Attente sans occuper de place pour ne pas bloquer les autres appels
+            if attempt < self.max_retries:
+                time.sleep(self._backoff_delay(attempt, retry_after))
+
+        raise last_error
+
+    def generate(self, backend_name: str, prompt: str) -> str:
+        """
+        Génération synchrone (session requests partagée)
+
+        Étapes mesurées: 'llm' (appel complet, attente et nouvelles tentatives
+        comprises) et 'llm_ttfb' (jusqu'aux en-têtes de la réponse)
+        """
+        backend = self.get_backend(backend_name)
+        start = time.perf_counter()
+        with span('llm'):
+            response = self._post(backend, backend.build_payload(prompt), stream=True)
+            record('llm_ttfb', time.perf_counter() - start)
+            try:
+                return backend.parse_response(response.json())
+            finally:
+                response.close()
+                self._limits[backend_name].release()
+
+    def stream(self, backend_name: str, prompt: str) -> Iterator[str]:
+        """
+        Génération synchrone en flux: fragments de texte au fil de l'eau
+        ('llm_ttfb' mesuré jusqu'au premier fragment)
+        """
+        backend = self.get_backend(backend_name)
+        start = time.perf_counter()
+        with span('llm'):
+            response = self._post(backend, backend.build_payload(prompt, stream=True), stream=True)
+            try:
+                done = False
+                first = True
+                # Lecture jusqu'au bout du flux pour rendre la connexion au pool
+                for line in response.iter_lines():
+                    if not line or done:
+                        continue
+                    token, done = backend.parse_stream_line(line.decode("utf-8"))
+                    if token:
+                        if first:
+                            record('llm_ttfb', time.perf_counter() - start)
+                            first = False
+                        yield token
+            finally:
+                response.close()
+                self._limits[backend_name].release()
+
+    def _get_async_client(self):
+        if self._async_client is None:
+            import httpx
+            self._async_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size
+                )
+            )
+        return self._async_client
+
+    async def _apost(self, backend: LLMBackend, payload: Dict, stream: bool = False):
+        """
+        POST asynchrone avec nouvelles tentatives (client httpx partagé)
+
+        Comme _post: la place du backend reste acquise après succès.
+        """
+        import httpx
+
+        headers = backend.headers()
+        client = self._get_async_client()
+        limit = self._limits[backend.name]
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+
+            await limit.aacquire()
+            try:
+                request = client.build_request("POST", backend.url, headers=headers, json=payload)
+                response = await client.send(request, stream=stream)
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                limit.release()
+                last_error = LLMUnavailableError(f"{backend.name} injoignable: {e}")
+            else:
+                if response.status_code in self.RETRY_STATUS:
+                    retry_after = response.headers.get("Retry-After")
+                    await response.aclose()
+                    limit.release()
+                    last_error = LLMUnavailableError(
+                        f"{backend.name} indisponible ({response.status_code})",
+                        response.status_code
+                    )
+                elif response.status_code != 200:
+                    await response.aread()
+                    await response.aclose()
+                    limit.release()
+                    self._check_status(backend, response.status_code, response.text)
+                else:
+                    return response
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff_delay(attempt, retry_after))
+
+        raise last_error
+
+    async def agenerate(self, backend_name: str, prompt: str) -> str:
+        """Génération asynchrone (client httpx partagé), mesurée comme generate"""
+        backend = self.get_backend(backend_name)
+        start = time.perf_counter()
+        with span('llm'):
+            response = await self._apost(backend, backend.build_payload(prompt), stream=True)
+            record('llm_ttfb', time.perf_counter() - start)
+            try:
+                await response.aread()
+                return backend.parse_response(response.json())
+            finally:
+                await response.aclose()
+                self._limits[backend_name].release()
+
+    async def astream(self, backend_name: str, prompt: str) -> AsyncIterator[str]:
+        """Génération asynchrone en flux: fragments de texte au fil de l'eau, mesurée comme stream"""
+        backend = self.get_backend(backend_name)
+        start = time.perf_counter()
+        with span('llm'):
+            response = await self._apost(backend, backend.build_payload(prompt, stream=True), stream=True)
+            try:
+                done = False
+                first = True
+                async for line in response.aiter_lines():
+                    if not line or done:
+                        continue
+                    token, done = backend.parse_stream_line(line)
+                    if token:
+                        if first:
+                            record('llm_ttfb', time.perf_counter() - start)
+                            first = False
+                        yield token
+            finally:
+                await response.aclose()
+                self._limits[backend_name].release()
+
+    def stats(self) -> Dict:
+        """Appels en cours et en attente par backend (threads et asyncio confondus)"""
+        return {
+            name: {
+                'max_concurrency': limit.max_concurrency,
+                'in_flight': limit.in_flight,
+                'waiting': limit.waiting
+            }
+            for name, limit in self._limits.items()
+        }
+
+    def close(self):
+        self.session.close()
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+# Client partagé par tout le processus
+_default_client: Optional[LLMClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Retourne le client LLM partagé (créé au premier appel)"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = LLMClient(
+                backends=mock_backends(os.getenv('LLM_MOCK_URL')),
+                max_retries=int(os.getenv('LLM_MAX_RETRIES', '3')),
+                timeout=float(os.getenv('LLM_TIMEOUT', '60'))
+            )
+        return _default_client
+
+
+def mock_backends(base_url: Optional[str]) -> Optional[Dict[str, LLMBackend]]:
+    """
+    Backends pointant vers un serveur LLM de test (src/llm_stub_server.py)
+    qui parle les deux protocoles; None sans LLM_MOCK_URL
+    """
+    if not base_url:
+        return None
+    base_url = base_url.rstrip('/')
+    backends = (
+        HuggingFaceBackend(url=f"{base_url}/v1/chat/completions", token="mock"),
+        OllamaBackend(url=f"{base_url}/api/generate")
+    )
+    return {backend.name: backend for backend in backends}
@@ -0,0 +1,343 @@
+"""
+SERVEUR LLM DE TEST - Culture Burkinabè
+Faux HuggingFace Router / Ollama local pour tester les clients LLM sans réseau
+
+Latence, débit de tokens et erreurs (429, 503, timeouts) sont tirés d'un
+générateur aléatoire initialisé par requête (graine, contenu de la requête,
+rang de ce contenu): une même suite de requêtes produit les mêmes latences
+et les mêmes erreurs, quel que soit l'ordre d'arrivée des requêtes concurrentes.
+
+Usage:
+    python src/llm_stub_server.py --port 8089
+    HF_API_URL=http://127.0.0.1:8089/v1/chat/completions
+    OLLAMA_URL=http://127.0.0.1:8089/api/generate
+
+    # Test de charge: ~0.8s avant le premier token, 30 tokens/s, 2% de 429, 1% de 503
+    python src/llm_stub_server.py --latency lognormal:0.8,0.4 --token-rate 30 --reply-tokens 200 \\
+        --error-429 0.02 --error-503 0.01
+    LLM_MOCK_URL=http://127.0.0.1:8089    # les deux backends pointent vers le serveur de test
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class LatencyDistribution:
+    """
+    Loi de la latence avant le premier octet (secondes)
+
+    Spécifications:
+        fixed:0.5               constante
+        uniform:0.2,1.0         uniforme entre deux bornes
+        normal:0.8,0.2          moyenne, écart-type (tronquée à 0)
+        lognormal:0.8,0.4       médiane, sigma (queue longue, proche des API réelles)
+        exponential:0.5         moyenne
+    """
+
+    KINDS = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2, 'exponential': 1}
+
+    def __init__(self, spec: str):
+        kind, _, params = spec.partition(':')
+        try:
+            values = [float(value) for value in params.split(',')] if params else []
+        except ValueError:
+            values = None
+        if kind not in self.KINDS or values is None or len(values) != self.KINDS[kind]:
+            raise ValueError(f"Loi de latence invalide: {spec} (attendu: {', '.join(f'{k}:...' for k in self.KINDS)})")
+
+        self.spec = spec
+        self.kind = kind
+        self.params = values
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == 'fixed':
+            value = self.params[0]
+        elif self.kind == 'uniform':
+            value = rng.uniform(*self.params)
+        elif self.kind == 'normal':
+            value = rng.gauss(*self.params)
+        elif self.kind == 'lognormal':
+            median, sigma = self.params
+            value = rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        else:
+            value = rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+        return max(0.0, value)
+
+
+class StubLLMServer:
+    """
+    Serveur HTTP local imitant les deux protocoles utilisés par LLMClient
+    (OpenAI chat completions et Ollama /api/generate, en flux ou non)
+
+    Args:
+        reply: Texte renvoyé pour chaque génération
+        token_delay: Pause (s) entre deux fragments en mode "stream"
+        fail_first: Nombre de premières requêtes qui échouent avec fail_status
+        fail_status: Code HTTP renvoyé pendant les échecs (429, 503...)
+        latency: Loi de la latence avant le premier octet (voir LatencyDistribution)
+        token_rate: Tokens générés par seconde (remplace token_delay; la
+            réponse non streamée arrive après la génération complète)
+        reply_tokens: Longueur de la réponse en tokens (reply répété), None: reply tel quel
+        error_rates: Probabilité par requête de chaque erreur injectée:
+            {429: p, 503: p, 'timeout': p}
+        hang: Durée (s) d'une requête en timeout avant fermeture de la
+            connexion sans réponse (supérieure à LLM_TIMEOUT)
+        retry_after: En-tête Retry-After des erreurs 429/503
+        seed: Graine des tirages
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        reply: str = "Réponse de test.",
+        token_delay: float = 0.0,
+        fail_first: int = 0,
+        fail_status: int = 503,
+        latency: str = None,
+        token_rate: float = None,
+        reply_tokens: int = None,
+        error_rates: Dict = None,
+        hang: float = 65.0,
+        retry_after: str = "0",
+        seed: int = 0
+    ):
+        self.reply = reply
+        self.token_delay = token_delay
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.latency = LatencyDistribution(latency) if latency else None
+        self.token_rate = token_rate
+        self.reply_tokens = reply_tokens
+        self.error_rates = {key: rate for key, rate in (error_rates or {}).items() if rate > 0}
+        self.hang = hang
+        self.retry_after = retry_after
+        self.seed = seed
+
+        if sum(self.error_rates.values()) > 1:
+            raise ValueError(f"Somme des taux d'erreur > 1: {self.error_rates}")
+
+        self.request_count = 0
+        self.client_ports = set()  # Une entrée par connexion TCP (keep-alive)
+        self.outcomes = Counter()  # 200, 429, 503, 'timeout'...
+        self._occurrences = Counter()
+        self._lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def tokens(self):
+        """Découpage de la réponse en fragments (mot + espaces qui suivent)"""
+        tokens = re.findall(r'\S+\s*', self.reply)
+        if self.reply_tokens and tokens:
+            tokens = [tokens[i % len(tokens)] for i in range(self.reply_tokens)]
+            tokens[-1] = tokens[-1].rstrip()
+        return tokens
+
+    @property
+    def token_interval(self) -> float:
+        return 1 / self.token_rate if self.token_rate else self.token_delay
+
+    def request_rng(self, body: bytes) -> random.Random:
+        """Générateur de la requête: graine, contenu et rang de ce contenu parmi les requêtes reçues"""
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            self._occurrences[digest] += 1
+            occurrence = self._occurrences[digest]
+        return random.Random(f"{self.seed}:{digest}:{occurrence}")
+
+    def draw_error(self, rng: random.Random) -> Optional[object]:
+        """Erreur injectée (429, 503, 'timeout') ou None"""
+        draw = rng.random()
+        for error, rate in self.error_rates.items():
+            if draw < rate:
+                return error
+            draw -= rate
+        return None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'requests': self.request_count,
+                'connections': len(self.client_ports),
+                'outcomes': {str(key): count for key, count in self.outcomes.items()},
+                'latency': self.latency.spec if self.latency else None,
+                'token_rate': self.token_rate,
+                'reply_tokens': len(self.tokens()),
+                'error_rates': {str(key): rate for key, rate in self.error_rates.items()},
+                'seed': self.seed
+            }
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Connexions persistantes
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, data: dict, headers: dict = None):
+                body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_stream(self, content_type: str, events):
+                """Réponse en flux (Transfer-Encoding: chunked)"""
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for event in events:
+                    data = event.encode("utf-8")
+                    self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _chat_events(self, model: str):
+                for token in stub.tokens():
+                    time.sleep(stub.token_interval)
+                    chunk = {"model": model, "choices": [{"index": 0, "delta": {"content": token}}]}
+                    yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            def _ollama_events(self, model: str):
+                for token in stub.tokens():
+                    time.sleep(stub.token_interval)
+                    yield json.dumps({"model": model, "response": token, "done": False}, ensure_ascii=False) + "\n"
+                yield json.dumps({"model": model, "response": "", "done": True}) + "\n"
+
+            def do_GET(self):
+                if self.path == "/stats":
+                    self._send_json(200, stub.stats())
+                else:
+                    self._send_json(404, {"error": f"chemin inconnu: {self.path}"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                payload = json.loads(body or b"{}")
+                rng = stub.request_rng(body)
+
+                with stub._lock:
+                    stub.request_count += 1
+                    stub.client_ports.add(self.client_address[1])
+                    failing = stub.request_count <= stub.fail_first
+
+                error = stub.fail_status if failing else stub.draw_error(rng)
+                latency = stub.latency.sample(rng) if stub.latency else 0.0
+                with stub._lock:
+                    stub.outcomes[error or 200] += 1
+
+                if error == 'timeout':
+                    # Ni en-têtes ni corps: le client abandonne après son propre timeout
+                    time.sleep(stub.hang)
+                    self.close_connection = True
+                    return
+                if error:
+                    self._send_json(error, {"error": "stub failure"}, {"Retry-After": stub.retry_after})
+                    return
+
+                time.sleep(latency)
+                stream = payload.get("stream")
+                if not stream and stub.token_rate:
+                    # Réponse complète: temps de génération de tous les tokens
+                    time.sleep(len(stub.tokens()) / stub.token_rate)
+                reply = "".join(stub.tokens()) if stub.reply_tokens else stub.reply
+
+                if self.path == "/v1/chat/completions" and stream:
+                    self._send_stream("text/event-stream", self._chat_events(payload.get("model")))
+                elif self.path == "/api/generate" and stream:
+                    self._send_stream("application/x-ndjson", self._ollama_events(payload.get("model")))
+                elif self.path == "/v1/chat/completions":
+                    self._send_json(200, {
+                        "model": payload.get("model"),
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}}]
+                    })
+                elif self.path == "/api/generate":
+                    self._send_json(200, {"model": payload.get("model"), "response": reply, "done": True})
+                else:
+                    self._send_json(404, {"error": f"chemin inconnu: {self.path}"})
+
+        return Handler
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    """Options du serveur de test (partagées avec evaluation/load_test.py)"""
+    parser.add_argument("--reply", default="Réponse de test.")
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--latency", default=None, help="Latence avant le premier octet, ex: lognormal:0.8,0.4")
+    parser.add_argument("--token-rate", type=float, default=None, help="Tokens par seconde")
+    parser.add_argument("--reply-tokens", type=int, default=None, help="Longueur de la réponse en tokens")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Probabilité d'une erreur 429")
+    parser.add_argument("--error-503", type=float, default=0.0, help="Probabilité d'une erreur 503")
+    parser.add_argument("--error-timeout", type=float, default=0.0, help="Probabilité d'un timeout")
+    parser.add_argument("--hang", type=float, default=65.0, help="Durée d'un timeout (s), > LLM_TIMEOUT")
+    parser.add_argument("--retry-after", default="0", help="En-tête Retry-After des 429/503")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def stub_from_arguments(args: argparse.Namespace, host: str = "127.0.0.1", port: int = 0) -> StubLLMServer:
+    return StubLLMServer(
+        host, port, args.reply, args.token_delay, args.fail_first, args.fail_status,
+        latency=args.latency,
+        token_rate=args.token_rate,
+        reply_tokens=args.reply_tokens,
+        error_rates={429: args.error_429, 503: args.error_503, 'timeout': args.error_timeout},
+        hang=args.hang,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Faux serveur LLM (HF Router + Ollama)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = stub_from_arguments(args, args.host, args.port)
+    print(f"🧪 Serveur LLM de test sur {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,104 @@
+"""
+METADATA FILTER - Culture Burkinabè
+Pré-filtrage des chunks par date, catégorie et article, évalué dans les index
+(base vectorielle et index BM25)
+"""
+
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+ISO_DATE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})')
+
+
+class MetadataFilter:
+    """
+    Pré-filtre sur les métadonnées des chunks, évalué dans l'index:
+    clause `where` pour ChromaDB, masque de bits des positions autorisées
+    pour FAISS (IDSelectorBitmap) et NumPy (produit matriciel restreint
+    aux lignes autorisées). Jamais de sur-échantillonnage suivi d'un
+    filtrage en Python: les `top_k` résultats respectent tous le filtre.
+
+    Args:
+        date_from, date_to: Bornes incluses 'AAAA-MM-JJ' (un chunk sans
+            date valide est exclu dès qu'une borne est donnée)
+        categories: Catégories acceptées
+        article_ids: Articles acceptés
+    """
+
+    def __init__(self, date_from: str = None, date_to: str = None,
+                 categories: List[str] = None, article_ids: List[str] = None):
+        self.date_from = self._parse_bound(date_from)
+        self.date_to = self._parse_bound(date_to)
+        self.categories = list(categories) if categories else None
+        self.article_ids = [str(article_id) for article_id in article_ids] if article_ids else None
+
+    @staticmethod
+    def date_number(date: str) -> int:
+        """'2023-03-01' -> 20230301 (0 si la date n'est pas au format ISO)"""
+        match = ISO_DATE.match(date or '')
+        return int(''.join(match.groups())) if match else 0
+
+    @classmethod
+    def _parse_bound(cls, date: Optional[str]) -> Optional[int]:
+        if not date:
+            return None
+        number = cls.date_number(date)
+        if not number:
+            raise ValueError(f"Date invalide: {date} (attendu: AAAA-MM-JJ)")
+        return number
+
+    def is_empty(self) -> bool:
+        return self.date_from is None and self.date_to is None and not self.categories and not self.article_ids
+
+    def to_chroma_where(self) -> Optional[Dict]:
+        """Clause where ChromaDB (comparaisons numériques sur 'date_num')"""
+        conditions = []
+        if self.date_from is not None:
+            conditions.append({'date_num': {'$gte': self.date_from}})
+        if self.date_to is not None:
+            conditions.append({'date_num': {'$lte': self.date_to}})
+            if self.date_from is None:
+                conditions.append({'date_num': {'$gt': 0}})
+        if self.categories:
+            conditions.append({'category': {'$in': self.categories}})
+        if self.article_ids:
+            conditions.append({'article_id': {'$in': self.article_ids}})
+
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {'$and': conditions}
+
+    def mask(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Positions autorisées (tableau de booléens) à partir des colonnes de filter_columns()"""
+        dates = columns['date_num']
+        mask = np.ones(len(dates), dtype=bool)
+        if self.date_from is not None:
+            mask &= dates >= self.date_from
+        if self.date_to is not None:
+            mask &= (dates <= self.date_to) & (dates > 0)
+        if self.categories:
+            mask &= np.isin(columns['category'], self.categories)
+        if self.article_ids:
+            mask &= np.isin(columns['article_id'], self.article_ids)
+        return mask
+
+
+FILTER_COLUMNS = ('date_num', 'category', 'article_id')
+
+
+def filter_columns(metadatas: List[Dict]) -> Dict[str, np.ndarray]:
+    """Colonnes filtrables (une valeur par chunk, dans l'ordre des positions)"""
+    return {
+        'date_num': np.array([
+            int(metadata.get('date_num') or MetadataFilter.date_number(metadata.get('date', '')))
+            for metadata in metadatas
+        ], dtype=np.int32),
+        'category': np.array([metadata.get('category', '') for metadata in metadatas], dtype=str),
+        'article_id': np.array([str(metadata.get('article_id', '')) for metadata in metadatas], dtype=str)
+    }
+
+
+def is_filtering(where: Optional[MetadataFilter]) -> bool:
+    return where is not None and not where.is_empty()
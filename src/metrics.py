@@ -0,0 +1,193 @@
+"""
+METRICS - Culture Burkinabè
+Mesure du temps par étape (spans) et export au format texte Prometheus
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Bornes des histogrammes de durée (secondes): de l'encodage (ms) à l'appel LLM (dizaines de s)
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry: List["Metric"] = []
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Métrique du registre du processus, à étiquettes fixes"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+                                for key, value in values]
+
+
+class Histogram(Metric):
+    """Histogramme cumulatif (buckets 'le', _sum, _count) par combinaison d'étiquettes"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                 buckets: Iterable[float] = DURATION_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+
+        lines = self.header()
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+STAGE_DURATION = Histogram(
+    "rag_stage_duration_seconds",
+    "Durée des étapes du pipeline (encodage, recherche, prompt, LLM)",
+    labels=("stage",)
+)
+REQUEST_DURATION = Histogram(
+    "rag_request_duration_seconds",
+    "Durée des requêtes HTTP jusqu'à l'envoi des en-têtes",
+    labels=("endpoint",)
+)
+REQUESTS = Counter("rag_requests_total", "Requêtes HTTP par endpoint et code de statut", labels=("endpoint", "status"))
+
+
+class Trace:
+    """Durées cumulées par étape pour une requête"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def breakdown_ms(self) -> Dict[str, float]:
+        """Durée de chaque étape et durée totale depuis le début de la trace (ms)"""
+        with self._lock:
+            breakdown = {name: round(seconds * 1000, 3) for name, seconds in self.spans.items()}
+        breakdown['total'] = round((time.perf_counter() - self.started) * 1000, 3)
+        return breakdown
+
+
+# Trace de la requête en cours (suivie dans les threads du pool via contextvars.copy_context)
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("rag_trace", default=None)
+
+
+def start_trace() -> Trace:
+    """Nouvelle trace pour le contexte courant (une requête)"""
+    trace = Trace()
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def record(stage: str, seconds: float):
+    """Durée d'une étape: histogramme du processus et trace de la requête en cours"""
+    STAGE_DURATION.observe(seconds, stage=stage)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(stage, seconds)
+
+
+@contextmanager
+def span(stage: str):
+    """Mesure du bloc comme étape `stage` (voir record)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def render_gauges(name: str, help_text: str, values: Dict[Tuple[Tuple[str, str], ...], float],
+                  kind: str = "gauge") -> List[str]:
+    """Valeurs lues au moment de l'export (statistiques des caches, files...), clés: ((étiquette, valeur), ...)"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in values.items():
+        label_text = "{" + ",".join(f'{key}="{_escape(val)}"' for key, val in labels) + "}" if labels else ""
+        lines.append(f"{name}{label_text} {_format_value(value)}")
+    return lines
+
+
+def render(extra: Iterable[str] = ()) -> str:
+    """Registre complet au format texte Prometheus (version 0.0.4)"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
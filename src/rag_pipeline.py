@@ -4,104 +4,299 @@ PIPELINE RAG COMPLET - Culture Burkinabè
 Version finale avec HuggingFace Router API
 """
 
+import asyncio
+import hashlib
 import json
+import threading
 import time
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import List, Dict, Iterator, AsyncIterator, Optional, Tuple
 import os
 
 # Open Source Libraries
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.config import Settings
+# (sentence_transformers/torch sont importés au chargement du modèle: import du module rapide)
+import numpy as np
 from dotenv import load_dotenv
 load_dotenv()
 
+try:
+    from llm_manager import get_llm_client, LLMError
+    from cache_manager import EmbeddingCache, QueryEmbeddingCache, SemanticAnswerCache
+    from embeddings_manager import BatchingQueryEncoder
+    from vector_store import create_vector_store, NumpyVectorStore
+    from data_preprocessing import load_corpus
+    from bm25_index import BM25Index, reciprocal_rank_fusion
+    from metadata_filter import MetadataFilter
+    from metrics import span
+    from chunker import embedding_text
+except ImportError:
+    from src.llm_manager import get_llm_client, LLMError
+    from src.cache_manager import EmbeddingCache, QueryEmbeddingCache, SemanticAnswerCache
+    from src.embeddings_manager import BatchingQueryEncoder
+    from src.vector_store import create_vector_store, NumpyVectorStore
+    from src.data_preprocessing import load_corpus
+    from src.bm25_index import BM25Index, reciprocal_rank_fusion
+    from src.metadata_filter import MetadataFilter
+    from src.metrics import span
+    from src.chunker import embedding_text
+
 
 class CultureRAGPipeline:
     """Pipeline RAG pour questions-réponses sur la culture burkinabè"""
     
+    RETRIEVAL_MODES = ('dense', 'bm25', 'hybrid')
+    
     def __init__(
         self,
         corpus_file: str,
         model_name: str = "paraphrase-multilingual-MiniLM-L12-v2",
-        vector_db_path: str = "data/vectors/chroma_db",
-        top_k: int = 5
+        vector_db_path: str = None,
+        top_k: int = 5,
+        vector_backend: str = None
     ):
         """
         Initialisation du pipeline RAG
+        
+        Args:
+            vector_backend: 'chroma' (défaut), 'faiss' ou 'numpy' (défaut: VECTOR_BACKEND dans .env)
+            vector_db_path: Dossier de la base vectorielle (défaut selon le backend)
         """
         self.corpus_file = corpus_file
         self.top_k = top_k
+        # Durée de chaque phase d'initialisation (secondes), exposée par l'API
+        self.startup_timings: Dict[str, float] = {}
         
         print("🚀 Initialisation du pipeline RAG...")
         
         # 1. Chargement du corpus
         print("📚 Chargement du corpus...")
-        with open(corpus_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            self.corpus = data['corpus']
+        with self.timed_phase('corpus'):
+            # JSON, JSONL (mode streaming) ou dossier en colonnes (mmap, chargement paresseux)
+            self.corpus = load_corpus(corpus_file)
         
         print(f"✅ {len(self.corpus)} chunks chargés")
         
         # 2. Modèle d'embeddings
         print(f"🧠 Chargement du modèle d'embeddings: {model_name}")
-        self.embedding_model = SentenceTransformer(model_name)
+        with self.timed_phase('embedding_model'):
+            from sentence_transformers import SentenceTransformer
+            self.embedding_model = SentenceTransformer(model_name)
         print(f"✅ Dimension des vecteurs: {self.embedding_model.get_sentence_embedding_dimension()}")
         
-        # 3. Base vectorielle ChromaDB
-        print("💾 Initialisation de ChromaDB...")
-        self.chroma_client = chromadb.PersistentClient(
-            path=vector_db_path,
-            settings=Settings(anonymized_telemetry=False)
+        # Micro-batching des questions concurrentes (QUERY_BATCH_SIZE=1 pour désactiver)
+        batch_size = int(os.getenv('QUERY_BATCH_SIZE', '32'))
+        self.query_encoder = BatchingQueryEncoder(
+            self.embedding_model,
+            max_batch_size=batch_size,
+            max_wait_ms=float(os.getenv('QUERY_BATCH_WAIT_MS', '5'))
+        ) if batch_size > 1 else None
+        
+        # Cache persistant des embeddings de chunks (EMBEDDING_CACHE_FILE vide pour désactiver)
+        self.model_name = model_name
+        embedding_cache_file = os.getenv('EMBEDDING_CACHE_FILE', 'data/vectors/embedding_cache.sqlite')
+        self.embedding_cache = EmbeddingCache(
+            embedding_cache_file,
+            dtype=os.getenv('EMBEDDING_CACHE_DTYPE', 'float32')
+        ) if embedding_cache_file else None
+        
+        # Cache des embeddings de questions (QUERY_CACHE_FILE pour le conserver entre redémarrages)
+        self.query_cache = QueryEmbeddingCache(
+            max_size=int(os.getenv('QUERY_CACHE_SIZE', '1024')),
+            path=os.getenv('QUERY_CACHE_FILE') or None,
+            model_name=model_name
         )
         
-        # Créer ou récupérer la collection
+        # 3. Base vectorielle (ChromaDB, FAISS ou matrice NumPy mappée en mémoire)
+        self.vector_backend = vector_backend or os.getenv('VECTOR_BACKEND', 'chroma')
         self.collection_name = "culture_burkina"
+        self.matrix_path = os.getenv('EMBEDDINGS_MATRIX_PATH', 'data/vectors/matrix')
+        print(f"💾 Initialisation de la base vectorielle ({self.vector_backend})...")
+        
+        if self.vector_backend == 'faiss':
+            store_options = {
+                'index_type': os.getenv('FAISS_INDEX_TYPE', 'flat'),
+                'nlist': int(os.getenv('FAISS_NLIST', '1024')),
+                'nprobe': int(os.getenv('FAISS_NPROBE', '16')),
+                'hnsw_m': int(os.getenv('FAISS_HNSW_M', '32')),
+                'ef_search': int(os.getenv('FAISS_EF_SEARCH', '64')),
+                'exact_filter_max': int(os.getenv('FAISS_EXACT_FILTER_MAX', '4096'))
+            }
+        elif self.vector_backend == 'numpy':
+            store_options = {}
+            vector_db_path = vector_db_path or self.matrix_path
+        else:
+            store_options = {'collection_name': self.collection_name}
+        
+        with self.timed_phase('vector_store'):
+            self.vector_store = create_vector_store(self.vector_backend, vector_db_path, **store_options)
+        
+        if self.vector_store.count() > 0:
+            print(f"✅ Index chargé ({self.vector_store.count()} documents)")
+        else:
+            print("⚠️ Index vide, il faut indexer le corpus")
+        
+        # Index BM25 (mots exacts: noms propres, sigles), fusionné avec la recherche dense par RRF
+        self.retrieval_mode = os.getenv('RETRIEVAL_MODE', 'dense')
+        if self.retrieval_mode not in self.RETRIEVAL_MODES:
+            raise ValueError(f"RETRIEVAL_MODE invalide: {self.retrieval_mode} (attendu: {', '.join(self.RETRIEVAL_MODES)})")
+        self.hybrid_candidates = int(os.getenv('HYBRID_CANDIDATES', '50'))
+        self.rrf_k = int(os.getenv('RRF_K', '60'))
+        self.bm25_path = os.getenv('BM25_INDEX_FILE', 'data/vectors/bm25.npz')
+        self._bm25_mtime = None
+        self._bm25_reload_lock = threading.Lock()
+        with self.timed_phase('bm25'):
+            self.bm25_index = self.load_bm25_index()
+        
+        # 4. Client LLM partagé (connexions HTTP persistantes)
+        self.llm_client = get_llm_client()
+        # Générations simultanées d'un lot de questions (answer_questions, /ask/batch)
+        self.batch_concurrency = int(os.getenv('BATCH_MAX_CONCURRENCY', '8'))
+        
+        # 5. Cache sémantique des réponses (ANSWER_CACHE_SIZE=0 pour désactiver)
+        self.answer_cache = SemanticAnswerCache(
+            max_size=int(os.getenv('ANSWER_CACHE_SIZE', '512')),
+            ttl=float(os.getenv('ANSWER_CACHE_TTL', '3600')),
+            threshold=float(os.getenv('ANSWER_CACHE_THRESHOLD', '0.9'))
+        )
+    
+    @contextmanager
+    def timed_phase(self, name: str):
+        """Mesure d'une phase de démarrage (ajoutée à startup_timings)"""
+        start = time.perf_counter()
         try:
-            self.collection = self.chroma_client.get_collection(self.collection_name)
-            print(f"✅ Collection '{self.collection_name}' chargée ({self.collection.count()} documents)")
-        except:
-            self.collection = None
-            print("⚠️ Collection non trouvée, il faut l'indexer")
-    
-    def index_corpus(self):
-        """Indexation du corpus dans ChromaDB"""
-        print("\n🔄 INDEXATION DU CORPUS")
-        print("="*50)
+            yield
+        finally:
+            self.startup_timings[name] = round(time.perf_counter() - start, 3)
+    
+    def warm_up(self, query: str = "Qu'est-ce que le FESPACO ?"):
+        """
+        Premier encodage et première recherche hors requête utilisateur
         
+        Le premier appel au modèle alloue les buffers de torch et le premier
+        accès à l'index charge ses pages en mémoire: sans échauffement, ce
+        coût tombe sur la première question. Les caches ne sont pas modifiés.
+        """
+        with self.timed_phase('warmup'):
+            query_embedding = self.embedding_model.encode([query])[0]
+            if self.vector_store.count() > 0:
+                self.vector_store.query([query_embedding], self.top_k)
+    
+    def _bm25_file_mtime(self) -> Optional[int]:
         try:
-            self.chroma_client.delete_collection(self.collection_name)
-            print("🗑️ Ancienne collection supprimée")
-        except:
-            pass
-        
-        self.collection = self.chroma_client.create_collection(
-            name=self.collection_name,
-            metadata={"description": "Articles culture burkinabè - LeFaso.net"}
-        )
+            return os.stat(self.bm25_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def load_bm25_index(self) -> BM25Index:
+        """Index BM25 sauvegardé, ou construit depuis le corpus si la base vectorielle est déjà indexée"""
+        if os.path.exists(self.bm25_path):
+            try:
+                mtime = self._bm25_file_mtime()
+                index = BM25Index.load(self.bm25_path)
+                self._bm25_mtime = mtime
+                print(f"✅ Index BM25 chargé ({len(index)} documents)")
+                return index
+            except (KeyError, ValueError) as e:
+                print(f"⚠️ Index BM25 illisible ({e}), reconstruction")
         
+        index = BM25Index()
+        if self.vector_store.count() > 0:
+            print("🔤 Construction de l'index BM25 depuis le corpus...")
+            ids, texts, metadatas = self.prepare_documents()
+            index.upsert(ids, texts, metadatas)
+            self._persist_bm25(index)
+        return index
+    
+    def _persist_bm25(self, index: BM25Index):
+        """Sauvegarde de l'index BM25 (ce processus a déjà la version écrite: pas de rechargement)"""
+        index.persist(self.bm25_path)
+        self._bm25_mtime = self._bm25_file_mtime()
+    
+    def _rebuild_bm25(self, ids: List[str], texts: List[str], metadatas: List[Dict]):
+        """Nouvel index BM25 construit à part puis substitué: les recherches ne voient jamais d'index vide"""
+        index = BM25Index()
+        index.upsert(ids, texts, metadatas)
+        # Sauvegarde (compact) avant la substitution: l'index servi n'est plus modifié
+        self._persist_bm25(index)
+        self.bm25_index = index
+    
+    def refresh_bm25_index(self):
+        """Rechargement de l'index BM25 si un autre processus l'a réécrit (comme NumpyVectorStore)"""
+        mtime = self._bm25_file_mtime()
+        if mtime is None or mtime == self._bm25_mtime:
+            return
+        with self._bm25_reload_lock:
+            mtime = self._bm25_file_mtime()
+            if mtime is None or mtime == self._bm25_mtime:
+                return
+            try:
+                index = BM25Index.load(self.bm25_path)
+            except (OSError, KeyError, ValueError) as e:
+                print(f"⚠️ Index BM25 illisible ({e}), version précédente conservée")
+                return
+            # Remplacement atomique: les recherches en cours finissent sur l'ancien index
+            self.bm25_index = index
+            self._bm25_mtime = mtime
+            print(f"🔄 Index BM25 rechargé ({len(index)} documents)")
+    
+    def count_articles(self) -> int:
+        """Nombre d'articles distincts du corpus"""
+        if hasattr(self.corpus, 'num_articles'):
+            return self.corpus.num_articles
+        return len(set(doc['article_id'] for doc in self.corpus))
+    
+    @staticmethod
+    def content_hash(text: str, metadata: Dict) -> str:
+        """Empreinte sha256 du texte et des métadonnées d'un chunk"""
+        payload = text + "\n" + json.dumps(metadata, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def prepare_documents(self) -> Tuple[List[str], List[str], List[Dict]]:
+        """Identifiants, textes et métadonnées (avec 'content_hash') des chunks du corpus"""
+        ids = []
         texts = []
         metadatas = []
-        ids = []
         
         for doc in self.corpus:
-            full_text = f"Titre: {doc['title']}\n\nContenu: {doc['content']}"
-            texts.append(full_text)
-            
-            metadatas.append({
+            full_text = embedding_text(doc['title'], doc['content'])
+            metadata = {
                 'article_id': doc['article_id'],
                 'url': doc['url'],
                 'title': doc['title'],
                 'date': doc['date'],
+                # AAAAMMJJ (0 si inconnue): filtre par plage de dates dans l'index
+                'date_num': MetadataFilter.date_number(doc['date']),
                 'category': doc['category'],
                 'chunk_index': str(doc['chunk_index']),
                 'content': doc['content']
-            })
+            }
+            # Position du chunk dans l'article nettoyé (chunker par tokens)
+            if 'char_start' in doc:
+                metadata['char_start'] = doc['char_start']
+                metadata['char_end'] = doc['char_end']
+            metadata['content_hash'] = self.content_hash(full_text, metadata)
             
             ids.append(doc['id'])
+            texts.append(full_text)
+            metadatas.append(metadata)
         
-        print(f"🔢 Génération des embeddings pour {len(texts)} documents...")
-        batch_size = 32
+        return ids, texts, metadatas
+    
+    def encode_documents(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Embeddings des chunks (seuls les textes absents du cache persistant sont encodés)"""
+        if self.embedding_cache is None:
+            return self._encode_batches(texts, batch_size)
+        
+        hits_before = self.embedding_cache.hits
+        embeddings = self.embedding_cache.encode(
+            self.model_name, texts, lambda missing: self._encode_batches(missing, batch_size)
+        )
+        reused = self.embedding_cache.hits - hits_before
+        print(f"🗄️ Cache d'embeddings: {reused} réutilisés, {len(texts) - reused} encodés")
+        return embeddings
+    
+    def _encode_batches(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
         all_embeddings = []
         
         for i in range(0, len(texts), batch_size):
@@ -111,50 +306,343 @@ class CultureRAGPipeline:
                 show_progress_bar=True,
                 convert_to_numpy=True
             )
-            all_embeddings.extend(embeddings.tolist())
+            all_embeddings.append(embeddings)
             print(f"  Batch {i//batch_size + 1}/{(len(texts)-1)//batch_size + 1} traité")
         
-        print("💾 Ajout des documents à ChromaDB...")
-        self.collection.add(
+        return np.vstack(all_embeddings)
+    
+    def index_corpus(self, incremental: bool = False, batch_size: int = 256):
+        """
+        Indexation du corpus dans la base vectorielle
+        
+        Args:
+            incremental: Ne réencoder que les chunks nouveaux ou modifiés
+                (comparaison des 'content_hash'), supprimer ceux qui ont
+                disparu; l'index n'est jamais vidé pendant la mise à jour
+            batch_size: Taille des lots d'upsert en mode incrémental
+        """
+        print("\n🔄 INDEXATION DU CORPUS" + (" (incrémentale)" if incremental else ""))
+        print("="*50)
+        
+        ids, texts, metadatas = self.prepare_documents()
+        
+        if incremental:
+            self._index_incremental(ids, texts, metadatas, batch_size)
+            print("="*50)
+            return
+        
+        self.vector_store.reset()
+        print("🗑️ Ancien index supprimé")
+        
+        print(f"🔢 Génération des embeddings pour {len(texts)} documents...")
+        all_embeddings = self.encode_documents(texts)
+        
+        print(f"💾 Ajout des documents à l'index ({self.vector_backend})...")
+        self.vector_store.add(
+            ids=ids,
             embeddings=all_embeddings,
             documents=texts,
-            metadatas=metadatas,
-            ids=ids
+            metadatas=metadatas
         )
+        self.vector_store.persist()
+        
+        print(f"🔤 Index BM25: {self.bm25_path}")
+        self._rebuild_bm25(ids, texts, metadatas)
+        
+        # Export de la matrice float32 (.npy) lue en mmap par VECTOR_BACKEND=numpy
+        if self.vector_backend != 'numpy':
+            print(f"💾 Export de la matrice d'embeddings: {self.matrix_path}")
+            matrix_store = NumpyVectorStore(self.matrix_path)
+            matrix_store.reset()
+            matrix_store.add(ids, all_embeddings, texts, metadatas)
+            matrix_store.persist()
+        
+        # Les réponses en cache reposent sur l'ancien index
+        self.answer_cache.invalidate()
         
-        print(f"✅ Indexation terminée: {self.collection.count()} documents")
+        print(f"✅ Indexation terminée: {self.vector_store.count()} documents")
         print("="*50)
     
-    def retrieve(self, query: str, top_k: int = None) -> List[Dict]:
-        """Récupération des documents pertinents"""
+    def _index_incremental(self, ids: List[str], texts: List[str], metadatas: List[Dict], batch_size: int):
+        """Mise à jour de l'index à partir des empreintes déjà indexées"""
+        indexed = self.vector_store.get_hashes()
+        
+        changed = [i for i, doc_id in enumerate(ids) if indexed.get(doc_id) != metadatas[i]['content_hash']]
+        new_count = sum(1 for i in changed if ids[i] not in indexed)
+        current_ids = set(ids)
+        removed = [doc_id for doc_id in indexed if doc_id not in current_ids]
+        
+        print(f"📊 Nouveaux: {new_count} | Modifiés: {len(changed) - new_count} | "
+              f"Supprimés: {len(removed)} | Inchangés: {len(ids) - len(changed)}")
+        
+        # Index BM25 absent ou désynchronisé: reconstruction complète (pas d'encodage)
+        self.refresh_bm25_index()
+        if len(self.bm25_index) != len(indexed) or not os.path.exists(self.bm25_path):
+            print("🔤 Reconstruction de l'index BM25...")
+            self._rebuild_bm25(ids, texts, metadatas)
+        elif changed or removed:
+            # Mise à jour sur une copie: les recherches en cours lisent l'index servi sans verrou
+            index = self.bm25_index.copy()
+            index.upsert([ids[i] for i in changed], [texts[i] for i in changed], [metadatas[i] for i in changed])
+            index.delete(removed)
+            self._persist_bm25(index)
+            self.bm25_index = index
+        
+        if not changed and not removed:
+            print(f"✅ Index à jour: {self.vector_store.count()} documents")
+            return
+        
+        stores = [self.vector_store]
+        if self.vector_backend != 'numpy':
+            stores.append(NumpyVectorStore(self.matrix_path))
+        
+        for start in range(0, len(changed), batch_size):
+            batch = changed[start:start + batch_size]
+            print(f"🔢 Embeddings des chunks {start + 1}-{start + len(batch)}/{len(changed)}...")
+            embeddings = self.encode_documents([texts[i] for i in batch])
+            
+            for store in stores:
+                store.upsert(
+                    ids=[ids[i] for i in batch],
+                    embeddings=embeddings,
+                    documents=[texts[i] for i in batch],
+                    metadatas=[metadatas[i] for i in batch]
+                )
+        
+        if removed:
+            print(f"🗑️ Suppression de {len(removed)} chunks disparus...")
+            for store in stores:
+                store.delete(removed)
+        
+        for store in stores:
+            store.persist()
+        
+        if len(stores) > 1 and stores[1].count() != self.vector_store.count():
+            print(f"⚠️ Matrice {self.matrix_path} désynchronisée: relancer index_corpus() sans mode incrémental")
+        
+        self.answer_cache.invalidate()
+        
+        print(f"✅ Indexation terminée: {self.vector_store.count()} documents")
+    
+    def encode_query(self, query: str) -> np.ndarray:
+        """Embedding de la question (via le cache LRU)"""
+        with span('encode'):
+            query_embedding = self.query_cache.get(query)
+            if query_embedding is None:
+                if self.query_encoder is not None:
+                    vector = self.query_encoder.encode(query)
+                else:
+                    vector = self.embedding_model.encode(query)
+                query_embedding = self.query_cache.put(query, vector)
+        return query_embedding
+    
+    async def aencode_query(self, query: str) -> Optional[np.ndarray]:
+        """
+        Embedding de la question depuis la boucle asyncio (via le cache LRU)
+        
+        Toutes les requêtes concurrentes de l'API partagent ainsi les passes
+        du BatchingQueryEncoder, quel que soit le nombre de threads du pool.
+        None sans micro-batching (QUERY_BATCH_SIZE=1): l'encodage se fait
+        alors dans le pool, par encode_query.
+        """
+        if self.query_encoder is None:
+            return None
+        with span('encode'):
+            query_embedding = self.query_cache.get(query)
+            if query_embedding is None:
+                query_embedding = self.query_cache.put(query, await self.query_encoder.aencode(query))
+        return query_embedding
+    
+    def needs_query_embedding(self, mode: str = None) -> bool:
+        """
+        retrieve() encode-t-il la question? (pas en mode 'bm25')
+        
+        Sans effet de bord: appelé depuis la boucle asyncio, il ne recharge
+        pas l'index BM25 (rechargement fait par search_many, dans le pool)
+        """
+        return (mode or self.retrieval_mode) != 'bm25' or len(self.bm25_index) == 0
+    
+    def retrieve(self, query: str, top_k: int = None, mode: str = None, filters=None,
+                 query_embedding: np.ndarray = None) -> List[Dict]:
+        """
+        Récupération des documents pertinents
+        
+        Args:
+            filters: MetadataFilter ou dict (date_from, date_to, categories, article_ids)
+            query_embedding: Embedding déjà calculé (aencode_query), sinon encodé ici
+        """
+        with span('retrieve'):
+            self.refresh_bm25_index()
+            if not self.needs_query_embedding(mode):
+                return self.search(None, top_k, query=query, mode='bm25', filters=filters)
+            if query_embedding is None:
+                query_embedding = self.encode_query(query)
+            return self.search(query_embedding, top_k, query=query, mode=mode, filters=filters)
+    
+    def retrieve_with_embedding(self, query: str, top_k: int = None, mode: str = None,
+                                filters=None, query_embedding: np.ndarray = None) -> Tuple[List[Dict], np.ndarray]:
+        """Récupération des documents + embedding de la question (réutilisé par le cache)"""
+        with span('retrieve'):
+            if query_embedding is None:
+                query_embedding = self.encode_query(query)
+            return self.search(query_embedding, top_k, query=query, mode=mode, filters=filters), query_embedding
+    
+    def encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Embeddings de plusieurs questions: une seule passe du modèle pour celles absentes du cache"""
+        with span('encode'):
+            vectors = [self.query_cache.get(query) for query in queries]
+            missing = list(dict.fromkeys(query for query, vector in zip(queries, vectors) if vector is None))
+            if missing:
+                encoded = {
+                    query: self.query_cache.put(query, vector)
+                    for query, vector in zip(missing, self.embedding_model.encode(missing))
+                }
+                vectors = [encoded[query] if vector is None else vector for query, vector in zip(queries, vectors)]
+            return np.vstack(vectors)
+    
+    def retrieve_many(self, queries: List[str], top_k: int = None, mode: str = None,
+                      filters=None) -> Tuple[List[List[Dict]], np.ndarray]:
+        """
+        Récupération pour une liste de questions: encodage en un lot, puis
+        une seule recherche multi-requêtes (voir search_many)
+        
+        Returns:
+            (documents de chaque question, matrice des embeddings des questions)
+        """
+        with span('retrieve'):
+            query_embeddings = self.encode_queries(queries)
+            return self.search_many(query_embeddings, queries, top_k, mode, filters), query_embeddings
+    
+    @staticmethod
+    def _make_doc(doc_id: str, metadata: Dict, distance: float = None) -> Dict:
+        return {
+            'id': doc_id,
+            'content': metadata['content'],
+            'title': metadata['title'],
+            'url': metadata['url'],
+            'date': metadata['date'],
+            'distance': distance,
+            'similarity_score': 1 - distance if distance is not None else None
+        }
+    
+    def search(self, query_embedding: np.ndarray, top_k: int = None, query: str = None, mode: str = None,
+               filters=None) -> List[Dict]:
+        """
+        Recherche des documents les plus pertinents
+        
+        Args:
+            query_embedding: Embedding de la question (inutile en mode 'bm25')
+            query: Texte de la question (modes 'bm25' et 'hybrid')
+            mode: 'dense' (embeddings), 'bm25' (mots exacts) ou 'hybrid'
+                (fusion RRF des deux classements); défaut: RETRIEVAL_MODE
+            filters: Pré-filtre (MetadataFilter ou dict) appliqué dans les
+                index: seuls les chunks qui le satisfont sont classés
+        
+        En modes 'bm25' et 'hybrid', 'similarity_score' est le score de
+        l'index utilisé ramené dans [0, 1] (BM25 relatif au meilleur
+        document, RRF relatif au maximum: premier dans les deux classements);
+        les scores bruts sont dans 'bm25_score' et 'rrf_score'. En mode
+        'hybrid', 'dense_similarity' vaut None pour un document trouvé par
+        BM25 seul.
+        """
+        query_embeddings = None if query_embedding is None else [query_embedding]
+        return self.search_many(query_embeddings, [query], top_k, mode, filters)[0]
+    
+    def search_many(self, query_embeddings, queries: List[str], top_k: int = None, mode: str = None,
+                    filters=None) -> List[List[Dict]]:
+        """
+        Recherche pour plusieurs questions à la fois (voir search)
+        
+        Un seul appel multi-requêtes à la base vectorielle, et une seule
+        lecture des métadonnées pour l'union des documents retenus.
+        
+        Args:
+            query_embeddings: Matrice (n, dim) ou liste d'embeddings (None en mode 'bm25')
+            queries: Textes des questions, dans le même ordre
+        """
         if top_k is None:
             top_k = self.top_k
+        mode = mode or self.retrieval_mode
+        if isinstance(filters, dict):
+            filters = MetadataFilter(**filters)
+        if mode not in self.RETRIEVAL_MODES:
+            raise ValueError(f"Mode de recherche inconnu: {mode} (attendu: {', '.join(self.RETRIEVAL_MODES)})")
+        if not queries:
+            return []
         
-        query_embedding = self.embedding_model.encode(query).tolist()
+        self.refresh_bm25_index()
+        bm25_index = self.bm25_index
         
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k,
-            include=['documents', 'metadatas', 'distances']
-        )
+        # Sans texte ou sans index BM25 (corpus pas encore indexé): recherche dense seule
+        if any(query is None for query in queries) or len(bm25_index) == 0:
+            if query_embeddings is None:
+                return [[] for _ in queries]
+            mode = 'dense'
         
-        retrieved_docs = []
-        for i in range(len(results['ids'][0])):
-            doc = {
-                'id': results['ids'][0][i],
-                'content': results['metadatas'][0][i]['content'],
-                'title': results['metadatas'][0][i]['title'],
-                'url': results['metadatas'][0][i]['url'],
-                'date': results['metadatas'][0][i]['date'],
-                'distance': results['distances'][0][i],
-                'similarity_score': 1 - results['distances'][0][i]
-            }
-            retrieved_docs.append(doc)
+        if mode == 'dense':
+            with span('vector_query'):
+                dense_lists = self.vector_store.query(query_embeddings, top_k, where=filters)
+            return [
+                [self._make_doc(hit['id'], hit['metadata'], hit['distance']) for hit in hits]
+                for hits in dense_lists
+            ]
         
-        return retrieved_docs
+        if mode == 'bm25':
+            with span('bm25_query'):
+                lexical_lists = [bm25_index.search(query, top_k, where=filters) for query in queries]
+            with span('fetch_metadata'):
+                metadatas = self.vector_store.get(list({doc_id for lexical in lexical_lists for doc_id, _ in lexical}))
+            results = []
+            for lexical in lexical_lists:
+                retrieved_docs = []
+                for doc_id, score in lexical:
+                    if doc_id in metadatas:
+                        doc = self._make_doc(doc_id, metadatas[doc_id])
+                        doc['bm25_score'] = score
+                        doc['similarity_score'] = score / lexical[0][1]
+                        retrieved_docs.append(doc)
+                results.append(retrieved_docs)
+            return results
+        
+        # Hybride: les deux listes de candidats, fusionnées par rang; les
+        # métadonnées ne sont lues que pour les `top_k` documents retenus
+        candidates = max(top_k, self.hybrid_candidates)
+        with span('vector_query'):
+            dense_lists = self.vector_store.query(query_embeddings, candidates, include_metadata=False, where=filters)
+        fused_lists = []
+        for query, dense_hits in zip(queries, dense_lists):
+            with span('bm25_query'):
+                lexical = bm25_index.search(query, candidates, where=filters)
+            fused = reciprocal_rank_fusion([[hit['id'] for hit in dense_hits], [doc_id for doc_id, _ in lexical]], self.rrf_k)[:top_k]
+            fused_lists.append((fused, {hit['id']: hit['distance'] for hit in dense_hits}, dict(lexical)))
+        
+        with span('fetch_metadata'):
+            metadatas = self.vector_store.get(list({doc_id for fused, _, _ in fused_lists for doc_id, _ in fused}))
+        max_rrf = 2.0 / (self.rrf_k + 1)
+        
+        results = []
+        for fused, distances, bm25_scores in fused_lists:
+            retrieved_docs = []
+            for doc_id, rrf_score in fused:
+                if doc_id not in metadatas:
+                    continue
+                doc = self._make_doc(doc_id, metadatas[doc_id], distances.get(doc_id))
+                doc['dense_similarity'] = doc['similarity_score']
+                doc['bm25_score'] = bm25_scores.get(doc_id)
+                doc['rrf_score'] = rrf_score
+                doc['similarity_score'] = rrf_score / max_rrf
+                retrieved_docs.append(doc)
+            results.append(retrieved_docs)
+        
+        return results
     
     def generate_prompt(self, query: str, retrieved_docs: List[Dict]) -> str:
         """Génération du prompt pour le LLM"""
+        with span('prompt'):
+            return self._build_prompt(query, retrieved_docs)
+    
+    @staticmethod
+    def _build_prompt(query: str, retrieved_docs: List[Dict]) -> str:
         context_parts = []
         for i, doc in enumerate(retrieved_docs, 1):
             context_parts.append(
@@ -191,107 +679,49 @@ RÉPONSE:"""
         """
         Génération avec HuggingFace Router API
         Utilise Mistral-7B via le router HuggingFace
+        
+        Lève LLMError si l'API reste indisponible après les tentatives
         """
-        try:
-            import requests
-            
-            # Récupérer le token (supporte HF_TOKEN ou HUGGINGFACE_TOKEN)
-            hf_token = os.getenv('HF_TOKEN') or os.getenv('HUGGINGFACE_TOKEN')
-            
-            if not hf_token:
-                return "❌ Token HuggingFace manquant. Ajouter HF_TOKEN ou HUGGINGFACE_TOKEN dans .env"
-            
-            # URL de l'API Router HuggingFace
-            API_URL = "https://router.huggingface.co/v1/chat/completions"
-            
-            headers = {
-                "Authorization": f"Bearer {hf_token}",
-                "Content-Type": "application/json"
-            }
-            
-            # Payload au format OpenAI (chat completions)
-            payload = {
-                "model": "mistralai/Mistral-7B-Instruct-v0.2:featherless-ai",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "Tu es un assistant expert sur la culture burkinabè. Réponds en français."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "max_tokens": 500,
-                "temperature": 0.7,
-                "top_p": 0.9
-            }
-            
-            print("   🔄 Appel de l'API HuggingFace Router...")
-            
-            response = requests.post(API_URL, headers=headers, json=payload, timeout=60)
-            
-            if response.status_code == 200:
-                result = response.json()
-                
-                # Extraire le message de la réponse
-                if "choices" in result and len(result["choices"]) > 0:
-                    message = result["choices"][0]["message"]["content"]
-                    print("   ✅ Réponse générée avec succès")
-                    return message
-                else:
-                    return "❌ Format de réponse inattendu"
-                    
-            elif response.status_code == 401:
-                return "❌ Token HuggingFace invalide. Vérifiez votre token dans .env"
-            elif response.status_code == 429:
-                return "❌ Limite de requêtes atteinte. Réessayez dans quelques minutes."
-            elif response.status_code == 503:
-                return "⏳ Modèle en cours de chargement. Réessayez dans 30 secondes."
-            else:
-                return f"❌ Erreur API: {response.status_code} - {response.text[:200]}"
-                
-        except requests.exceptions.Timeout:
-            return "⏱️ Timeout: La requête a pris trop de temps. Réessayez."
-        except Exception as e:
-            return f"❌ Erreur: {str(e)}"
+        print("   🔄 Appel de l'API HuggingFace Router...")
+        message = self.llm_client.generate('huggingface', prompt)
+        print("   ✅ Réponse générée avec succès")
+        return message
     
     def generate_answer_local(self, prompt: str) -> str:
         """
         Génération de réponse avec LLM local (Ollama)
-        Optionnel - nécessite Ollama installé
+        Optionnel - nécessite Ollama installé: https://ollama.ai/
         """
-        try:
-            import requests
-            
-            response = requests.post(
-                'http://localhost:11434/api/generate',
-                json={
-                    'model': 'mistral',
-                    'prompt': prompt,
-                    'stream': False,
-                    'options': {
-                        'temperature': 0.7,
-                        'top_p': 0.9,
-                        'num_predict': 500
-                    }
-                },
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                return response.json()['response']
-            else:
-                return "❌ Ollama non disponible. Installez Ollama ou utilisez HuggingFace."
-        
-        except Exception as e:
-            return f"❌ Erreur Ollama: {str(e)}\nInstallez Ollama: https://ollama.ai/"
+        return self.llm_client.generate('ollama', prompt)
+    
+    @staticmethod
+    def llm_backend_name(use_local_llm: bool) -> str:
+        """Nom du backend LLM: 'ollama' (local) ou 'huggingface'"""
+        return 'ollama' if use_local_llm else 'huggingface'
+    
+    @staticmethod
+    def format_sources(retrieved_docs: List[Dict]) -> List[Dict]:
+        """Sources renvoyées à l'utilisateur"""
+        return [
+            {
+                'title': doc['title'],
+                'url': doc['url'],
+                'date': doc['date'],
+                'content': doc['content'],
+                'relevance_score': doc['similarity_score']
+            }
+            for doc in retrieved_docs
+        ]
     
     def answer_question(
         self,
         query: str,
         use_local_llm: bool = False,
-        verbose: bool = True
+        verbose: bool = True,
+        top_k: int = None,
+        retrieval_mode: str = None,
+        filters=None,
+        query_embedding: np.ndarray = None
     ) -> Dict:
         """
         Pipeline complet: Question → Réponse
@@ -300,6 +730,10 @@ RÉPONSE:"""
             query: Question de l'utilisateur
             use_local_llm: True=Ollama local, False=HuggingFace API
             verbose: Afficher les étapes
+            top_k: Nombre de documents (défaut: self.top_k)
+            retrieval_mode: 'dense', 'bm25' ou 'hybrid' (défaut: RETRIEVAL_MODE)
+            filters: Pré-filtre des documents (voir search)
+            query_embedding: Embedding déjà calculé (aencode_query)
         """
         start_time = time.time()
         
@@ -311,24 +745,38 @@ RÉPONSE:"""
         if verbose:
             print("🔍 Recherche de documents pertinents...")
         
-        retrieved_docs = self.retrieve(query)
+        retrieved_docs, query_embedding = self.retrieve_with_embedding(
+            query, top_k, retrieval_mode, filters, query_embedding=query_embedding
+        )
         
         if verbose:
             print(f"✅ {len(retrieved_docs)} documents trouvés")
             for i, doc in enumerate(retrieved_docs, 1):
                 print(f"  {i}. {doc['title'][:60]}... (score: {doc['similarity_score']:.3f})")
         
-        # Étape 2: Génération du prompt
-        prompt = self.generate_prompt(query, retrieved_docs)
-        
-        # Étape 3: Génération de la réponse
-        if verbose:
-            print("\n🤖 Génération de la réponse...")
+        # Étape 2: Question similaire déjà traitée avec le même contexte?
+        backend = self.llm_backend_name(use_local_llm)
+        chunk_ids = [doc['id'] for doc in retrieved_docs]
+        cached = self.answer_cache.get(query_embedding, chunk_ids, backend)
         
-        if use_local_llm:
-            answer = self.generate_answer_local(prompt)
+        if cached:
+            answer = cached['answer']
+            if verbose:
+                print(f"\n♻️ Réponse en cache (similarité: {cached['similarity']:.3f})")
         else:
-            answer = self.generate_answer_huggingface(prompt)
+            # Étape 3: Génération du prompt
+            prompt = self.generate_prompt(query, retrieved_docs)
+            
+            # Étape 4: Génération de la réponse
+            if verbose:
+                print("\n🤖 Génération de la réponse...")
+            
+            if use_local_llm:
+                answer = self.generate_answer_local(prompt)
+            else:
+                answer = self.generate_answer_huggingface(prompt)
+            
+            self.answer_cache.put(query_embedding, chunk_ids, backend, query, answer)
         
         # Calcul du temps
         elapsed_time = time.time() - start_time
@@ -341,21 +789,195 @@ RÉPONSE:"""
         result = {
             'question': query,
             'answer': answer,
-            'sources': [
-                {
-                    'title': doc['title'],
-                    'url': doc['url'],
-                    'date': doc['date'],
-                    'content': doc['content'],
-                    'relevance_score': doc['similarity_score']
-                }
-                for doc in retrieved_docs
-            ],
+            'sources': self.format_sources(retrieved_docs),
             'response_time': elapsed_time,
-            'num_docs_retrieved': len(retrieved_docs)
+            'num_docs_retrieved': len(retrieved_docs),
+            'cached': cached is not None
         }
         
         return result
+    
+    def answer_question_stream(
+        self,
+        query: str,
+        use_local_llm: bool = False,
+        top_k: int = None,
+        retrieval_mode: str = None,
+        filters=None
+    ) -> Iterator[Dict]:
+        """
+        Pipeline en flux: Question → sources, puis réponse fragment par fragment
+        
+        Événements produits:
+            {'type': 'sources', 'sources': [...], 'num_docs_retrieved': n}
+            {'type': 'token', 'text': '...'}  (répété)
+            {'type': 'done', 'response_time': s, 'time_to_first_token': s}
+        """
+        start_time = time.time()
+        
+        retrieved_docs, query_embedding = self.retrieve_with_embedding(query, top_k, retrieval_mode, filters)
+        yield {
+            'type': 'sources',
+            'sources': self.format_sources(retrieved_docs),
+            'num_docs_retrieved': len(retrieved_docs)
+        }
+        
+        backend = self.llm_backend_name(use_local_llm)
+        chunk_ids = [doc['id'] for doc in retrieved_docs]
+        cached = self.answer_cache.get(query_embedding, chunk_ids, backend)
+        
+        if cached:
+            tokens = iter([cached['answer']])
+        else:
+            tokens = self.llm_client.stream(backend, self.generate_prompt(query, retrieved_docs))
+        
+        answer_parts = []
+        time_to_first_token = None
+        for token in tokens:
+            if time_to_first_token is None:
+                time_to_first_token = time.time() - start_time
+            answer_parts.append(token)
+            yield {'type': 'token', 'text': token}
+        
+        if not cached:
+            self.answer_cache.put(query_embedding, chunk_ids, backend, query, ''.join(answer_parts))
+        
+        yield {
+            'type': 'done',
+            'response_time': time.time() - start_time,
+            'time_to_first_token': time_to_first_token,
+            'cached': cached is not None
+        }
+
+    
+    def batch_result(self, query: str, answer: str, retrieved_docs: List[Dict], start_time: float,
+                     cached: bool) -> Dict:
+        """Résultat d'une question d'un lot (même format que answer_question)"""
+        return {
+            'question': query,
+            'answer': answer,
+            'sources': self.format_sources(retrieved_docs),
+            'response_time': time.time() - start_time,
+            'num_docs_retrieved': len(retrieved_docs),
+            'cached': cached
+        }
+    
+    @staticmethod
+    def batch_error(query: str, error: LLMError) -> Dict:
+        """Question d'un lot en échec: les autres réponses du lot sont conservées"""
+        return {
+            'question': query,
+            'answer': None,
+            'error': f"{type(error).__name__}: {error}",
+            'status_code': error.status_code
+        }
+    
+    def _answer_batch_item(self, query: str, retrieved_docs: List[Dict], query_embedding: np.ndarray,
+                           backend: str, start_time: float) -> Dict:
+        chunk_ids = [doc['id'] for doc in retrieved_docs]
+        cached = self.answer_cache.get(query_embedding, chunk_ids, backend)
+        if cached:
+            return self.batch_result(query, cached['answer'], retrieved_docs, start_time, True)
+        
+        try:
+            answer = self.llm_client.generate(backend, self.generate_prompt(query, retrieved_docs))
+        except LLMError as e:
+            return self.batch_error(query, e)
+        
+        self.answer_cache.put(query_embedding, chunk_ids, backend, query, answer)
+        return self.batch_result(query, answer, retrieved_docs, start_time, False)
+    
+    def iter_answers(
+        self,
+        queries: List[str],
+        use_local_llm: bool = False,
+        top_k: int = None,
+        retrieval_mode: str = None,
+        filters=None,
+        max_concurrency: int = None
+    ) -> Iterator[Tuple[int, Dict]]:
+        """
+        Réponses à un lot de questions, produites dans l'ordre d'achèvement
+        
+        Les questions sont encodées en un lot et recherchées en un seul appel
+        (retrieve_many); les générations partent en parallèle, au plus
+        `max_concurrency` à la fois (défaut: BATCH_MAX_CONCURRENCY).
+        
+        Produit des couples (position de la question, résultat); une erreur
+        LLM n'interrompt pas le lot (résultat avec 'error' et 'status_code').
+        """
+        if not queries:
+            return
+        start_time = time.time()
+        retrieved, query_embeddings = self.retrieve_many(queries, top_k, retrieval_mode, filters)
+        backend = self.llm_backend_name(use_local_llm)
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency or self.batch_concurrency,
+                                thread_name_prefix="rag-batch") as executor:
+            futures = {
+                executor.submit(self._answer_batch_item, query, docs, query_embedding, backend, start_time): index
+                for index, (query, docs, query_embedding) in enumerate(zip(queries, retrieved, query_embeddings))
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    
+    def answer_questions(
+        self,
+        queries: List[str],
+        use_local_llm: bool = False,
+        top_k: int = None,
+        retrieval_mode: str = None,
+        filters=None,
+        max_concurrency: int = None
+    ) -> List[Dict]:
+        """Réponses à un lot de questions, dans l'ordre des questions (voir iter_answers)"""
+        results = [None] * len(queries)
+        for index, result in self.iter_answers(queries, use_local_llm, top_k, retrieval_mode, filters, max_concurrency):
+            results[index] = result
+        return results
+    
+    async def agenerate_answers(
+        self,
+        queries: List[str],
+        retrieved: List[List[Dict]],
+        query_embeddings: np.ndarray,
+        use_local_llm: bool = False,
+        max_concurrency: int = None,
+        start_time: float = None
+    ) -> AsyncIterator[Tuple[int, Dict]]:
+        """
+        Équivalent asyncio de iter_answers pour des documents déjà récupérés
+        (retrieve_many): les générations passent par le client LLM asynchrone,
+        sans occuper de thread
+        """
+        start_time = start_time or time.time()
+        backend = self.llm_backend_name(use_local_llm)
+        limit = asyncio.Semaphore(max_concurrency or self.batch_concurrency)
+        
+        async def answer(index: int) -> Tuple[int, Dict]:
+            query, retrieved_docs, query_embedding = queries[index], retrieved[index], query_embeddings[index]
+            chunk_ids = [doc['id'] for doc in retrieved_docs]
+            cached = self.answer_cache.get(query_embedding, chunk_ids, backend)
+            if cached:
+                return index, self.batch_result(query, cached['answer'], retrieved_docs, start_time, True)
+            
+            async with limit:
+                try:
+                    answer_text = await self.llm_client.agenerate(backend, self.generate_prompt(query, retrieved_docs))
+                except LLMError as e:
+                    return index, self.batch_error(query, e)
+            
+            self.answer_cache.put(query_embedding, chunk_ids, backend, query, answer_text)
+            return index, self.batch_result(query, answer_text, retrieved_docs, start_time, False)
+        
+        tasks = [asyncio.ensure_future(answer(index)) for index in range(len(queries))]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # Client déconnecté: générations restantes annulées
+            for task in tasks:
+                task.cancel()
 
 
 def test_rag():
@@ -372,7 +994,7 @@ def test_rag():
     )
     
     # Indexer si nécessaire
-    if rag.collection is None or rag.collection.count() == 0:
+    if rag.vector_store.count() == 0:
         print("⚠️ Collection non indexée. Indexation en cours...")
         rag.index_corpus()
     
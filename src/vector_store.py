@@ -0,0 +1,803 @@
+"""
+VECTOR STORE - Culture Burkinabè
+Abstraction de la base vectorielle: ChromaDB, FAISS (Flat, IVF, HNSW)
+ou matrice NumPy float32 mappée en mémoire
+"""
+
+import json
+import mmap
+import os
+from typing import Dict, List
+
+import numpy as np
+
+try:
+    from metadata_filter import MetadataFilter, FILTER_COLUMNS, filter_columns, is_filtering
+except ImportError:
+    from src.metadata_filter import MetadataFilter, FILTER_COLUMNS, filter_columns, is_filtering
+
+# FAISS est optionnel (faiss-cpu dans requirements.txt)
+try:
+    import faiss
+    FAISS_SUPPORT = True
+except ImportError:
+    FAISS_SUPPORT = False
+
+
+class VectorStore:
+    """
+    Interface commune des bases vectorielles
+
+    query() retourne, pour chaque embedding de requête, une liste de
+    résultats {'id', 'distance', 'metadata'} triés du plus proche au moins proche,
+    avec distance = 1 - similarité cosinus pour tous les backends.
+    """
+
+    backend_name = "base"
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def reset(self):
+        """Suppression de tous les vecteurs"""
+        raise NotImplementedError
+
+    def add(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        raise NotImplementedError
+
+    def upsert(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        """Ajout ou remplacement des chunks `ids`"""
+        raise NotImplementedError
+
+    def delete(self, ids: List[str]):
+        raise NotImplementedError
+
+    def get_hashes(self) -> Dict[str, str]:
+        """Empreinte ('content_hash' des métadonnées) de chaque chunk indexé"""
+        raise NotImplementedError
+
+    def query(self, query_embeddings, top_k: int, include_metadata: bool = True,
+              where: MetadataFilter = None) -> List[List[Dict]]:
+        """
+        include_metadata=False: 'metadata' vaut None (classement seul, sans lecture des métadonnées)
+        where: ne chercher que parmi les chunks qui satisfont le filtre
+        """
+        raise NotImplementedError
+
+    def get(self, ids: List[str]) -> Dict[str, Dict]:
+        """Métadonnées des chunks `ids` indexés (les identifiants inconnus sont ignorés)"""
+        raise NotImplementedError
+
+    def persist(self):
+        """Écriture sur disque (no-op si la base persiste d'elle-même)"""
+
+    def describe(self) -> Dict:
+        return {'backend': self.backend_name, 'count': self.count()}
+
+
+class ChromaVectorStore(VectorStore):
+    """
+    ChromaDB persistant (backend historique)
+
+    La collection utilise l'espace cosinus: ses distances sont sur la même
+    échelle que FAISS et NumPy. Une collection créée avec l'espace L2 par
+    défaut (anciennes versions) est recopiée à l'ouverture dans une
+    collection cosinus.
+    """
+
+    backend_name = "chroma"
+    COLLECTION_METADATA = {
+        "description": "Articles culture burkinabè - LeFaso.net",
+        "hnsw:space": "cosine"
+    }
+
+    def __init__(self, path: str = "data/vectors/chroma_db", collection_name: str = "culture_burkina"):
+        # Import différé: chromadb est lent à importer et inutile avec les autres backends
+        import chromadb
+        from chromadb.config import Settings
+
+        self.path = path
+        self.collection_name = collection_name
+        self.client = chromadb.PersistentClient(
+            path=path,
+            settings=Settings(anonymized_telemetry=False)
+        )
+
+        try:
+            self.collection = self.client.get_collection(collection_name)
+        except Exception:
+            self.collection = None
+
+        if self.collection is not None and (self.collection.metadata or {}).get("hnsw:space", "l2") != "cosine":
+            self._migrate_to_cosine()
+
+    def count(self) -> int:
+        return self.collection.count() if self.collection is not None else 0
+
+    def _create_collection(self, name: str):
+        try:
+            self.client.delete_collection(name)
+        except Exception:
+            pass
+        return self.client.create_collection(name=name, metadata=self.COLLECTION_METADATA)
+
+    def reset(self):
+        self.collection = self._create_collection(self.collection_name)
+
+    def _migrate_to_cosine(self):
+        """Recopie d'une collection en distance L2 dans une collection cosinus (mêmes ids, embeddings, métadonnées)"""
+        print(f"🔄 Collection {self.collection_name}: distance L2 → cosinus ({self.collection.count()} documents)")
+        target = self._create_collection(f"{self.collection_name}_cosine")
+
+        batch_size = self._batch_size()
+        for offset in range(0, self.collection.count(), batch_size):
+            page = self.collection.get(include=['embeddings', 'documents', 'metadatas'], limit=batch_size, offset=offset)
+            target.add(
+                ids=page['ids'],
+                embeddings=page['embeddings'],
+                documents=page['documents'],
+                metadatas=page['metadatas']
+            )
+
+        # L'ancienne collection n'est supprimée qu'une fois la copie complète
+        self.client.delete_collection(self.collection_name)
+        target.modify(name=self.collection_name)
+        self.collection = target
+
+    def _batch_size(self) -> int:
+        # ChromaDB limite la taille d'un ajout
+        return self.client.get_max_batch_size() if hasattr(self.client, 'get_max_batch_size') else 5000
+
+    def _write(self, method: str, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        if self.collection is None:
+            self.reset()
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        batch_size = self._batch_size()
+        write = getattr(self.collection, method)
+
+        for i in range(0, len(ids), batch_size):
+            write(
+                ids=ids[i:i + batch_size],
+                embeddings=embeddings[i:i + batch_size].tolist(),
+                documents=documents[i:i + batch_size],
+                metadatas=metadatas[i:i + batch_size]
+            )
+
+    def add(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        self._write('add', ids, embeddings, documents, metadatas)
+
+    def upsert(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        self._write('upsert', ids, embeddings, documents, metadatas)
+
+    def delete(self, ids: List[str]):
+        if self.collection is None or not ids:
+            return
+
+        batch_size = self._batch_size()
+        for i in range(0, len(ids), batch_size):
+            self.collection.delete(ids=ids[i:i + batch_size])
+
+    def get_hashes(self) -> Dict[str, str]:
+        if self.collection is None:
+            return {}
+
+        hashes = {}
+        batch_size = self._batch_size()
+        for offset in range(0, self.collection.count(), batch_size):
+            page = self.collection.get(include=['metadatas'], limit=batch_size, offset=offset)
+            for doc_id, metadata in zip(page['ids'], page['metadatas']):
+                hashes[doc_id] = (metadata or {}).get('content_hash')
+        return hashes
+
+    def query(self, query_embeddings, top_k: int, include_metadata: bool = True,
+              where: MetadataFilter = None) -> List[List[Dict]]:
+        if self.collection is None:
+            return [[] for _ in query_embeddings]
+
+        results = self.collection.query(
+            query_embeddings=np.asarray(query_embeddings, dtype=np.float32).tolist(),
+            n_results=top_k,
+            where=where.to_chroma_where() if is_filtering(where) else None,
+            include=['metadatas', 'distances'] if include_metadata else ['distances']
+        )
+        all_metadatas = results['metadatas'] if include_metadata else [[None] * len(ids) for ids in results['ids']]
+
+        return [
+            [
+                {'id': doc_id, 'distance': distance, 'metadata': metadata}
+                for doc_id, distance, metadata in zip(ids, distances, metadatas)
+            ]
+            for ids, distances, metadatas in zip(results['ids'], results['distances'], all_metadatas)
+        ]
+
+    def get(self, ids: List[str]) -> Dict[str, Dict]:
+        if self.collection is None or not ids:
+            return {}
+        results = self.collection.get(ids=list(ids), include=['metadatas'])
+        return dict(zip(results['ids'], results['metadatas']))
+
+    def describe(self) -> Dict:
+        return {
+            'backend': self.backend_name,
+            'count': self.count(),
+            'collection_name': self.collection_name
+        }
+
+
+class FaissVectorStore(VectorStore):
+    """
+    Index FAISS en mémoire, sauvegardé dans `path` (index.faiss + metadata.json)
+
+    Les vecteurs sont normalisés et comparés par produit scalaire:
+    distance = 1 - similarité cosinus.
+
+    Types d'index:
+        flat: recherche exacte
+        ivf:  partitionnement (nlist listes, nprobe listes visitées)
+        hnsw: graphe HNSW (hnsw_m voisins, ef_search à la recherche)
+
+    Chaque vecteur porte un identifiant FAISS (int64): sa place dans
+    `ids`/`metadatas`. upsert() et delete() modifient l'index sur place
+    (IndexIDMap2 pour flat et hnsw, identifiants natifs pour ivf), sans
+    reconstruction ni réentraînement. HNSW ne sait pas retirer un vecteur:
+    les anciennes versions sont masquées à la recherche et l'index est
+    reconstruit une seule fois, par persist(), en fin de mise à jour.
+    """
+
+    backend_name = "faiss"
+    INDEX_TYPES = ("flat", "ivf", "hnsw")
+
+    def __init__(
+        self,
+        path: str = "data/vectors/faiss",
+        index_type: str = "flat",
+        nlist: int = 1024,
+        nprobe: int = 16,
+        hnsw_m: int = 32,
+        ef_search: int = 64,
+        exact_filter_max: int = 4096
+    ):
+        if not FAISS_SUPPORT:
+            raise ImportError("faiss non installé. Installer avec: pip install faiss-cpu")
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(f"Type d'index FAISS inconnu: {index_type} (attendu: {', '.join(self.INDEX_TYPES)})")
+
+        self.path = path
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+        self.exact_filter_max = exact_filter_max
+
+        self.index = None
+        # Place = identifiant FAISS; None pour une place libre ou un vecteur masqué
+        self.ids: List[str] = []
+        self.metadatas: List[Dict] = []
+        # Places libres (réutilisables) et vecteurs HNSW masqués en attente de reconstruction
+        self._free: List[int] = []
+        self._stale = set()
+        # id -> place, places occupées et colonnes filtrables, reconstruits après modification
+        self._positions = None
+        self._live = None
+        self._columns = None
+
+        self._index_file = os.path.join(path, "index.faiss")
+        self._metadata_file = os.path.join(path, "metadata.json")
+
+        if os.path.exists(self._index_file) and os.path.exists(self._metadata_file):
+            self.load()
+
+    def _ivf_lists(self, num_vectors: int) -> int:
+        # Au moins ~39 vecteurs d'entraînement par liste
+        return max(1, min(self.nlist, num_vectors // 39))
+
+    def _build_index(self, dim: int, num_vectors: int):
+        if self.index_type == "flat":
+            return faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+
+        if self.index_type == "ivf":
+            nlist = self._ivf_lists(num_vectors)
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            # Table de hachage: reconstruct() et remove_ids() par identifiant
+            index.set_direct_map_type(faiss.DirectMap.Hashtable)
+            index.nprobe = min(self.nprobe, nlist)
+            return index
+
+        hnsw = faiss.IndexHNSWFlat(dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efSearch = self.ef_search
+        return faiss.IndexIDMap2(hnsw)
+
+    @staticmethod
+    def _normalize(embeddings) -> np.ndarray:
+        embeddings = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+        if embeddings.ndim == 1:
+            embeddings = embeddings.reshape(1, -1)
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+    def count(self) -> int:
+        return self.index.ntotal - len(self._stale) if self.index is not None else 0
+
+    def _changed(self):
+        self._positions = None
+        self._live = None
+        self._columns = None
+
+    def reset(self):
+        self.index = None
+        self.ids = []
+        self.metadatas = []
+        self._free = []
+        self._stale = set()
+        self._changed()
+
+    def _position_map(self) -> Dict[str, int]:
+        if self._positions is None:
+            self._positions = {doc_id: pos for pos, doc_id in enumerate(self.ids) if doc_id is not None}
+        return self._positions
+
+    def _insert(self, ids: List[str], vectors: np.ndarray, metadatas: List[Dict]):
+        """Ajout sous des places libres (réutilisées) ou nouvelles"""
+        reused = min(len(ids), len(self._free))
+        labels = [self._free.pop() for _ in range(reused)]
+        labels += range(len(self.ids), len(self.ids) + len(ids) - reused)
+        self.ids.extend([None] * (len(ids) - reused))
+        self.metadatas.extend([None] * (len(ids) - reused))
+
+        self.index.add_with_ids(vectors, np.asarray(labels, dtype=np.int64))
+        for label, doc_id, metadata in zip(labels, ids, metadatas):
+            self.ids[label] = doc_id
+            self.metadatas[label] = metadata
+        self._changed()
+
+    def _remove(self, labels: List[int]):
+        """Retrait des places `labels` (masquage jusqu'à la reconstruction pour HNSW)"""
+        if not labels:
+            return
+        if self.index_type == "hnsw":
+            self._stale.update(labels)
+        else:
+            self.index.remove_ids(np.asarray(labels, dtype=np.int64))
+            self._free.extend(labels)
+        for label in labels:
+            self.ids[label] = None
+            self.metadatas[label] = None
+        self._changed()
+
+    def add(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        vectors = self._normalize(embeddings)
+
+        if self.index is None:
+            self.index = self._build_index(vectors.shape[1], len(vectors))
+            if not self.index.is_trained:
+                self.index.train(vectors)
+
+        self._insert(ids, vectors, metadatas)
+
+    def upsert(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        if self.index is None:
+            self.add(ids, embeddings, documents, metadatas)
+            return
+
+        positions = self._position_map()
+        self._remove([positions[doc_id] for doc_id in ids if doc_id in positions])
+        self._insert(ids, self._normalize(embeddings), metadatas)
+
+    def delete(self, ids: List[str]):
+        if self.index is None or not ids:
+            return
+
+        positions = self._position_map()
+        self._remove([positions[doc_id] for doc_id in set(ids) if doc_id in positions])
+
+    def _needs_rebuild(self) -> bool:
+        """Vecteurs HNSW masqués, ou IVF entraîné sur trop peu de vecteurs (premier lot)"""
+        if self._stale:
+            return True
+        if self.index_type == "ivf" and self.index is not None:
+            return self.index.nlist * 2 <= self._ivf_lists(self.count())
+        return False
+
+    def _rebuild(self):
+        """Nouvel index sur les seuls vecteurs à jour, places renumérotées"""
+        labels = np.array([pos for pos, doc_id in enumerate(self.ids) if doc_id is not None], dtype=np.int64)
+        if len(labels) == 0:
+            self.reset()
+            return
+
+        vectors = self.index.reconstruct_batch(labels)
+        ids = [self.ids[pos] for pos in labels]
+        metadatas = [self.metadatas[pos] for pos in labels]
+
+        self.reset()
+        self.add(ids, vectors, None, metadatas)
+
+    def get_hashes(self) -> Dict[str, str]:
+        return {
+            doc_id: metadata.get('content_hash')
+            for doc_id, metadata in zip(self.ids, self.metadatas)
+            if doc_id is not None
+        }
+
+    def _live_mask(self) -> np.ndarray:
+        if self._live is None:
+            self._live = np.array([doc_id is not None for doc_id in self.ids], dtype=bool)
+        return self._live
+
+    def _exact_search(self, queries: np.ndarray, allowed: np.ndarray, k: int):
+        """Produit scalaire exact avec les vecteurs des places `allowed`"""
+        scores = queries @ self.index.reconstruct_batch(allowed.astype(np.int64)).T
+        top = np.argsort(-scores, axis=1)[:, :k]
+        return np.take_along_axis(scores, top, axis=1), allowed[top]
+
+    def _search_parameters(self, mask: np.ndarray):
+        """Paramètres de recherche restreints aux places du masque (bitmap FAISS)"""
+        bitmap = np.packbits(mask, bitorder='little')
+        selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bitmap))
+        if self.index_type == "ivf":
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=self.index.nprobe)
+        elif self.index_type == "hnsw":
+            params = faiss.SearchParametersHNSW(sel=selector, efSearch=self.ef_search)
+        else:
+            params = faiss.SearchParameters(sel=selector)
+        # Le sélecteur ne copie pas le bitmap: le garder en vie pendant la recherche
+        return params, (bitmap, selector)
+
+    def query(self, query_embeddings, top_k: int, include_metadata: bool = True,
+              where: MetadataFilter = None) -> List[List[Dict]]:
+        # Métadonnées en mémoire: toujours incluses
+        if self.count() == 0:
+            return [[] for _ in query_embeddings]
+
+        queries = self._normalize(query_embeddings)
+        scores, params, keep_alive = None, None, None
+        k = min(top_k, self.count())
+        if is_filtering(where):
+            if self._columns is None:
+                self._columns = filter_columns([metadata or {} for metadata in self.metadatas])
+            mask = where.mask(self._columns) & self._live_mask()
+            allowed = np.flatnonzero(mask)
+            k = min(k, len(allowed))
+            if k == 0:
+                return [[] for _ in query_embeddings]
+
+            # Filtre sélectif: IVF/HNSW ne visiteraient que peu de vecteurs autorisés
+            # (moins de k résultats); recherche exacte sur ces seuls vecteurs
+            if self.index_type != "flat" and len(allowed) <= self.exact_filter_max:
+                scores, positions = self._exact_search(queries, allowed, k)
+            else:
+                params, keep_alive = self._search_parameters(mask)
+        elif self._stale:
+            params, keep_alive = self._search_parameters(self._live_mask())
+
+        if scores is None:
+            scores, positions = self.index.search(queries, k, params=params)
+
+        return [
+            [
+                {'id': self.ids[pos], 'distance': float(1 - score), 'metadata': self.metadatas[pos]}
+                for score, pos in zip(row_scores, row_positions)
+                if pos >= 0
+            ]
+            for row_scores, row_positions in zip(scores, positions)
+        ]
+
+    def persist(self):
+        if self.index is None:
+            return
+
+        # Une seule reconstruction pour toute la mise à jour incrémentale
+        if self._needs_rebuild():
+            self._rebuild()
+            if self.index is None:
+                return
+
+        os.makedirs(self.path, exist_ok=True)
+        faiss.write_index(self.index, self._index_file + ".tmp")
+        with open(self._metadata_file + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({'index_type': self.index_type, 'ids': self.ids, 'metadatas': self.metadatas},
+                      f, ensure_ascii=False)
+
+        os.replace(self._index_file + ".tmp", self._index_file)
+        os.replace(self._metadata_file + ".tmp", self._metadata_file)
+
+    def load(self):
+        with open(self._metadata_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        if data.get('index_type') != self.index_type:
+            print(f"⚠️ Index FAISS '{data.get('index_type')}' ignoré (type demandé: {self.index_type})")
+            return
+
+        self.index = faiss.read_index(self._index_file)
+        self.ids = data['ids']
+        self.metadatas = data['metadatas']
+        self._free = [pos for pos, doc_id in enumerate(self.ids) if doc_id is None]
+        self._stale = set()
+        self._changed()
+
+        if self.index_type == "ivf":
+            self.index.nprobe = min(self.nprobe, self.index.nlist)
+            if self.index.direct_map.type != faiss.DirectMap.Hashtable:
+                self.index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        elif not isinstance(self.index, faiss.IndexIDMap2):
+            # Index sauvegardé avant les identifiants FAISS (places = positions)
+            vectors = self.index.reconstruct_n(0, self.index.ntotal)
+            self.index = self._build_index(vectors.shape[1], len(vectors))
+            self.index.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+
+        if self.index_type == "hnsw":
+            faiss.downcast_index(self.index.index).hnsw.efSearch = self.ef_search
+
+    def describe(self) -> Dict:
+        return {
+            'backend': self.backend_name,
+            'count': self.count(),
+            'index_type': self.index_type
+        }
+
+    def get(self, ids: List[str]) -> Dict[str, Dict]:
+        positions = self._position_map()
+        return {doc_id: self.metadatas[positions[doc_id]] for doc_id in ids if doc_id in positions}
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Matrice float32 normalisée sur disque, lue par np.load(mmap_mode='r')
+
+    Recherche exacte par un produit matriciel + argpartition. Plusieurs
+    processus API partagent ainsi une seule copie en cache de pages.
+
+    Fichiers dans `path`:
+        embeddings.npy  matrice (N, D) float32 normalisée
+        ids.npy         identifiants des chunks (octets UTF-8, taille fixe)
+        metadata.jsonl  une ligne JSON de métadonnées par chunk
+        offsets.npy     positions (octets) des lignes de metadata.jsonl (N+1)
+        filter_*.npy    colonnes filtrables (date_num, category, article_id)
+
+    Les modifications (reset, add, upsert, delete) sont préparées en mémoire
+    et les requêtes continuent de lire la version sur disque jusqu'à
+    persist(), qui remplace les fichiers atomiquement: les lecteurs
+    rechargent la nouvelle version au prochain appel à query().
+    """
+
+    backend_name = "numpy"
+
+    def __init__(self, path: str = "data/vectors/matrix"):
+        self.path = path
+        self._embeddings_file = os.path.join(path, "embeddings.npy")
+        self._ids_file = os.path.join(path, "ids.npy")
+        self._metadata_file = os.path.join(path, "metadata.jsonl")
+        self._offsets_file = os.path.join(path, "offsets.npy")
+
+        # Prochaine version complète (ids, vecteurs, métadonnées) en attente de persist()
+        self._staged = None
+
+        self.matrix = None
+        self.ids = None
+        self.offsets = None
+        self._metadata = None
+        self._positions = None
+        self._columns = None
+        self._loaded_mtime = None
+
+        if os.path.exists(self._embeddings_file):
+            self.load()
+
+    @staticmethod
+    def _normalize(embeddings) -> np.ndarray:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim == 1:
+            embeddings = embeddings.reshape(1, -1)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return embeddings / norms
+
+    def load(self):
+        """Ouverture (mmap) de la dernière version écrite sur disque"""
+        self._loaded_mtime = os.stat(self._embeddings_file).st_mtime_ns
+        self.matrix = np.load(self._embeddings_file, mmap_mode='r')
+        self.ids = np.load(self._ids_file, mmap_mode='r')
+        self.offsets = np.load(self._offsets_file, mmap_mode='r')
+        self._positions = None
+        self._columns = None
+
+        # Métadonnées aussi mappées: lecture sans verrou depuis plusieurs threads
+        with open(self._metadata_file, 'rb') as f:
+            self._metadata = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if len(self.ids) else b""
+
+    def _refresh(self):
+        """Rechargement si un autre processus a réindexé"""
+        try:
+            mtime = os.stat(self._embeddings_file).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._loaded_mtime:
+            self.load()
+
+    def _stage(self) -> Dict:
+        """Copie modifiable de la version sur disque"""
+        if self._staged is None:
+            loaded = len(self.ids) if self.ids is not None else 0
+            self._staged = {
+                'ids': [self.get_id(i) for i in range(loaded)],
+                'vectors': [np.array(self.matrix)] if loaded else [],
+                'metadatas': [self.get_metadata(i) for i in range(loaded)]
+            }
+        return self._staged
+
+    def _staged_matrix(self) -> np.ndarray:
+        staged = self._stage()
+        if len(staged['vectors']) > 1:
+            staged['vectors'] = [np.vstack(staged['vectors'])]
+        return staged['vectors'][0] if staged['vectors'] else None
+
+    def count(self) -> int:
+        if self._staged is not None:
+            return len(self._staged['ids'])
+        return len(self.ids) if self.ids is not None else 0
+
+    def reset(self):
+        # Les fichiers existants restent lisibles jusqu'au prochain persist()
+        self._staged = {'ids': [], 'vectors': [], 'metadatas': []}
+
+    def add(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        staged = self._stage()
+        staged['ids'].extend(ids)
+        staged['vectors'].append(self._normalize(embeddings))
+        staged['metadatas'].extend(metadatas)
+
+    def upsert(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        staged = self._stage()
+        matrix = self._staged_matrix()
+        vectors = self._normalize(embeddings)
+        positions = {doc_id: pos for pos, doc_id in enumerate(staged['ids'])}
+
+        new_rows = []
+        for i, doc_id in enumerate(ids):
+            if doc_id in positions:
+                matrix[positions[doc_id]] = vectors[i]
+                staged['metadatas'][positions[doc_id]] = metadatas[i]
+            else:
+                new_rows.append(i)
+
+        if new_rows:
+            self.add([ids[i] for i in new_rows], vectors[new_rows], [], [metadatas[i] for i in new_rows])
+
+    def delete(self, ids: List[str]):
+        staged = self._stage()
+        matrix = self._staged_matrix()
+        to_delete = set(ids)
+        keep = [pos for pos, doc_id in enumerate(staged['ids']) if doc_id not in to_delete]
+
+        staged['ids'] = [staged['ids'][pos] for pos in keep]
+        staged['metadatas'] = [staged['metadatas'][pos] for pos in keep]
+        staged['vectors'] = [matrix[keep]] if matrix is not None and keep else []
+
+    def get_hashes(self) -> Dict[str, str]:
+        if self._staged is not None:
+            return {doc_id: meta.get('content_hash') for doc_id, meta in zip(self._staged['ids'], self._staged['metadatas'])}
+        if self.ids is None:
+            return {}
+        return {self.get_id(i): self.get_metadata(i).get('content_hash') for i in range(len(self.ids))}
+
+    def get_id(self, position: int) -> str:
+        return self.ids[position].decode('utf-8')
+
+    def get_metadata(self, position: int) -> Dict:
+        start, end = int(self.offsets[position]), int(self.offsets[position + 1])
+        return json.loads(self._metadata[start:end])
+
+    def _filter_file(self, column: str) -> str:
+        return os.path.join(self.path, f"filter_{column}.npy")
+
+    def filter_columns(self) -> Dict[str, np.ndarray]:
+        """Colonnes filtrables de la version sur disque (mmap; recalculées pour un ancien index)"""
+        if self._columns is None:
+            if all(os.path.exists(self._filter_file(column)) for column in FILTER_COLUMNS):
+                self._columns = {column: np.load(self._filter_file(column), mmap_mode='r') for column in FILTER_COLUMNS}
+            else:
+                self._columns = filter_columns([self.get_metadata(i) for i in range(len(self.ids))])
+        return self._columns
+
+    def query(self, query_embeddings, top_k: int, include_metadata: bool = True,
+              where: MetadataFilter = None) -> List[List[Dict]]:
+        self._refresh()
+        if self.matrix is None or len(self.matrix) == 0:
+            return [[] for _ in query_embeddings]
+
+        queries = self._normalize(query_embeddings)
+        # Filtre: produit matriciel sur les seules lignes autorisées
+        allowed = np.flatnonzero(where.mask(self.filter_columns())) if is_filtering(where) else None
+        scores = queries @ (self.matrix if allowed is None else self.matrix[allowed]).T  # (Q, N autorisés)
+        k = min(top_k, scores.shape[1])
+        if k == 0:
+            return [[] for _ in query_embeddings]
+
+        results = []
+        for row in scores:
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.argsort(-row[top])]
+            positions = top if allowed is None else allowed[top]
+            results.append([
+                {'id': self.get_id(pos), 'distance': float(1 - score),
+                 'metadata': self.get_metadata(pos) if include_metadata else None}
+                for pos, score in zip(positions, row[top])
+            ])
+        return results
+
+    def get(self, ids: List[str]) -> Dict[str, Dict]:
+        # Comme query(): version sur disque
+        self._refresh()
+        if self.ids is None:
+            return {}
+        positions = self._positions
+        if positions is None:
+            positions = self._positions = {self.get_id(i): i for i in range(len(self.ids))}
+        return {doc_id: self.get_metadata(positions[doc_id]) for doc_id in ids if doc_id in positions}
+
+    def persist(self):
+        if self._staged is None:
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        staged = self._staged
+        matrix = self._staged_matrix()
+        if matrix is None:
+            matrix = np.zeros((0, self.matrix.shape[1] if self.matrix is not None else 0), dtype=np.float32)
+
+        offsets = [0]
+        tmp_metadata = self._metadata_file + ".tmp"
+        with open(tmp_metadata, 'wb') as f:
+            for metadata in staged['metadatas']:
+                line = json.dumps(metadata, ensure_ascii=False).encode('utf-8') + b"\n"
+                f.write(line)
+                offsets.append(offsets[-1] + len(line))
+
+        np.save(self._ids_file + ".tmp.npy", np.array([i.encode('utf-8') for i in staged['ids']], dtype=bytes))
+        columns = filter_columns(staged['metadatas'])
+        for column in FILTER_COLUMNS:
+            np.save(self._filter_file(column) + ".tmp.npy", columns[column])
+        np.save(self._offsets_file + ".tmp.npy", np.array(offsets, dtype=np.int64))
+        np.save(self._embeddings_file + ".tmp.npy", matrix.astype(np.float32))
+
+        # Remplacement atomique, embeddings en dernier: un lecteur ne recharge
+        # (voir _refresh) qu'une fois tous les fichiers en place
+        os.replace(tmp_metadata, self._metadata_file)
+        os.replace(self._offsets_file + ".tmp.npy", self._offsets_file)
+        os.replace(self._ids_file + ".tmp.npy", self._ids_file)
+        for column in FILTER_COLUMNS:
+            os.replace(self._filter_file(column) + ".tmp.npy", self._filter_file(column))
+        os.replace(self._embeddings_file + ".tmp.npy", self._embeddings_file)
+
+        self._staged = None
+        self.load()
+
+    def describe(self) -> Dict:
+        return {
+            'backend': self.backend_name,
+            'count': self.count(),
+            'mmap': isinstance(self.matrix, np.memmap)
+        }
+
+
+def create_vector_store(backend: str = "chroma", path: str = None, **kwargs) -> VectorStore:
+    """
+    Création d'une base vectorielle
+
+    Args:
+        backend: 'chroma', 'faiss' ou 'numpy'
+        path: Dossier de persistance (défaut selon le backend)
+        kwargs: Options du backend (collection_name, index_type, nlist...)
+    """
+    if backend == "chroma":
+        return ChromaVectorStore(path or "data/vectors/chroma_db", **kwargs)
+    if backend == "faiss":
+        return FaissVectorStore(path or "data/vectors/faiss", **kwargs)
+    if backend == "numpy":
+        return NumpyVectorStore(path or "data/vectors/matrix", **kwargs)
+
+    raise ValueError(f"Backend vectoriel inconnu: {backend} (attendu: chroma, faiss, numpy)")